@@ -10,6 +10,14 @@ import sys
 import subprocess
 from pathlib import Path
 
+# Add the backend directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from services.audio_metadata import read_audio_metadata
+from services.audio_cuts import (
+    clip_paths, normalize_cuts, read_cut_list, validate_cuts, write_ffmpeg_clips, write_wav_clips
+)
+
 
 class FFmpegAudioTrimmer:
     """Audio trimmer using ffmpeg for maximum compatibility."""
@@ -22,26 +30,16 @@ class FFmpegAudioTrimmer:
             raise FileNotFoundError(f"Input file not found: {self.input_file}")
     
     def get_audio_info(self):
-        """Get basic information about the audio file using ffprobe."""
+        """Get basic information about the audio file (WAV/FLAC headers, ffprobe for the rest)."""
         try:
-            cmd = [
-                'ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_format',
-                str(self.input_file)
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            import json
-            info = json.loads(result.stdout)
-            format_info = info['format']
-            
-            duration = float(format_info['duration'])
-            bitrate = int(format_info.get('bit_rate', 0))
+            metadata = read_audio_metadata(self.input_file)
             
             return {
-                'duration': duration,
-                'bitrate': bitrate,
-                'format': format_info.get('format_name', 'unknown'),
-                'size': int(format_info.get('size', 0))
+                'duration': metadata['duration'],
+                'bitrate': metadata['bitrate'],
+                'format': metadata['format'],
+                'codec': metadata['codec'],
+                'size': metadata['size']
             }
         except Exception as e:
             raise ValueError(f"Could not read audio file: {e}")
@@ -90,6 +88,25 @@ class FFmpegAudioTrimmer:
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"FFmpeg failed: {e.stderr}")
     
+    def trim_many(self, cuts, output_dir=None):
+        """
+        Cut several clips in a single pass: PCM WAV is streamed once in Python,
+        anything else goes through one ffmpeg run with an output per clip.
+        
+        Args:
+            cuts: (start, end) or (start, end, label) items in seconds
+            output_dir: Directory for the clips (default: <input>_clips)
+        """
+        cuts = normalize_cuts(cuts)
+        if not cuts:
+            return []
+        info = self.get_audio_info()
+        validate_cuts(cuts, info['duration'])
+        outputs = clip_paths(self.input_file, cuts, output_dir)
+        if info['format'] == 'wav' and info['codec'] == 'pcm':
+            return write_wav_clips(self.input_file, cuts, outputs)
+        return write_ffmpeg_clips(self.input_file, cuts, outputs)
+    
     def print_info(self):
         """Print information about the audio file."""
         info = self.get_audio_info()
@@ -110,6 +127,8 @@ Examples:
   python audio_trimmer_ffmpeg.py input.wav --start 10 --end 30
   python audio_trimmer_ffmpeg.py input.mp3 --start 0 --end 60 --output trimmed.wav
   python audio_trimmer_ffmpeg.py input.wav --info
+  python audio_trimmer_ffmpeg.py input.wav --ranges 10-30,45-60 --output-dir clips
+  python audio_trimmer_ffmpeg.py recording.flac --cuts transcription.json
         """
     )
     
@@ -118,6 +137,9 @@ Examples:
     parser.add_argument('--end', type=float, help='End time in seconds')
     parser.add_argument('--output', '-o', help='Output file path (optional)')
     parser.add_argument('--info', action='store_true', help='Show file information only')
+    parser.add_argument('--ranges', help='Cut several clips in one pass, e.g. "10-30,45-60"')
+    parser.add_argument('--cuts', help='Cut one clip per turn of an RTTM file or utterance of a transcription.json')
+    parser.add_argument('--output-dir', help='Directory for the clips of --ranges/--cuts (default: <input>_clips)')
     
     args = parser.parse_args()
     
@@ -128,6 +150,14 @@ Examples:
             trimmer.print_info()
             return
         
+        if args.ranges or args.cuts:
+            cuts = read_cut_list(args.ranges, args.cuts)
+            print(f"Cutting {len(cuts)} clips from {args.input_file}...")
+            output_files = trimmer.trim_many(cuts, args.output_dir)
+            if output_files:
+                print(f"{len(output_files)} clips saved to: {Path(output_files[0]).parent}")
+            return
+        
         if args.start is None or args.end is None:
             print("Error: Both --start and --end times are required for trimming")
             print("Use --info to see file information")
@@ -2,7 +2,7 @@
 SQLAlchemy models for Legacy Interview App
 Optimized for fast retrieval and RAG capabilities
 """
-from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, DateTime, Boolean, JSON, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -102,7 +102,9 @@ class ConversationSession(Base):
     audio_file_path = Column(String(500))  # Path to recorded audio file
     transcription_file_path = Column(String(500))  # Path to transcription file
     participants = Column(JSONB, default=[])  # List of participants with speaker IDs
-    metadata = Column(JSONB, default={})  # Additional session metadata
+    utterance_count = Column(Integer, default=0)
+    duration = Column(Integer)  # Recording length in milliseconds
+    extra_metadata = Column('metadata', JSONB, default={})  # Additional session metadata
     
     # Relationships
     project = relationship("Project", back_populates="conversation_sessions")
@@ -120,26 +122,33 @@ class ConversationSession(Base):
             'audio_file_path': self.audio_file_path,
             'transcription_file_path': self.transcription_file_path,
             'participants': self.participants,
-            'metadata': self.metadata,
-            'utterance_count': len(self.utterances) if self.utterances else 0
+            'metadata': self.extra_metadata,
+            'utterance_count': self.utterance_count or 0,
+            'duration': self.duration
         }
 
 class ConversationUtterance(Base):
     """Individual utterance in a conversation with speaker identification"""
     __tablename__ = "conversation_utterances"
+    __table_args__ = (
+        # Keyset pagination and time-range filters within a session
+        Index('idx_utterances_session_sequence', 'session_id', 'sequence', unique=True),
+        Index('idx_utterances_session_start_ms', 'session_id', 'start_ms'),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey('conversation_sessions.id', ondelete='CASCADE'), nullable=False)
+    sequence = Column(Integer, nullable=False)  # Position in the recording
     speaker_id = Column(String(100), nullable=False)  # 'interviewer', 'subject', or custom ID
     speaker_name = Column(String(255))  # Human-readable speaker name
     text = Column(Text, nullable=False)  # Transcribed text
     confidence = Column(String(10))  # Transcription confidence score
-    start_time = Column(String(20))  # Start time in audio (e.g., "00:01:23")
-    end_time = Column(String(20))  # End time in audio
+    start_ms = Column(Integer, nullable=False)  # Offsets in the recording, in milliseconds
+    end_ms = Column(Integer, nullable=False)
     duration = Column(Integer)  # Duration in milliseconds
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     audio_segment_path = Column(String(500))  # Path to audio segment file
-    metadata = Column(JSONB, default={})  # Additional utterance metadata
+    extra_metadata = Column('metadata', JSONB, default={})  # Additional utterance metadata
     
     # Relationships
     session = relationship("ConversationSession", back_populates="utterances")
@@ -153,12 +162,13 @@ class ConversationUtterance(Base):
             'speaker_name': self.speaker_name,
             'text': self.text,
             'confidence': self.confidence,
-            'start_time': self.start_time,
-            'end_time': self.end_time,
+            'sequence': self.sequence,
+            'start_ms': self.start_ms,
+            'end_ms': self.end_ms,
             'duration': self.duration,
             'timestamp': self.timestamp.isoformat() if self.timestamp else None,
             'audio_segment_path': self.audio_segment_path,
-            'metadata': self.metadata
+            'metadata': self.extra_metadata
         }
 
 class InterviewTheme(Base):
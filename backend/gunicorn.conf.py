@@ -0,0 +1,27 @@
+"""
+Gunicorn config for pre-fork deployment
+Run from backend/: gunicorn -c gunicorn.conf.py main:app
+
+The app and the PRELOAD_MODELS components load once in the master before the
+workers fork, so workers share the model memory copy-on-write instead of each
+loading their own copy. The diarization pipeline is preloaded only with
+DIARIZATION_START_METHOD=fork, where the diarization workers inherit it; spawned
+workers load their own.
+"""
+import os
+
+bind = os.getenv('API_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('API_WORKERS', '2'))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+timeout = 120
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before workers fork"""
+    from services.model_registry import model_registry, PRELOAD_MODELS
+
+    names = model_registry.parse_names(PRELOAD_MODELS)
+    if names:
+        server.log.info(f"Preloading before fork: {', '.join(names)}")
+        model_registry.preload(names)
@@ -18,11 +18,14 @@ import os
 # Add the parent directory to Python path so we can import from database/
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import uuid
+import asyncio
 import json
 from datetime import datetime
 
@@ -31,7 +34,16 @@ from agents.prober_agent import ProberAgent
 from agents.summarizer_agent import SummarizerAgent
 from agents.subject_simulator_agent import SubjectSimulatorAgent
 from services.conversation_recording_service import conversation_recording_service
+from services.audio_stream_ingest import AudioStreamIngest
+from services.processing_jobs import processing_job_manager, create_job_store, JOB_FAILED
+from services.session_limits import RecordingLimitError, SessionReaper
 from services.database_service import db_service
+from services.diarization_pool import warm_pipeline, DIARIZATION_START_METHOD
+from services.model_registry import model_registry, PRELOAD_MODELS
+from services.audio_archive import WORKING_COPY_NAME, find_archive, stream_wav
+from services.segment_index import open_segment_audio, parse_range
+from services.transcript_query import clamp_limit, format_clock, page_sessions, page_utterances, transcript_entry, utterance_rows
+from services.word_index import WORD_SEARCH_LIMIT
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -49,11 +61,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize agents
-planner_agent = PlannerAgent()
-prober_agent = ProberAgent()
-summarizer_agent = SummarizerAgent()
-subject_simulator = SubjectSimulatorAgent()  # For testing only
+# Initialize agents lazily (built on first use or by the startup preload)
+planner_agent = model_registry.register("planner_agent", PlannerAgent)
+prober_agent = model_registry.register("prober_agent", ProberAgent)
+summarizer_agent = model_registry.register("summarizer_agent", SummarizerAgent)
+subject_simulator = model_registry.register("subject_simulator", SubjectSimulatorAgent)  # For testing only
+# Parent-process pipeline, only worth loading when fork-started diarization workers inherit it;
+# spawned workers load their own copy, so a parent copy would just be one more
+if DIARIZATION_START_METHOD == "fork":
+    model_registry.register("diarization_pipeline", warm_pipeline)
 
 # In-memory storage (replace with database in production)
 projects = {}
@@ -166,19 +182,52 @@ class ConversationSessionRequest(BaseModel):
     project_id: str
     session_name: str
     participants: Optional[List[Dict[str, str]]] = None
+    processing_mode: Optional[str] = None  # "per_segment" or "transcribe_once"; server default if omitted
+    input_format: Optional[str] = None  # "pcm", "webm", "ogg", "mp4" or a MediaRecorder mime type
+    live_transcription: Optional[bool] = None  # Transcribe while recording (LIVE_TRANSCRIPTION if omitted)
 
 class AudioChunkRequest(BaseModel):
     session_id: str
     audio_data: str  # Base64 encoded audio data
-    sample_rate: int = 16000
+    sample_rate: int = 16000  # Raw PCM is resampled to 16 kHz mono on ingest
+    channels: int = 1
+    sample_format: str = "s16le"  # "s16le", "s32le" or "f32le"
 
 class TranscriptionRequest(BaseModel):
     session_id: str
     utterance_id: str
     transcription_service: str = "openai"
 
-# Initialize sample data after all classes are defined
-initialize_sample_data()
+# Job status is shared with the other workers through the session store's backend
+processing_job_manager.store = create_job_store(conversation_recording_service.storage_path)
+
+def _finalize_expired_session(session_id: str):
+    """Queue processing for a session the reaper expired (a running end job is reused)"""
+    job = processing_job_manager.find_for_session(session_id)
+    if job is None or job.status == JOB_FAILED:
+        processing_job_manager.submit(
+            session_id,
+            lambda progress: conversation_recording_service.end_recording_session(session_id, progress=progress)
+        )
+
+session_reaper = SessionReaper(conversation_recording_service, _finalize_expired_session)
+
+@app.on_event("startup")
+async def startup():
+    """Load sample data and start the optional background model preload"""
+    # Sample data needs the database, so it runs at startup rather than at import
+    await asyncio.to_thread(initialize_sample_data)
+    
+    preload_names = model_registry.parse_names(PRELOAD_MODELS)
+    model_registry.required = preload_names
+    # Already warm when a pre-forking server loaded them before forking workers
+    pending = [name for name in preload_names if not model_registry.components[name].loaded]
+    if pending:
+        print(f"🔥 Preloading in background: {', '.join(pending)}")
+        asyncio.create_task(asyncio.to_thread(model_registry.preload, pending))
+    
+    # Idle and over-quota recording sessions are finalized as regular processing jobs
+    asyncio.create_task(session_reaper.run())
 
 # API Endpoints
 
@@ -186,6 +235,15 @@ initialize_sample_data()
 async def root():
     return {"message": "Legacy Interview API", "status": "running"}
 
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 503 until every PRELOAD_MODELS component is warm"""
+    body = {
+        "ready": model_registry.ready,
+        "components": model_registry.status()
+    }
+    return JSONResponse(status_code=200 if body["ready"] else 503, content=body)
+
 @app.get("/api/projects/list")
 async def list_projects():
     """List all projects"""
@@ -700,14 +758,23 @@ async def start_conversation_recording(request: ConversationSessionRequest):
         session_id = await conversation_recording_service.start_recording_session(
             project_id=request.project_id,
             session_name=request.session_name,
-            participants=request.participants
+            participants=request.participants,
+            processing_mode=request.processing_mode,
+            input_format=request.input_format,
+            live_transcription=request.live_transcription
         )
         
+        live = conversation_recording_service.live_transcriber(session_id) is not None
         return {
             "session_id": session_id,
             "status": "started",
+            "live_events_url": f"/conversation/session/{session_id}/live" if live else None,
             "message": "Conversation recording session started"
         }
+    except RecordingLimitError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start recording: {str(e)}")
 
@@ -723,13 +790,74 @@ async def process_audio_chunk(request: AudioChunkRequest):
         result = await conversation_recording_service.process_audio_chunk(
             session_id=request.session_id,
             audio_data=audio_data,
-            sample_rate=request.sample_rate
+            sample_rate=request.sample_rate,
+            channels=request.channels,
+            sample_format=request.sample_format
         )
         
         return result
+    except RecordingLimitError as e:
+        # 429: worker is saturated, retry after the given delay; 413: session quota used up; 410: session ended
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process audio: {str(e)}")
 
+@app.websocket("/conversation/{session_id}/stream")
+async def stream_conversation_audio(
+    websocket: WebSocket,
+    session_id: str,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    sample_format: str = "s16le"
+):
+    """Stream raw binary audio frames into a recording session.
+
+    Each binary message is one audio chunk. The server replies with periodic
+    JSON acks ({"type": "ack", "chunks_written": ...}) and stops reading while
+    its ingest queue is full, so clients should watch `bufferedAmount`.
+    Send the text message "end" (or just close the socket) when done.
+    """
+    await websocket.accept()
+    
+    if not conversation_recording_service.has_session(session_id):
+        await websocket.send_json({"type": "error", "message": f"Session {session_id} not found"})
+        await websocket.close(code=4404)
+        return
+    
+    ingest = AudioStreamIngest(
+        conversation_recording_service,
+        session_id,
+        send_message=websocket.send_json,
+        sample_rate=sample_rate,
+        channels=channels,
+        sample_format=sample_format
+    )
+    ingest.start()
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes") is not None:
+                await ingest.feed(message["bytes"])
+            elif message.get("text") == "end":
+                break
+    except WebSocketDisconnect:
+        pass
+    except RuntimeError as e:
+        # Raised by feed() once the writer has reported an error to the client
+        print(f"⚠️ Audio stream for session {session_id} stopped: {e}")
+    finally:
+        stats = await ingest.close()
+    
+    try:
+        await websocket.send_json({"type": "closed", **stats})
+        await websocket.close()
+    except Exception:
+        pass  # Client already disconnected
+
 @app.post("/conversation/transcribe")
 async def transcribe_utterance(request: TranscriptionRequest):
     """Transcribe a specific utterance with speaker identification"""
@@ -744,73 +872,241 @@ async def transcribe_utterance(request: TranscriptionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to transcribe: {str(e)}")
 
-@app.post("/conversation/end/{session_id}")
+@app.post("/conversation/end/{session_id}", status_code=202)
 async def end_conversation_recording(session_id: str):
-    """End conversation recording session and save all data"""
-    try:
-        result = await conversation_recording_service.end_recording_session(session_id)
+    """End conversation recording session and process it in the background.
+
+    Diarization and transcription take minutes for long recordings, so this
+    returns a job right away. Poll `status_url` (or stream `events_url`) until
+    the job is completed; its result holds the saved file paths.
+    """
+    # A repeated end request attaches to the job that is already running
+    job = processing_job_manager.find_for_session(session_id)
+    if job is None or job.status == JOB_FAILED:
+        if not conversation_recording_service.has_session(session_id):
+            raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
         
-        return {
-            "session_id": session_id,
-            "status": "completed",
-            "audio_file_path": result.get('audio_file_path'),
-            "transcription_file_path": result.get('transcription_file_path'),
-            "utterance_count": len(result.get('utterances', [])),
-            "message": "Conversation recording session ended and saved"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to end recording: {str(e)}")
+        job = processing_job_manager.submit(
+            session_id,
+            lambda progress: conversation_recording_service.end_recording_session(session_id, progress=progress)
+        )
+    
+    return {
+        "session_id": session_id,
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/conversation/jobs/{job.job_id}",
+        "events_url": f"/conversation/jobs/{job.job_id}/events",
+        "message": "Conversation recording session ended; processing started"
+    }
+
+@app.get("/conversation/jobs/{job_id}")
+async def get_processing_job(job_id: str):
+    """Get status, per-stage progress and (when finished) the result of a processing job"""
+    status = await asyncio.to_thread(processing_job_manager.status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return status
+
+@app.get("/conversation/jobs/{job_id}/events")
+async def stream_processing_job(job_id: str):
+    """
+    Server-sent events for a processing job: `status`, `stage` updates and a final `done`.
+    On a worker other than the one running the job, updates arrive as `status` events.
+    """
+    events = processing_job_manager.subscribe(job_id)
+    if events is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                if event['event'] == 'done':
+                    break
+        finally:
+            processing_job_manager.unsubscribe(job_id, events)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@app.get("/conversation/session/{session_id}/live")
+async def stream_live_transcript(session_id: str):
+    """
+    Server-sent events of a session's live transcript: a `snapshot`, then `final` utterances
+    and the current `partial` tail as they are transcribed, and `done` when the session ends.
+    Served by the worker that started the session.
+    """
+    live = conversation_recording_service.live_transcriber(session_id)
+    if live is None:
+        raise HTTPException(status_code=404, detail="No live transcript for this session")
+    
+    async def event_stream():
+        events = live.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                if event['event'] == 'done':
+                    break
+        finally:
+            live.unsubscribe(events)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.get("/conversation/sessions/{project_id}")
-async def get_conversation_sessions(project_id: str):
-    """Get all conversation sessions for a project"""
+async def get_conversation_sessions(project_id: str, limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Conversation sessions of a project, newest first; pass next_cursor back as ?cursor= for the next page"""
     try:
-        # This would query the database for conversation sessions
-        # For now, return mock data
-        return {
-            "project_id": project_id,
-            "sessions": [
-                {
-                    "id": "session_1",
-                    "session_name": "Initial Interview",
-                    "status": "completed",
-                    "started_at": "2024-01-01T10:00:00Z",
-                    "ended_at": "2024-01-01T11:00:00Z",
-                    "utterance_count": 45,
-                    "participants": ["Interviewer", "Subject"]
-                }
-            ]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get sessions: {str(e)}")
+        result = await asyncio.to_thread(db_service.list_conversation_sessions, project_id, limit, cursor)
+        if result is None:
+            # No database: read the processed sessions' transcription.json files
+            saved = await asyncio.to_thread(conversation_recording_service.list_saved_sessions, project_id)
+            sessions, next_cursor = page_sessions(saved, limit, cursor)
+            result = {"sessions": sessions, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"project_id": project_id, **result}
+
+def _session_dir(session_id: str):
+    """Recording directory for a session id (ids are UUIDs, never paths)"""
+    try:
+        uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return conversation_recording_service.storage_path / session_id
+
+@app.get("/conversation/session/{session_id}/audio")
+async def get_conversation_audio(session_id: str, format: Optional[str] = None):
+    """Session recording: the compressed archive by default, or ?format=wav decoded on demand"""
+    session_dir = _session_dir(session_id)
+    archive_path = find_archive(session_dir)
+    working_copy = session_dir / WORKING_COPY_NAME
+    
+    if format == "wav" or archive_path is None:
+        if working_copy.exists():
+            return FileResponse(working_copy, media_type="audio/wav")
+        if archive_path is None:
+            raise HTTPException(status_code=404, detail="Recording not found")
+        # Decoded while it is sent; no working copy is left behind on disk
+        return StreamingResponse(stream_wav(archive_path), media_type="audio/wav")
+    
+    media_type = "audio/flac" if archive_path.suffix == ".flac" else "audio/ogg"
+    return FileResponse(archive_path, media_type=media_type)
+
+@app.get("/conversation/session/{session_id}/utterances/{utterance_id}/audio")
+async def get_utterance_audio(session_id: str, utterance_id: str, request: Request):
+    """One utterance as a WAV, honouring Range requests so players can seek without a full download"""
+    session_dir = _session_dir(session_id)
+    try:
+        segment = await asyncio.to_thread(open_segment_audio, session_dir, utterance_id)
+    except (FileNotFoundError, KeyError):
+        raise HTTPException(status_code=404, detail="Utterance audio not found")
+    
+    try:
+        byte_range = parse_range(request.headers.get("range"), segment.size)
+    except ValueError:
+        segment.close()
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{segment.size}"})
+    
+    # Streamed in chunks read off the event loop; the recording is released once sent
+    start, end = byte_range or (0, segment.size)
+    headers = {"Accept-Ranges": "bytes", "Content-Length": str(end - start)}
+    status_code = 200
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{segment.size}"
+        status_code = 206
+    return StreamingResponse(
+        segment.iter_range(start, end),
+        status_code=status_code,
+        media_type="audio/wav",
+        headers=headers,
+        background=BackgroundTask(segment.close)
+    )
 
 @app.get("/conversation/session/{session_id}/transcript")
-async def get_conversation_transcript(session_id: str):
-    """Get full conversation transcript with speaker separation"""
+async def get_conversation_transcript(
+    session_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    speaker_id: Optional[str] = None,
+    from_ms: Optional[int] = None,
+    to_ms: Optional[int] = None
+):
+    """
+    One page of a session's transcript in recording order.
+    Filter by speaker_id and by a [from_ms, to_ms) window; pass next_cursor back as ?cursor= for the next page.
+    """
+    _session_dir(session_id)
     try:
-        # This would load the transcription from the database
-        # For now, return mock data
-        return {
-            "session_id": session_id,
-            "transcript": [
-                {
-                    "speaker": "Interviewer",
-                    "text": "Hello, thank you for agreeing to this interview.",
-                    "timestamp": "00:00:00",
-                    "confidence": "0.95"
-                },
-                {
-                    "speaker": "Subject",
-                    "text": "You're welcome, I'm happy to share my story.",
-                    "timestamp": "00:00:05",
-                    "confidence": "0.92"
-                }
-            ],
-            "participants": ["Interviewer", "Subject"],
-            "duration": "01:00:00"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get transcript: {str(e)}")
+        result = await asyncio.to_thread(
+            db_service.get_conversation_transcript, session_id, limit, cursor, speaker_id, from_ms, to_ms
+        )
+        if result is None:
+            saved = await asyncio.to_thread(conversation_recording_service.load_saved_transcription, session_id)
+            if saved is None:
+                raise HTTPException(status_code=404, detail="Transcript not found")
+            rows = utterance_rows(saved.get("utterances", []))
+            utterances, next_cursor = page_utterances(rows, limit, cursor, speaker_id, from_ms, to_ms)
+            session = {
+                "participants": saved.get("participants", []),
+                "duration": max((row["end_ms"] for row in rows), default=0)
+            }
+            result = {"session": session, "utterances": utterances, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "session_id": session_id,
+        "transcript": [transcript_entry(row) for row in result["utterances"]],
+        "participants": result["session"].get("participants", []),
+        "duration": format_clock(result["session"].get("duration") or 0),
+        "next_cursor": result["next_cursor"]
+    }
+
+@app.get("/conversation/session/{session_id}/speaker-at")
+async def get_speaker_at(session_id: str, ms: int):
+    """Who was speaking at a playback position (milliseconds), and the utterance under it"""
+    _session_dir(session_id)
+    index = await asyncio.to_thread(conversation_recording_service.turn_index, session_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    
+    utterance = index.at(ms)
+    return {
+        "session_id": session_id,
+        "ms": ms,
+        "speaker_id": utterance.get("speaker_id") if utterance else None,
+        "utterance": transcript_entry(utterance) if utterance else None
+    }
+
+@app.get("/conversation/search/{project_id}")
+async def search_conversations(project_id: str, q: str, limit: Optional[int] = None):
+    """
+    Where a phrase was said across a project's sessions.
+    Exact phrase hits come first, then passages containing every word; each hit has start_ms/end_ms to seek to.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Empty query")
+    hits = await asyncio.to_thread(
+        conversation_recording_service.search_words, project_id, q, clamp_limit(limit, WORD_SEARCH_LIMIT)
+    )
+    return {
+        "project_id": project_id,
+        "query": q,
+        "hits": hits
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,168 @@
+"""
+Audio Archive - compressed long-term copy of each session recording
+Stream-encodes FLAC (lossless) or Ogg/Opus while audio arrives and decodes it back on demand
+"""
+import os
+import uuid
+import logging
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+import soundfile as sf
+
+from .audio_spool import AudioSpool, build_wav_header
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FORMAT_FLAC = 'flac'
+ARCHIVE_FORMAT_OPUS = 'opus'
+# Keep only the uncompressed WAV (no archive copy)
+ARCHIVE_FORMAT_WAV = 'wav'
+ARCHIVE_FORMAT = os.getenv('RECORDING_ARCHIVE_FORMAT', ARCHIVE_FORMAT_FLAC).lower()
+
+# format -> (file suffix, libsndfile container, subtype)
+_ARCHIVE_CODECS = {
+    ARCHIVE_FORMAT_FLAC: ('.flac', 'FLAC', 'PCM_16'),
+    ARCHIVE_FORMAT_OPUS: ('.opus', 'OGG', 'OPUS'),
+}
+ARCHIVE_SUFFIXES = tuple(codec[0] for codec in _ARCHIVE_CODECS.values())
+
+WORKING_COPY_NAME = "complete_audio.wav"
+ARCHIVE_STEM = "complete_audio"
+# Frames decoded per block when restoring a working copy
+DECODE_BLOCK_FRAMES = 16000 * 30
+
+
+def resolve_archive_format(requested: Optional[str] = None) -> str:
+    """Archive format to use, falling back to FLAC when Opus is not supported by libsndfile"""
+    archive_format = (requested or ARCHIVE_FORMAT).lower()
+    if archive_format == ARCHIVE_FORMAT_WAV:
+        return archive_format
+    if archive_format not in _ARCHIVE_CODECS:
+        raise ValueError(f"Unknown archive format '{archive_format}' (expected flac, opus or wav)")
+    if archive_format == ARCHIVE_FORMAT_OPUS and 'OPUS' not in sf.available_subtypes('OGG'):
+        logger.warning("libsndfile has no Opus support - archiving as FLAC instead")
+        return ARCHIVE_FORMAT_FLAC
+    return archive_format
+
+
+class ArchiveEncoder:
+    """
+    Incremental encoder for the archive copy of a recording.
+
+    Receives the same 16-bit PCM that goes to the working spool and encodes
+    it block by block, so the compressed file is complete as soon as the
+    session ends - no separate encode pass over the recording.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        archive_format: str = ARCHIVE_FORMAT_FLAC,
+        sample_rate: int = 16000,
+        channels: int = 1
+    ):
+        suffix, container, subtype = _ARCHIVE_CODECS[archive_format]
+        self.path = Path(path).with_suffix(suffix)
+        self.archive_format = archive_format
+        self.channels = channels
+        self.frame_size = 2 * channels
+        self.frames_written = 0
+        self.closed = False
+        self._remainder = b''
+        # libsndfile only supports these rates for Opus; everything here is 16 kHz already
+        self._file = sf.SoundFile(
+            self.path, mode='w', samplerate=sample_rate, channels=channels,
+            format=container, subtype=subtype
+        )
+
+    def write(self, pcm: bytes):
+        """Encode raw int16 PCM (partial frames are carried to the next call)"""
+        if self.closed:
+            raise ValueError(f"Archive {self.path} is already closed")
+        if self._remainder:
+            pcm = self._remainder + pcm
+        usable = len(pcm) - len(pcm) % self.frame_size
+        self._remainder = pcm[usable:]
+        if usable:
+            samples = np.frombuffer(pcm, dtype='<i2', count=usable // 2).reshape(-1, self.channels)
+            self._file.write(samples)
+            self.frames_written += len(samples)
+
+    def close(self) -> Path:
+        """Finish the stream (idempotent)"""
+        if not self.closed:
+            self._file.close()
+            self.closed = True
+            logger.info(f"Archived {self.frames_written} frames to {self.path} ({self.path.stat().st_size} bytes)")
+        return self.path
+
+
+def find_archive(session_dir: Union[str, Path]) -> Optional[Path]:
+    """The session's compressed archive, if it has one"""
+    for suffix in ARCHIVE_SUFFIXES:
+        candidate = Path(session_dir) / f"{ARCHIVE_STEM}{suffix}"
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def decode_to_wav(archive_path: Union[str, Path], wav_path: Union[str, Path]) -> Path:
+    """Decode an archive to a 16-bit PCM WAV, block by block"""
+    wav_path = Path(wav_path)
+    # Unique per call, so concurrent decodes of the same archive never share a spool
+    partial_path = wav_path.with_name(f"{wav_path.stem}.{uuid.uuid4().hex}.partial")
+    with sf.SoundFile(archive_path) as archive:
+        spool = AudioSpool(partial_path, sample_rate=archive.samplerate, channels=archive.channels)
+        try:
+            for block in archive.blocks(blocksize=DECODE_BLOCK_FRAMES, dtype='int16', always_2d=True):
+                spool.append(block.tobytes())
+        except BaseException:
+            spool.finalize()
+            partial_path.unlink(missing_ok=True)
+            raise
+        spool.finalize()
+    # Readers never see a half-written working copy
+    os.replace(partial_path, wav_path)
+    return wav_path
+
+
+def stream_wav(archive_path: Union[str, Path]) -> Iterator[bytes]:
+    """
+    An archive as 16-bit PCM WAV bytes, decoded block by block as they are read.
+    Nothing is written to disk, and at most one block is held in memory.
+    """
+    with sf.SoundFile(archive_path) as archive:
+        yield build_wav_header(archive.frames * archive.channels * 2, archive.samplerate, archive.channels)
+        for block in archive.blocks(blocksize=DECODE_BLOCK_FRAMES, dtype='int16', always_2d=True):
+            yield block.tobytes()
+
+
+def encode_archive(wav_path: Union[str, Path], session_dir: Union[str, Path], archive_format: str) -> Path:
+    """Encode a finished working copy into the session's archive in one pass, block by block"""
+    partial_stem = Path(session_dir) / f"{ARCHIVE_STEM}_partial"
+    with sf.SoundFile(wav_path) as source:
+        archive = ArchiveEncoder(partial_stem, archive_format, sample_rate=source.samplerate, channels=source.channels)
+        try:
+            for block in source.blocks(blocksize=DECODE_BLOCK_FRAMES, dtype='int16', always_2d=True):
+                archive.write(block.tobytes())
+        finally:
+            archive.close()
+    # Replaces any incomplete archive a live encoder left behind
+    archive_path = Path(session_dir) / f"{ARCHIVE_STEM}{archive.path.suffix}"
+    os.replace(archive.path, archive_path)
+    return archive_path
+
+
+def ensure_working_copy(session_dir: Union[str, Path]) -> Path:
+    """PCM WAV for processing or slicing, decoding the archive if the working copy was released"""
+    wav_path = Path(session_dir) / WORKING_COPY_NAME
+    if wav_path.exists():
+        return wav_path
+
+    archive_path = find_archive(session_dir)
+    if archive_path is None:
+        raise FileNotFoundError(f"No recording found in {session_dir}")
+    logger.info(f"Decoding {archive_path} to a working copy")
+    return decode_to_wav(archive_path, wav_path)
@@ -0,0 +1,159 @@
+"""
+Audio Cuts - many clips out of one recording in a single pass
+Cut lists come from start-end ranges, an RTTM file or a session's transcription.json. PCM WAV
+is streamed once in order; other formats go through one ffmpeg run with an output per clip
+"""
+import re
+import json
+import wave
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .result_cache import parse_rttm
+from .stream_decoder import FFMPEG_BINARY
+from .transcript_query import utterance_rows
+
+# (start, end, label) in seconds; the label (speaker, utterance id) goes into the clip name
+Cut = Tuple[float, float, str]
+
+# Frames copied per read while streaming a WAV
+CHUNK_FRAMES = 65536
+
+
+def normalize_cuts(cuts: Sequence[Sequence]) -> List[Cut]:
+    """(start, end) or (start, end, label) items as Cut tuples"""
+    return [(float(cut[0]), float(cut[1]), str(cut[2]) if len(cut) > 2 else '') for cut in cuts]
+
+
+def parse_ranges(text: str) -> List[Cut]:
+    """Cuts from "10-30,45.5-60" (seconds)"""
+    cuts = []
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*-\s*(\d+(?:\.\d+)?)', item)
+        if match is None:
+            raise ValueError(f"Invalid range '{item}' (expected START-END in seconds)")
+        cuts.append((float(match.group(1)), float(match.group(2)), ''))
+    return cuts
+
+
+def load_cuts(path: Union[str, Path]) -> List[Cut]:
+    """One cut per RTTM turn (labelled by speaker) or per transcription.json utterance (by id)"""
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix.lower() == '.rttm':
+        return [(start, end, speaker) for start, end, speaker in parse_rttm(text)]
+    if path.suffix.lower() == '.json':
+        rows = utterance_rows(json.loads(text).get('utterances', []))
+        return [(row['start_ms'] / 1000, row['end_ms'] / 1000, str(row.get('id') or row.get('speaker_id') or '')) for row in rows]
+    raise ValueError(f"Unsupported cut list {path.name} (expected .rttm or transcription.json)")
+
+
+def read_cut_list(ranges: Optional[str] = None, cuts_file: Optional[str] = None) -> List[Cut]:
+    """Cuts given on the command line (--ranges) followed by those in a cut list file (--cuts)"""
+    cuts = parse_ranges(ranges) if ranges else []
+    if cuts_file:
+        cuts += load_cuts(cuts_file)
+    return cuts
+
+
+def validate_cuts(cuts: Sequence[Cut], duration: float):
+    """The single-range trim checks, for every cut"""
+    for index, (start, end, _) in enumerate(cuts):
+        if start < 0:
+            raise ValueError(f"Cut {index}: start time cannot be negative")
+        if end > duration:
+            raise ValueError(f"Cut {index}: end time ({end}s) exceeds file duration ({duration:.2f}s)")
+        if start >= end:
+            raise ValueError(f"Cut {index}: start time must be less than end time")
+
+
+def clip_paths(input_file: Union[str, Path], cuts: Sequence[Cut], output_dir: Optional[Union[str, Path]] = None, suffix: Optional[str] = None) -> List[Path]:
+    """<stem>_<index>[_<label>]<suffix> for each cut, in <output_dir> (default <stem>_clips next to the input)"""
+    input_file = Path(input_file)
+    output_dir = Path(output_dir) if output_dir else input_file.parent / f"{input_file.stem}_clips"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    suffix = suffix or input_file.suffix
+    paths = []
+    for index, (_, _, label) in enumerate(cuts):
+        label = re.sub(r'[^\w.-]', '_', label)
+        paths.append(output_dir / f"{input_file.stem}_{index:03d}{'_' + label if label else ''}{suffix}")
+    return paths
+
+
+def _open_clip(path: Union[str, Path], params) -> wave.Wave_write:
+    writer = wave.open(str(path), 'wb')
+    writer.setnchannels(params.nchannels)
+    writer.setsampwidth(params.sampwidth)
+    writer.setframerate(params.framerate)
+    return writer
+
+
+def write_wav_clips(input_file: Union[str, Path], cuts: Sequence[Cut], outputs: Sequence[Union[str, Path]]) -> List[str]:
+    """
+    Write every cut of a PCM WAV reading the source once, front to back.
+
+    The file is walked between consecutive cut boundaries; each stretch is
+    read once and written to every clip open over it, so overlapping turns
+    cost no extra reads and gaps between cuts are skipped by seeking.
+    """
+    with wave.open(str(input_file), 'rb') as source:
+        params = source.getparams()
+        rate, total = params.framerate, params.nframes
+        spans = [(min(int(start * rate), total), min(int(end * rate), total)) for start, end, _ in cuts]
+        order = sorted(range(len(spans)), key=lambda i: spans[i])
+        boundaries = sorted({frame for span in spans for frame in span})
+
+        writers = {}
+        next_cut = 0
+        position = None
+        try:
+            for lo, hi in zip(boundaries, boundaries[1:]):
+                for index in [i for i in writers if spans[i][1] <= lo]:
+                    writers.pop(index).close()
+                while next_cut < len(order) and spans[order[next_cut]][0] == lo:
+                    index = order[next_cut]
+                    next_cut += 1
+                    writer = _open_clip(outputs[index], params)
+                    if spans[index][1] > lo:
+                        writers[index] = writer
+                    else:
+                        writer.close()
+                if not writers:
+                    continue
+                if position != lo:
+                    source.setpos(lo)
+                for chunk_start in range(lo, hi, CHUNK_FRAMES):
+                    frames = source.readframes(min(CHUNK_FRAMES, hi - chunk_start))
+                    for writer in writers.values():
+                        writer.writeframes(frames)
+                position = hi
+        finally:
+            for writer in writers.values():
+                writer.close()
+        # Cuts that are empty once rounded to frames still get a (silent) file
+        for index in order[next_cut:]:
+            _open_clip(outputs[index], params).close()
+    return [str(path) for path in outputs]
+
+
+def ffmpeg_clip_command(input_file: Union[str, Path], cuts: Sequence[Cut], outputs: Sequence[Union[str, Path]], copy: bool = True) -> List[str]:
+    """
+    One ffmpeg run writing every clip: the input is opened and decoded once,
+    and each output keeps only its own [start, end) of the stream.
+    """
+    command = [FFMPEG_BINARY, '-y', '-i', str(input_file)]
+    for (start, end, _), output in zip(cuts, outputs):
+        command += ['-map', '0:a', '-ss', f"{start:.3f}", '-t', f"{end - start:.3f}"]
+        if copy:
+            command += ['-c', 'copy']
+        command.append(str(output))
+    return command
+
+
+def write_ffmpeg_clips(input_file: Union[str, Path], cuts: Sequence[Cut], outputs: Sequence[Union[str, Path]], copy: bool = True) -> List[str]:
+    try:
+        subprocess.run(ffmpeg_clip_command(input_file, cuts, outputs, copy), capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"FFmpeg failed: {e.stderr}")
+    return [str(path) for path in outputs]
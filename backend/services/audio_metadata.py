@@ -0,0 +1,160 @@
+"""
+Audio Metadata - duration, rate, channels and sample width from file headers
+Reads a few bytes of the WAV/FLAC header instead of decoding samples; ffprobe covers everything else
+"""
+import os
+import json
+import shutil
+import struct
+import logging
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+FFPROBE_BINARY = os.getenv('FFPROBE_BINARY', 'ffprobe')
+# Enough for the fmt chunk plus any LIST/bext chunks recorders put before the data
+WAV_PROBE_BYTES = 64 * 1024
+
+WAV_FORMAT_PCM = 1
+WAV_FORMAT_FLOAT = 3
+WAV_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def parse_wav_header(header: bytes) -> Tuple[int, int, int, int, int, int]:
+    """Walk RIFF chunks and return (format_tag, sample_rate, channels, sample_width, data_offset, data_size)"""
+    if header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        raise ValueError("Not a RIFF/WAVE file")
+
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(header):
+        chunk_id, chunk_size = struct.unpack_from('<4sI', header, pos)
+        body = pos + 8
+        if chunk_id == b'fmt ':
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from('<HHIIHH', header, body)
+            fmt = (format_tag, sample_rate, channels, bits // 8)
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data chunk appears before fmt chunk")
+            return fmt + (body, chunk_size)
+        pos = body + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV data chunk not found")
+
+
+def _wav_metadata(path: Path, file_size: int) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        header = f.read(WAV_PROBE_BYTES)
+    format_tag, sample_rate, channels, sample_width, data_offset, data_size = parse_wav_header(header)
+    if sample_rate <= 0 or channels <= 0 or sample_width <= 0:
+        raise ValueError(f"Invalid WAV header in {path}")
+
+    # Files still being spooled carry a placeholder size; the bytes on disk are the truth
+    data_size = min(data_size, file_size - data_offset)
+    frames = data_size // (channels * sample_width)
+    return {
+        'format': 'wav',
+        'codec': 'pcm_float' if format_tag == WAV_FORMAT_FLOAT else 'pcm',
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'sample_width': sample_width,
+        'frames': frames,
+        'duration': frames / sample_rate
+    }
+
+
+def _flac_metadata(path: Path) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        header = f.read(42)
+    # "fLaC", then the mandatory STREAMINFO block (type 0, 34 bytes)
+    if len(header) < 42 or header[:4] != b'fLaC' or header[4] & 0x7F != 0:
+        raise ValueError(f"Invalid FLAC header in {path}")
+
+    # 20 bits sample rate | 3 bits channels-1 | 5 bits bits-per-sample-1 | 36 bits total samples
+    packed = int.from_bytes(header[18:26], 'big')
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits = ((packed >> 36) & 0x1F) + 1
+    frames = packed & 0xFFFFFFFFF
+    if sample_rate == 0 or frames == 0:
+        # Encoder never went back to fill in the total; let ffprobe work it out
+        raise ValueError(f"FLAC header in {path} has no sample count")
+    return {
+        'format': 'flac',
+        'codec': 'flac',
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'sample_width': (bits + 7) // 8,
+        'frames': frames,
+        'duration': frames / sample_rate
+    }
+
+
+def _ffprobe_metadata(path: Path) -> Dict[str, Any]:
+    if shutil.which(FFPROBE_BINARY) is None:
+        raise ValueError(f"Cannot read {path.suffix or 'unknown'} audio headers without {FFPROBE_BINARY}")
+    command = [
+        FFPROBE_BINARY, '-v', 'quiet', '-print_format', 'json',
+        '-show_format', '-show_streams', '-select_streams', 'a:0',
+        str(path)
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ValueError(f"ffprobe could not read {path}")
+
+    probe = json.loads(result.stdout)
+    format_info = probe.get('format', {})
+    streams = probe.get('streams') or [{}]
+    stream = streams[0]
+
+    sample_rate = int(stream.get('sample_rate', 0))
+    duration = float(stream.get('duration') or format_info.get('duration') or 0.0)
+    bits = int(stream.get('bits_per_raw_sample') or stream.get('bits_per_sample') or 0)
+    return {
+        'format': format_info.get('format_name', 'unknown'),
+        'codec': stream.get('codec_name', 'unknown'),
+        'sample_rate': sample_rate,
+        'channels': int(stream.get('channels', 0)),
+        # Lossy codecs have no fixed sample width
+        'sample_width': bits // 8 if bits else None,
+        'frames': int(round(duration * sample_rate)),
+        'duration': duration,
+        'bitrate': int(format_info.get('bit_rate', 0))
+    }
+
+
+def read_audio_metadata(audio_file_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Duration and stream layout of an audio file without decoding it.
+
+    WAV and FLAC are parsed from their headers directly; anything else (or
+    a header that does not say enough) is handed to ffprobe. Raises
+    ValueError when the file cannot be read as audio.
+    """
+    path = Path(audio_file_path)
+    file_size = path.stat().st_size
+    with open(path, 'rb') as f:
+        magic = f.read(12)
+
+    metadata = None
+    try:
+        if magic[:4] == b'RIFF' and magic[8:12] == b'WAVE':
+            metadata = _wav_metadata(path, file_size)
+        elif magic[:4] == b'fLaC':
+            metadata = _flac_metadata(path)
+    except (ValueError, struct.error) as e:
+        logger.debug(f"Header parse failed for {path}, trying ffprobe: {e}")
+    if metadata is None:
+        metadata = _ffprobe_metadata(path)
+
+    metadata['size'] = file_size
+    if not metadata.get('bitrate'):
+        metadata['bitrate'] = int(file_size * 8 / metadata['duration']) if metadata['duration'] else 0
+    return metadata
+
+
+def get_audio_duration(audio_file_path: Union[str, Path]) -> float:
+    """Duration in seconds, from the file header"""
+    return read_audio_metadata(audio_file_path)['duration']
@@ -0,0 +1,194 @@
+"""
+Audio Normalizer - streaming resampling, sample-format conversion and downmix
+Turns whatever PCM a client sends into the 16 kHz mono int16 that diarization and Whisper expect
+"""
+import math
+import logging
+from typing import Dict, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+
+# Client sample format -> (numpy dtype, scale to [-1, 1])
+SAMPLE_FORMATS: Dict[str, Tuple[np.dtype, float]] = {
+    's16le': (np.dtype('<i2'), 32768.0),
+    's32le': (np.dtype('<i4'), 2147483648.0),
+    'f32le': (np.dtype('<f4'), 1.0),
+}
+
+# Filter quality: zero crossings of the windowed sinc on each side
+RESAMPLER_ZERO_CROSSINGS = 16
+RESAMPLER_KAISER_BETA = 8.0
+
+
+def pcm_to_float(data: bytes, sample_format: str, channels: int) -> np.ndarray:
+    """Interleaved PCM bytes -> float32 array of shape (frames, channels)"""
+    dtype, scale = SAMPLE_FORMATS[sample_format]
+    samples = np.frombuffer(data, dtype=dtype).reshape(-1, channels)
+    if scale == 1.0:
+        return samples.astype(np.float32)
+    return samples.astype(np.float32) / np.float32(scale)
+
+
+def float_to_int16(samples: np.ndarray) -> bytes:
+    """Float samples in [-1, 1] -> int16 PCM bytes, clipping overs"""
+    return (np.clip(samples, -1.0, 32767.0 / 32768.0) * 32768.0).astype('<i2').tobytes()
+
+
+def downmix(frames: np.ndarray) -> np.ndarray:
+    """(frames, channels) -> mono"""
+    if frames.shape[1] == 1:
+        return frames[:, 0]
+    return frames.mean(axis=1, dtype=np.float32)
+
+
+def design_lowpass(up: int, down: int) -> np.ndarray:
+    """Kaiser-windowed sinc anti-aliasing filter for an up/down rational resampler"""
+    factor = max(up, down)
+    half_length = RESAMPLER_ZERO_CROSSINGS * factor
+    n = np.arange(-half_length, half_length + 1, dtype=np.float64)
+    cutoff = 1.0 / factor
+    taps = cutoff * np.sinc(cutoff * n) * np.kaiser(len(n), RESAMPLER_KAISER_BETA)
+    # Gain of `up` makes up for the zeros stuffed between input samples
+    return taps * up / taps.sum()
+
+
+class StreamingResampler:
+    """
+    Polyphase rational resampler that keeps its state across chunks.
+
+    Output sample m is sum_i x[i] * h[m*down - i*up + delay]; only the taps
+    of one polyphase branch touch real (non-stuffed) samples, so each output
+    is a `taps_per_phase` dot product. A chunk's outputs are computed together
+    as one gathered (outputs x taps) matrix. Input history is carried over, so
+    chunked output equals resampling the whole signal at once.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int = TARGET_SAMPLE_RATE):
+        divisor = math.gcd(in_rate, out_rate)
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+
+        taps = design_lowpass(self.up, self.down)
+        # Centre the filter so output m lines up with input time m * in_rate / out_rate
+        self.delay = (len(taps) - 1) // 2
+        self.taps_per_phase = -(-len(taps) // self.up)
+        padded = np.zeros(self.taps_per_phase * self.up)
+        padded[:len(taps)] = taps
+        # phases[p, t] = h[p + t*up]
+        self.phases = padded.reshape(self.taps_per_phase, self.up).T.astype(np.float32)
+
+        self.inputs_seen = 0
+        self.outputs_emitted = 0
+        # Input history; _buffer[0] holds absolute input index _buffer_start (negative = zero padding)
+        self._buffer = np.zeros(self.taps_per_phase, dtype=np.float32)
+        self._buffer_start = -self.taps_per_phase
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample one chunk of mono float samples"""
+        if self.passthrough:
+            return samples
+        self._buffer = np.concatenate((self._buffer, samples.astype(np.float32, copy=False)))
+        self.inputs_seen += len(samples)
+        # Output m needs inputs up to (m*down + delay) // up
+        available = (self.inputs_seen * self.up - 1 - self.delay) // self.down + 1
+        return self._emit(max(available, self.outputs_emitted))
+
+    def flush(self) -> np.ndarray:
+        """Emit the tail once the stream has ended"""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self.inputs_seen * self.up // self.down)
+        # Zeros stand in for the inputs after the end of the stream
+        self._buffer = np.concatenate((self._buffer, np.zeros(self.taps_per_phase + 1, dtype=np.float32)))
+        return self._emit(max(total, self.outputs_emitted))
+
+    def _emit(self, end: int) -> np.ndarray:
+        outputs = np.arange(self.outputs_emitted, end, dtype=np.int64)
+        if len(outputs) == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        position = outputs * self.down + self.delay
+        phase = position % self.up
+        newest = position // self.up - self._buffer_start
+        # (outputs x taps) window of inputs, newest first, weighted by each output's branch
+        index = newest[:, None] - np.arange(self.taps_per_phase)[None, :]
+        result = np.einsum('ij,ij->i', self._buffer[index], self.phases[phase])
+
+        self.outputs_emitted = end
+        # Keep only the history the next output can reach
+        next_newest = (end * self.down + self.delay) // self.up
+        keep_from = max(0, next_newest - self.taps_per_phase + 1 - self._buffer_start)
+        keep_from = min(keep_from, len(self._buffer))
+        self._buffer = self._buffer[keep_from:]
+        self._buffer_start += keep_from
+        return result.astype(np.float32)
+
+
+class AudioNormalizer:
+    """
+    Per-session converter from client PCM to 16 kHz mono int16.
+
+    Chunks may split frames anywhere; the partial frame is carried to the
+    next call along with the resampler state, so no second pass over the
+    finished file is ever needed.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        channels: int = 1,
+        sample_format: str = 's16le',
+        target_rate: int = TARGET_SAMPLE_RATE
+    ):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format '{sample_format}' (expected one of {', '.join(SAMPLE_FORMATS)})")
+        if sample_rate <= 0 or channels <= 0:
+            raise ValueError(f"Invalid audio parameters: {sample_rate} Hz, {channels} channels")
+
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.frame_size = SAMPLE_FORMATS[sample_format][0].itemsize * channels
+        self.resampler = StreamingResampler(sample_rate, target_rate)
+        self._remainder = b''
+
+    @property
+    def passthrough(self) -> bool:
+        """Input is already 16 kHz mono int16"""
+        return self.resampler.passthrough and self.channels == 1 and self.sample_format == 's16le'
+
+    def matches(self, sample_rate: int, channels: int, sample_format: str) -> bool:
+        return (sample_rate, channels, sample_format) == (self.sample_rate, self.channels, self.sample_format)
+
+    def process(self, data: bytes) -> bytes:
+        """Convert one chunk; may return less (or more) audio than it received"""
+        if self.passthrough:
+            return data
+
+        data = self._remainder + data
+        usable = len(data) - len(data) % self.frame_size
+        self._remainder = data[usable:]
+        if not usable:
+            return b''
+
+        mono = downmix(pcm_to_float(data[:usable], self.sample_format, self.channels))
+        return float_to_int16(self.resampler.process(mono))
+
+    def flush(self) -> bytes:
+        """Remaining resampled audio at end of stream"""
+        if self.passthrough:
+            return b''
+        if self._remainder:
+            logger.warning(f"Dropping {len(self._remainder)} trailing bytes (partial frame)")
+            self._remainder = b''
+        return float_to_int16(self.resampler.flush())
@@ -0,0 +1,96 @@
+"""
+Audio Slicing - cut time ranges out of PCM WAV recordings without decoding the file
+Uses mmap so only the pages covering a segment are ever read
+"""
+import io
+import mmap
+import logging
+from pathlib import Path
+from typing import Union, Tuple
+
+from .audio_spool import build_wav_header
+from .audio_metadata import WAV_FORMAT_EXTENSIBLE, WAV_FORMAT_PCM, parse_wav_header
+
+logger = logging.getLogger(__name__)
+
+# Whisper rejects clips shorter than 0.1s; pad segments a little on both sides
+DEFAULT_SEGMENT_PADDING = 0.1
+
+
+def _find_pcm_data(header: bytes) -> Tuple[int, int, int, int, int]:
+    """(sample_rate, channels, sample_width, data_offset, data_size) of an integer PCM WAV"""
+    format_tag, *layout = parse_wav_header(header)
+    if format_tag not in (WAV_FORMAT_PCM, WAV_FORMAT_EXTENSIBLE):
+        raise ValueError(f"Unsupported WAV encoding (format tag {format_tag}); expected PCM")
+    return tuple(layout)
+
+
+class PCMAudioReader:
+    """Memory-mapped reader for slicing PCM WAV files by time"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        (self.sample_rate, self.channels, self.sample_width,
+         self.data_offset, data_size) = _find_pcm_data(self._mmap[:4096])
+        self.frame_size = self.channels * self.sample_width
+        # Spooled files still being written carry a placeholder size
+        available = len(self._mmap) - self.data_offset
+        self.data_size = min(data_size, available) - (min(data_size, available) % self.frame_size)
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.data_size / (self.sample_rate * self.frame_size)
+
+    def byte_range(self, start_time: float, end_time: float) -> Tuple[int, int]:
+        """Absolute file byte range [start, end) covering a time range, frame aligned"""
+        start_frame = max(0, int(start_time * self.sample_rate))
+        end_frame = max(start_frame, int(round(end_time * self.sample_rate)))
+        start = min(start_frame * self.frame_size, self.data_size)
+        end = min(end_frame * self.frame_size, self.data_size)
+        return self.data_offset + start, self.data_offset + end
+
+    @property
+    def frame_count(self) -> int:
+        return self.data_size // self.frame_size
+
+    def read_pcm(self, start_time: float, end_time: float) -> bytes:
+        """Raw PCM bytes for a time range"""
+        start, end = self.byte_range(start_time, end_time)
+        return self._mmap[start:end]
+
+    def read_frames(self, start_frame: int, end_frame: int) -> bytes:
+        """Raw PCM bytes for a range of sample frames"""
+        start = self.data_offset + min(max(0, start_frame) * self.frame_size, self.data_size)
+        end = self.data_offset + min(max(0, end_frame) * self.frame_size, self.data_size)
+        return self._mmap[start:max(start, end)]
+
+    def read_bytes(self, start: int, end: int) -> bytes:
+        """Absolute file bytes [start, end), clamped to the data chunk"""
+        data_end = self.data_offset + self.data_size
+        start = min(max(start, self.data_offset), data_end)
+        return self._mmap[start:max(start, min(end, data_end))]
+
+    def segment_wav(self, start_time: float, end_time: float, padding: float = DEFAULT_SEGMENT_PADDING) -> bytes:
+        """Small standalone WAV file for one segment, suitable for upload"""
+        pcm = self.read_pcm(max(0.0, start_time - padding), end_time + padding)
+        buffer = io.BytesIO()
+        buffer.write(build_wav_header(len(pcm), self.sample_rate, self.channels, self.sample_width))
+        buffer.write(pcm)
+        return buffer.getvalue()
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,126 @@
+"""
+Audio Spool - append-only on-disk PCM storage for recording sessions
+Keeps per-session memory constant regardless of recording length
+"""
+import os
+import struct
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+WAV_HEADER_SIZE = 44
+# Placeholder size used while the file is still growing ("streaming WAV")
+_UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def build_wav_header(data_bytes: int, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Build a canonical 44-byte PCM WAV header"""
+    byte_rate = sample_rate * channels * sample_width
+    block_align = channels * sample_width
+    riff_size = _UNKNOWN_SIZE if data_bytes == _UNKNOWN_SIZE else 36 + data_bytes
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', riff_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, byte_rate, block_align, sample_width * 8,
+        b'data', data_bytes
+    )
+
+
+class AudioSpool:
+    """
+    Append-only WAV file for one recording session.
+
+    Chunks are written straight to disk behind a placeholder header; the RIFF
+    and data sizes are patched in `finalize()`, so the finished file is a
+    regular WAV without ever holding the recording in memory.
+
+    Passing `resume_bytes` reopens a spool that another process (or a run
+    that crashed) was writing and continues after that many data bytes.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        sample_rate: int = 16000,
+        channels: int = 1,
+        sample_width: int = 2,
+        resume_bytes: Optional[int] = None,
+        chunk_count: int = 0
+    ):
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_size = channels * sample_width
+
+        self.data_bytes = 0
+        self.chunk_count = 0
+        self.closed = False
+        # Trailing partial frame from the previous chunk
+        self._remainder = b''
+
+        if resume_bytes is None:
+            self._file = open(self.path, 'wb')
+            self._file.write(build_wav_header(_UNKNOWN_SIZE, sample_rate, channels, sample_width))
+        else:
+            self._file = open(self.path, 'r+b')
+            # Bytes past the last recorded chunk are a torn write; never trust more than is on disk
+            available = max(0, os.fstat(self._file.fileno()).st_size - WAV_HEADER_SIZE)
+            self.data_bytes = min(resume_bytes, available - available % self.frame_size)
+            self.chunk_count = chunk_count
+            self._file.truncate(WAV_HEADER_SIZE + self.data_bytes)
+            self._file.seek(0, os.SEEK_END)
+
+    @property
+    def duration_seconds(self) -> float:
+        """Duration of audio written so far"""
+        return self.data_bytes / (self.sample_rate * self.frame_size)
+
+    def append(self, audio_data: bytes) -> int:
+        """Append raw PCM bytes, returning the data offset the chunk starts at"""
+        if self.closed:
+            raise ValueError(f"Audio spool {self.path} is already finalized")
+
+        offset = self.data_bytes
+        if self._remainder:
+            audio_data = self._remainder + audio_data
+
+        # Only whole frames go to disk so samples never straddle chunk boundaries
+        usable = len(audio_data) - (len(audio_data) % self.frame_size)
+        self._remainder = audio_data[usable:]
+        if usable:
+            self._file.write(memoryview(audio_data)[:usable])
+            self.data_bytes += usable
+
+        self.chunk_count += 1
+        return offset
+
+    def flush(self):
+        """Push buffered chunks to the OS so readers can see them"""
+        if not self.closed:
+            self._file.flush()
+
+    def detach(self):
+        """Close the file without finalizing, leaving it for another writer"""
+        if not self.closed:
+            self._file.close()
+            self.closed = True
+
+    def finalize(self) -> Path:
+        """Patch the WAV header with the final sizes and close the file"""
+        if self.closed:
+            return self.path
+
+        if self._remainder:
+            logger.warning(f"Dropping {len(self._remainder)} trailing bytes (partial frame) from {self.path}")
+            self._remainder = b''
+
+        self._file.seek(0)
+        self._file.write(build_wav_header(self.data_bytes, self.sample_rate, self.channels, self.sample_width))
+        self._file.close()
+        self.closed = True
+
+        logger.info(f"Finalized audio spool {self.path} ({self.duration_seconds:.1f}s)")
+        return self.path
@@ -0,0 +1,158 @@
+"""
+Audio Stream Ingest - feeds binary WebSocket frames into the recording service
+Bounded queue between the socket reader and the chunk writer gives backpressure
+"""
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+from .session_limits import RecordingLimitError
+
+logger = logging.getLogger(__name__)
+
+# Frames buffered per connection before the reader stops pulling from the socket
+DEFAULT_QUEUE_CHUNKS = int(os.getenv("AUDIO_STREAM_QUEUE_CHUNKS", "32"))
+# Send an ack after this many chunks or this many seconds, whichever comes first
+DEFAULT_ACK_EVERY_CHUNKS = int(os.getenv("AUDIO_STREAM_ACK_CHUNKS", "10"))
+DEFAULT_ACK_INTERVAL = float(os.getenv("AUDIO_STREAM_ACK_INTERVAL", "2.0"))
+
+_END_OF_STREAM = None
+
+
+class AudioStreamIngest:
+    """
+    Per-connection ingest pipeline for live audio frames.
+
+    The socket reader calls `feed()` for every binary frame. Frames go through a
+    bounded asyncio queue to a single writer task that hands them to
+    `ConversationRecordingService.process_audio_chunk`. When the writer falls
+    behind, `feed()` blocks, the reader stops reading, and TCP flow control
+    pushes back on the browser instead of buffering audio in server memory.
+    """
+
+    def __init__(
+        self,
+        recording_service: Any,
+        session_id: str,
+        send_message: Callable[[Dict[str, Any]], Awaitable[None]],
+        sample_rate: int = 16000,
+        channels: int = 1,
+        sample_format: str = 's16le',
+        max_queued_chunks: int = DEFAULT_QUEUE_CHUNKS,
+        ack_every_chunks: int = DEFAULT_ACK_EVERY_CHUNKS,
+        ack_interval: float = DEFAULT_ACK_INTERVAL
+    ):
+        self.recording_service = recording_service
+        self.session_id = session_id
+        self.send_message = send_message
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.ack_every_chunks = max(1, ack_every_chunks)
+        self.ack_interval = ack_interval
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queued_chunks))
+        self.chunks_received = 0
+        self.chunks_written = 0
+        self.bytes_received = 0
+        self.bytes_written = 0
+        self.error: Optional[str] = None
+
+        self._chunks_since_ack = 0
+        self._last_ack_at = time.monotonic()
+        self._writer_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the writer task"""
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._write_loop())
+
+    async def feed(self, audio_data: bytes):
+        """Queue one binary frame, waiting while the queue is full"""
+        if self.error:
+            raise RuntimeError(self.error)
+        if not audio_data:
+            return
+
+        self.chunks_received += 1
+        self.bytes_received += len(audio_data)
+        await self.queue.put(audio_data)
+
+    async def close(self) -> Dict[str, Any]:
+        """Drain queued frames, stop the writer and return final counters"""
+        if self._writer_task is not None:
+            await self.queue.put(_END_OF_STREAM)
+            await self._writer_task
+            self._writer_task = None
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current ingest counters, also used as the ack payload"""
+        return {
+            'session_id': self.session_id,
+            'chunks_received': self.chunks_received,
+            'chunks_written': self.chunks_written,
+            'bytes_received': self.bytes_received,
+            'bytes_written': self.bytes_written,
+            'queued_chunks': self.queue.qsize()
+        }
+
+    async def _write_loop(self):
+        """Move frames from the queue into the recording service"""
+        while True:
+            audio_data = await self.queue.get()
+            if audio_data is _END_OF_STREAM:
+                break
+
+            if self.error:
+                # Keep draining so a blocked feed() can return and see the error
+                continue
+
+            result = await self._write_chunk(audio_data)
+
+            if 'error' in result:
+                self.error = result['error']
+                logger.error(f"Stream ingest for session {self.session_id} failed: {self.error}")
+                code = {'code': result['code']} if 'code' in result else {}
+                await self._send({'type': 'error', 'message': self.error, **code, **self.stats()})
+                continue
+
+            self.chunks_written += 1
+            self.bytes_written += len(audio_data)
+            self._chunks_since_ack += 1
+
+            now = time.monotonic()
+            if (self._chunks_since_ack >= self.ack_every_chunks
+                    or now - self._last_ack_at >= self.ack_interval):
+                await self._send({'type': 'ack', **self.stats()})
+                self._chunks_since_ack = 0
+                self._last_ack_at = now
+
+    async def _write_chunk(self, audio_data: bytes) -> Dict[str, Any]:
+        """Hand one frame to the service, waiting out 429 throttling instead of failing the stream"""
+        while True:
+            try:
+                return await self.recording_service.process_audio_chunk(
+                    session_id=self.session_id,
+                    audio_data=audio_data,
+                    sample_rate=self.sample_rate,
+                    channels=self.channels,
+                    sample_format=self.sample_format
+                )
+            except RecordingLimitError as e:
+                if e.status_code != 429:
+                    return {'error': str(e), 'code': e.status_code}
+                # Holding the frame keeps the queue full, which pushes back on the client
+                await self._send({'type': 'throttled', 'message': str(e), 'retry_after': e.retry_after, **self.stats()})
+                await asyncio.sleep(e.retry_after or 1)
+            except Exception as e:
+                return {'error': str(e)}
+
+    async def _send(self, message: Dict[str, Any]):
+        """Send a control message, ignoring a client that already went away"""
+        try:
+            await self.send_message(message)
+        except Exception as e:
+            logger.debug(f"Could not send stream message for session {self.session_id}: {e}")
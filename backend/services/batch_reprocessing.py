@@ -0,0 +1,285 @@
+"""
+Batch Reprocessing - re-diarize and re-transcribe stored recording sessions
+Spreads sessions over a process pool, checkpoints each one and skips outputs that are already current
+"""
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from . import voice_activity
+from . import fallback_diarizer
+from . import conversation_recording_service as recording_module
+from .audio_archive import WORKING_COPY_NAME, find_archive
+from .audio_metadata import read_audio_metadata
+from .diarization_pool import DIARIZATION_MODEL, DIARIZATION_START_METHOD, DiarizationPool, _init_worker
+from .session_store import SessionStore, create_session_store
+
+logger = logging.getLogger(__name__)
+
+# Bump when processing changes in a way the settings below do not capture
+PIPELINE_VERSION = 2
+REPROCESS_WORKERS = int(os.getenv('REPROCESS_WORKERS', str(max(1, (os.cpu_count() or 2) // 2))))
+CHECKPOINT_NAME = ".reprocess_checkpoint.jsonl"
+REPORT_NAME = "reprocess_report.json"
+
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+STATUS_SKIPPED = 'skipped'
+
+
+def recording_path(session_dir: Union[str, Path]) -> Optional[Path]:
+    """The file a session's audio lives in: the archive, else the PCM working copy"""
+    archive_path = find_archive(session_dir)
+    if archive_path is not None:
+        return archive_path
+    working_copy = Path(session_dir) / WORKING_COPY_NAME
+    return working_copy if working_copy.exists() else None
+
+
+def is_finalized(session_dir: Union[str, Path]) -> bool:
+    """Whether the session was ended and its transcription.json written"""
+    try:
+        with open(Path(session_dir) / "transcription.json") as f:
+            return bool(json.load(f).get('ended_at'))
+    except (OSError, ValueError):
+        return False
+
+
+def discover_sessions(
+    storage_path: Union[str, Path],
+    session_ids: Optional[Iterable[str]] = None,
+    session_store: Optional[SessionStore] = None
+) -> List[Path]:
+    """
+    Finished session directories under the storage path that hold a recording, in name order.
+
+    Sessions still in the session store are recording or being ended by an
+    API worker, and their complete_audio.wav is the live spool, so they are
+    left alone, as are sessions that never got a finalized transcription.json.
+    """
+    storage_path = Path(storage_path)
+    if session_ids:
+        candidates = [storage_path / session_id for session_id in session_ids]
+    else:
+        candidates = sorted(path for path in storage_path.iterdir() if path.is_dir())
+
+    store = session_store or create_session_store(storage_path)
+    try:
+        sessions = []
+        for path in candidates:
+            if not path.is_dir() or recording_path(path) is None:
+                continue
+            if store.get(path.name) is not None or not is_finalized(path):
+                logger.info(f"Skipping session {path.name}: still recording or not finalized")
+                continue
+            sessions.append(path)
+        return sessions
+    finally:
+        if session_store is None:
+            store.close()
+
+
+def processing_settings(processing_mode: Optional[str] = None) -> Dict[str, Any]:
+    """Everything configuration-wise that changes a session's output"""
+    diarizer = DIARIZATION_MODEL if DiarizationPool().available else fallback_diarizer.fallback_settings()
+    return {
+        'pipeline_version': PIPELINE_VERSION,
+        'processing_mode': processing_mode,
+        'diarizer': diarizer,
+        'transcription_model': recording_module.TRANSCRIPTION_MODEL if recording_module.OPENAI_AVAILABLE else None,
+        'vad': recording_module.VAD_ENABLED and {
+            'min_silence_ratio': recording_module.VAD_MIN_SILENCE_RATIO,
+            'frame_seconds': voice_activity.VAD_FRAME_SECONDS,
+            'high_margin_db': voice_activity.VAD_HIGH_MARGIN_DB,
+            'low_margin_db': voice_activity.VAD_LOW_MARGIN_DB,
+            'min_energy_db': voice_activity.VAD_MIN_ENERGY_DB,
+            'zcr_threshold': voice_activity.VAD_ZCR_THRESHOLD,
+            'min_speech_seconds': voice_activity.VAD_MIN_SPEECH_SECONDS,
+            'min_silence_seconds': voice_activity.VAD_MIN_SILENCE_SECONDS,
+            'padding_seconds': voice_activity.VAD_PADDING_SECONDS,
+        },
+    }
+
+
+def session_fingerprint(session_dir: Union[str, Path], settings: Dict[str, Any]) -> str:
+    """Hash of the processing settings and the recording file (name, size, mtime)"""
+    recording = recording_path(session_dir)
+    stat = recording.stat()
+    payload = {
+        'settings': settings,
+        'recording': [recording.name, stat.st_size, stat.st_mtime_ns],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def is_current(session_dir: Union[str, Path], fingerprint: str) -> bool:
+    """Whether transcription.json was already produced with this fingerprint"""
+    transcription_file_path = Path(session_dir) / "transcription.json"
+    if not transcription_file_path.exists():
+        return False
+    try:
+        with open(transcription_file_path) as f:
+            return json.load(f).get('processing_fingerprint') == fingerprint
+    except (OSError, ValueError):
+        return False
+
+
+class BatchCheckpoint:
+    """
+    Append-only JSON-lines record of finished sessions.
+
+    Each line is written and fsynced as soon as a session finishes, so a run
+    killed at any point resumes after the last completed session.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._torn_tail = False
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    self._torn_tail = not line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line from a crash
+                    self.entries[entry['session_id']] = entry
+
+    def is_done(self, session_id: str, fingerprint: str) -> bool:
+        entry = self.entries.get(session_id)
+        return bool(entry) and entry['status'] == STATUS_COMPLETED and entry.get('fingerprint') == fingerprint
+
+    def record(self, entry: Dict[str, Any]):
+        self.entries[entry['session_id']] = entry
+        with open(self.path, 'a') as f:
+            if self._torn_tail:
+                # Start on a fresh line after a crash cut the last write short
+                f.write('\n')
+                self._torn_tail = False
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+_worker_service = None
+
+
+def _get_worker_service(storage_path: Path) -> Any:
+    """One service per process; diarization runs inline since the batch pool is the parallelism"""
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = recording_module.ConversationRecordingService(storage_path=str(storage_path))
+        _worker_service.diarization_pool = DiarizationPool(workers=0)
+    return _worker_service
+
+
+def reprocess_one(session_dir: str, processing_mode: Optional[str], fingerprint: str) -> Dict[str, Any]:
+    """Reprocess a single session (runs in a pool worker); never raises"""
+    session_dir = Path(session_dir)
+    entry = {'session_id': session_dir.name, 'fingerprint': fingerprint}
+    started = time.perf_counter()
+    try:
+        entry['audio_seconds'] = round(read_audio_metadata(recording_path(session_dir))['duration'], 3)
+        service = _get_worker_service(session_dir.parent)
+        result = asyncio.run(service.reprocess_session(str(session_dir), processing_mode, fingerprint))
+        if 'error' in result:
+            entry.update(status=STATUS_FAILED, error=result['error'])
+        else:
+            entry.update(
+                status=STATUS_COMPLETED,
+                utterance_count=result['utterance_count'],
+                stage_durations=result['stage_durations']
+            )
+    except Exception as e:
+        entry.update(status=STATUS_FAILED, error=str(e))
+    entry['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    return entry
+
+
+def run_batch(
+    storage_path: Union[str, Path],
+    workers: int = REPROCESS_WORKERS,
+    processing_mode: Optional[str] = None,
+    session_ids: Optional[Iterable[str]] = None,
+    force: bool = False,
+    checkpoint_path: Optional[Union[str, Path]] = None,
+    report_path: Optional[Union[str, Path]] = None
+) -> Dict[str, Any]:
+    """
+    Reprocess every stored session whose output is out of date and write a throughput report.
+    `workers <= 1` processes sessions one after another in this process.
+    """
+    storage_path = Path(storage_path)
+    checkpoint = BatchCheckpoint(checkpoint_path or storage_path / CHECKPOINT_NAME)
+    settings = processing_settings(processing_mode)
+    started = time.perf_counter()
+
+    pending, skipped = [], []
+    for session_dir in discover_sessions(storage_path, session_ids):
+        fingerprint = session_fingerprint(session_dir, settings)
+        if not force and (is_current(session_dir, fingerprint) or checkpoint.is_done(session_dir.name, fingerprint)):
+            skipped.append({'session_id': session_dir.name, 'status': STATUS_SKIPPED, 'fingerprint': fingerprint})
+        else:
+            pending.append((str(session_dir), processing_mode, fingerprint))
+    logger.info(f"Reprocessing {len(pending)} sessions ({len(skipped)} already current) with {workers} workers")
+
+    results = []
+
+    def finish(entry: Dict[str, Any]):
+        checkpoint.record(entry)
+        results.append(entry)
+        logger.info(
+            f"[{len(results)}/{len(pending)}] {entry['session_id']}: {entry['status']}"
+            f" in {entry['elapsed_seconds']:.1f}s" + (f" ({entry['error']})" if 'error' in entry else "")
+        )
+
+    if workers <= 1:
+        for args in pending:
+            finish(reprocess_one(*args))
+    elif pending:
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(DIARIZATION_START_METHOD),
+            initializer=_init_worker,
+            initargs=(torch_threads,)
+        ) as executor:
+            futures = [executor.submit(reprocess_one, *args) for args in pending]
+            for future in as_completed(futures):
+                finish(future.result())
+
+    wall_seconds = time.perf_counter() - started
+    completed = [entry for entry in results if entry['status'] == STATUS_COMPLETED]
+    audio_seconds = sum(entry.get('audio_seconds', 0.0) for entry in completed)
+    report = {
+        'storage_path': str(storage_path),
+        'settings': settings,
+        'workers': workers,
+        'sessions_total': len(pending) + len(skipped),
+        'sessions_completed': len(completed),
+        'sessions_failed': len(results) - len(completed),
+        'sessions_skipped': len(skipped),
+        'audio_seconds': round(audio_seconds, 3),
+        'wall_seconds': round(wall_seconds, 3),
+        # Seconds of audio processed per second of wall time
+        'realtime_factor': round(audio_seconds / wall_seconds, 2) if wall_seconds > 0 else None,
+        'sessions_per_minute': round(len(results) * 60 / wall_seconds, 2) if wall_seconds > 0 else None,
+        'sessions': sorted(results + skipped, key=lambda entry: entry['session_id'])
+    }
+
+    report_path = Path(report_path or storage_path / REPORT_NAME)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(
+        f"Reprocessed {len(completed)} sessions ({report['sessions_failed']} failed, {len(skipped)} skipped): "
+        f"{audio_seconds:.0f}s of audio in {wall_seconds:.1f}s"
+    )
+    return report
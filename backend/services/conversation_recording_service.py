@@ -6,20 +6,45 @@ import os
 import json
 import uuid
 import asyncio
+import time
+import random
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-import numpy as np
-import soundfile as sf
 
-# PyAnnote-Audio for speaker diarization
-try:
-    from pyannote.audio import Pipeline
-    from pyannote.audio.pipelines.utils.hook import ProgressHook
-    PYANNOTE_AVAILABLE = True
-except ImportError:
-    PYANNOTE_AVAILABLE = False
+from .audio_spool import AudioSpool
+from .audio_slicing import PCMAudioReader, DEFAULT_SEGMENT_PADDING
+from .speaker_alignment import assign_speakers_by_overlap, turns_from_diarization
+from .processing_jobs import ProcessingProgress
+from .voice_activity import SpeechTimeline, detect_speech_in_file, write_speech_audio
+from .stream_decoder import FFmpegStreamDecoder, INPUT_FORMAT_PCM, normalize_input_format
+from .audio_normalizer import AudioNormalizer
+from .audio_archive import (
+    ArchiveEncoder, ARCHIVE_FORMAT_WAV, ARCHIVE_STEM, WORKING_COPY_NAME,
+    encode_archive, ensure_working_copy, find_archive, resolve_archive_format
+)
+from .segment_index import SegmentIndex, SEGMENT_INDEX_NAME
+from .transcript_query import utterance_rows
+from .turn_index import TurnIndex, utterance_times
+from .fallback_diarizer import FallbackDiarization, diarize_file, fallback_settings
+from .result_cache import ResultCache, cache_key, result_cache_dir
+from .session_store import SESSION_STATUS_ACTIVE, SESSION_STATUS_PROCESSING, WORKER_ID, create_session_store
+from .database_service import db_service
+from .session_limits import (
+    BYTES_PER_SECOND, RECORDING_MAX_ACTIVE_SESSIONS, RECORDING_MAX_BUFFERED_BYTES,
+    RecordingLimitError, expiry_reason, quota_exceeded
+)
+from .live_transcription import LIVE_TRANSCRIPTION_ENABLED, LiveTranscriber
+from .word_index import (
+    WORD_SEARCH_LIMIT, WORD_TIMELINE_NAME, WordIndex, WordTimeline, Word,
+    read_project_id, split_words, transcript_words
+)
+
+# PyAnnote-Audio for speaker diarization (runs in a dedicated process pool)
+from .diarization_pool import DiarizationPool, DIARIZATION_MODEL, PYANNOTE_AVAILABLE
+if not PYANNOTE_AVAILABLE:
     logging.warning("pyannote.audio not available - speaker diarization disabled")
 
 # OpenAI Whisper for transcription
@@ -32,6 +57,45 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Session fields kept in the session store; everything else is a per-process handle
+DURABLE_SESSION_FIELDS = (
+    'session_id', 'project_id', 'session_name', 'participants', 'started_at', 'ended_at',
+    'status', 'processing_mode', 'input_format', 'archive_format', 'audio_format', 'session_dir',
+    'live_transcription'
+)
+
+# Processing modes, chosen per session
+PROCESSING_MODE_PER_SEGMENT = 'per_segment'  # Transcribe every diarized turn separately
+PROCESSING_MODE_TRANSCRIBE_ONCE = 'transcribe_once'  # One ASR pass, speakers aligned by overlap
+PROCESSING_MODES = (PROCESSING_MODE_PER_SEGMENT, PROCESSING_MODE_TRANSCRIBE_ONCE)
+DEFAULT_PROCESSING_MODE = os.getenv('RECORDING_PROCESSING_MODE', PROCESSING_MODE_PER_SEGMENT)
+
+# Format clients send audio in unless the session says otherwise ("pcm" = raw 16-bit PCM)
+DEFAULT_INPUT_FORMAT = os.getenv('RECORDING_INPUT_FORMAT', INPUT_FORMAT_PCM)
+
+# Whisper uploads are capped at 25 MB; 10 minutes of 16 kHz mono PCM is ~19 MB
+FULL_TRANSCRIPTION_WINDOW_SECONDS = float(os.getenv('FULL_TRANSCRIPTION_WINDOW_SECONDS', '600'))
+
+TRANSCRIPTION_MODEL = os.getenv('TRANSCRIPTION_MODEL', 'whisper-1')
+# Word timestamps back the search index; segment timestamps back alignment
+TRANSCRIPTION_TIMESTAMP_GRANULARITIES = ["word", "segment"]
+
+# Whisper request concurrency and 429 retry policy
+TRANSCRIPTION_CONCURRENCY = int(os.getenv('TRANSCRIPTION_CONCURRENCY', '4'))
+TRANSCRIPTION_MAX_RETRIES = int(os.getenv('TRANSCRIPTION_MAX_RETRIES', '5'))
+TRANSCRIPTION_BACKOFF_BASE = float(os.getenv('TRANSCRIPTION_BACKOFF_BASE', '1.0'))
+TRANSCRIPTION_BACKOFF_MAX = float(os.getenv('TRANSCRIPTION_BACKOFF_MAX', '30.0'))
+
+# Processed sessions whose turn index is kept in memory for seeking
+TURN_INDEX_CACHE_SIZE = int(os.getenv('TURN_INDEX_CACHE_SIZE', '32'))
+# Projects whose word search index is kept in memory
+WORD_INDEX_CACHE_SIZE = int(os.getenv('WORD_INDEX_CACHE_SIZE', '8'))
+
+# Voice activity detection: diarize and transcribe only the speech regions
+VAD_ENABLED = os.getenv('RECORDING_VAD', 'true').lower() == 'true'
+# Skip the speech-only copy unless at least this fraction of the recording is silence
+VAD_MIN_SILENCE_RATIO = float(os.getenv('VAD_MIN_SILENCE_RATIO', '0.1'))
+
 class ConversationRecordingService:
     """Simplified conversation recording with PyAnnote-Audio speaker diarization"""
     
@@ -39,42 +103,74 @@ class ConversationRecordingService:
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
         
-        # Initialize PyAnnote-Audio pipeline
-        self.diarization_pipeline = None
-        if PYANNOTE_AVAILABLE:
-            try:
-                # Get HuggingFace token from environment
-                hf_token = os.getenv('HF_TOKEN')
-                if not hf_token:
-                    logger.warning("HF_TOKEN not found in environment - PyAnnote-Audio will use fallback")
-                    self.diarization_pipeline = None
-                else:
-                    # Use 3.1 model with authentication
-                    self.diarization_pipeline = Pipeline.from_pretrained(
-                        "pyannote/speaker-diarization-3.1",
-                        use_auth_token=hf_token
-                    )
-                    logger.info("PyAnnote-Audio speaker diarization pipeline loaded (community model with auth)")
-            except Exception as e:
-                logger.warning(f"Failed to load PyAnnote-Audio pipeline: {e}")
-                logger.info("Falling back to basic audio processing without speaker diarization")
-                self.diarization_pipeline = None
+        # PyAnnote-Audio runs in worker processes, each keeping a warm pipeline
+        self.diarization_pool = DiarizationPool()
+        if PYANNOTE_AVAILABLE and not os.getenv('HF_TOKEN'):
+            logger.warning("HF_TOKEN not found in environment - PyAnnote-Audio will use fallback")
+        
+        # Diarization and Whisper results keyed by audio content, reused across reruns
+        self.result_cache = ResultCache(result_cache_dir(self.storage_path))
         
+        # Turn indexes of recently viewed sessions: session_id -> (transcription.json mtime, index)
+        self._turn_indexes: 'OrderedDict[str, Tuple[int, TurnIndex]]' = OrderedDict()
+        # Word search indexes of recently searched projects: project_id -> ({session_id: words.npz mtime}, index)
+        self._word_indexes: 'OrderedDict[str, Tuple[Dict[str, int], WordIndex]]' = OrderedDict()
+        
+        # Processed sessions and utterances are persisted here (a no-op unless USE_DATABASE is set)
+        self.database = db_service
+        
+        # Durable session state shared by all workers; active_sessions holds this process's open handles
+        self.session_store = create_session_store(self.storage_path)
         self.active_sessions = {}
+        resumable = self.session_store.list_sessions(SESSION_STATUS_ACTIVE)
+        if resumable:
+            logger.info(f"{len(resumable)} recording sessions can be resumed")
+        # Chunk bytes currently held in memory by this worker
+        self._buffered_bytes = 0
+        # Rolling-window transcribers of sessions this worker started
+        self.live_transcribers: Dict[str, LiveTranscriber] = {}
+        
+        # Shared async Whisper client and concurrency limit (created per event loop)
+        self._openai_client = None
+        self._transcription_semaphore = None
+        self._transcription_loop = None
         
     async def start_recording_session(
         self, 
         project_id: str, 
         session_name: str,
-        participants: List[Dict[str, str]] = None
+        participants: List[Dict[str, str]] = None,
+        processing_mode: Optional[str] = None,
+        input_format: Optional[str] = None,
+        live_transcription: Optional[bool] = None
     ) -> str:
         """Start a new conversation recording session"""
+        processing_mode = processing_mode or DEFAULT_PROCESSING_MODE
+        if processing_mode not in PROCESSING_MODES:
+            raise ValueError(f"Unknown processing mode '{processing_mode}' (expected one of {', '.join(PROCESSING_MODES)})")
+        input_format = normalize_input_format(input_format or DEFAULT_INPUT_FORMAT)
+        if live_transcription is None:
+            live_transcription = LIVE_TRANSCRIPTION_ENABLED and OPENAI_AVAILABLE
+        
+        active_count = len(self.session_store.list_sessions(SESSION_STATUS_ACTIVE))
+        if active_count >= RECORDING_MAX_ACTIVE_SESSIONS:
+            raise RecordingLimitError(f"{active_count} sessions are already recording; try again later", 429, retry_after=30)
+        
         session_id = str(uuid.uuid4())
         
         # Create session directory
         session_dir = self.storage_path / session_id
         session_dir.mkdir(exist_ok=True)
         
+        # Audio goes straight to disk; only the spool handle stays in memory
+        audio_spool = AudioSpool(session_dir / WORKING_COPY_NAME, sample_rate=16000)
+        
+        # Compressed archive copy, encoded alongside the PCM working copy
+        archive_format = resolve_archive_format()
+        archive = None
+        if archive_format != ARCHIVE_FORMAT_WAV:
+            archive = ArchiveEncoder(session_dir / ARCHIVE_STEM, archive_format, sample_rate=16000)
+        
         # Initialize session data
         session_data = {
             'session_id': session_id,
@@ -85,13 +181,55 @@ class ConversationRecordingService:
                 {'id': 'subject', 'name': 'Interview Subject'}
             ],
             'started_at': datetime.now().isoformat(),
-            'status': 'active',
-            'audio_chunks': [],
-            'session_dir': str(session_dir)
+            'status': SESSION_STATUS_ACTIVE,
+            'processing_mode': processing_mode,
+            'input_format': input_format,
+            'audio_spool': audio_spool,
+            'archive': archive,
+            'archive_format': archive_format,
+            'decoder': None,
+            'audio_format': None,
+            'segment_index': SegmentIndex(sample_rate=16000),
+            'session_dir': str(session_dir),
+            'live_transcription': live_transcription
         }
         
+        # Compressed input is decoded by ffmpeg while it arrives, straight into the spool
+        if input_format != INPUT_FORMAT_PCM:
+            decoder = FFmpegStreamDecoder(
+                on_pcm=lambda pcm: self._store_pcm(session_data, pcm),
+                input_format=input_format,
+                sample_rate=16000
+            )
+            try:
+                decoder.start()
+            except Exception:
+                audio_spool.finalize()
+                if archive is not None:
+                    archive.close()
+                raise
+            session_data['decoder'] = decoder
+        
+        self.session_store.create({
+            **{field: session_data.get(field) for field in DURABLE_SESSION_FIELDS},
+            'data_bytes': 0,
+            'chunk_count': 0,
+            'last_activity_at': time.time(),
+            # The worker whose live archive encoder has seen every chunk, if any
+            'archive_owner': WORKER_ID if archive is not None else None
+        })
+        self._drop_stale_sessions()
         self.active_sessions[session_id] = session_data
         
+        if live_transcription:
+            live = LiveTranscriber(
+                session_id,
+                lambda start, end: self._transcribe_live_window(session_dir / WORKING_COPY_NAME, start, end),
+                lambda: self._recorded_seconds(session_id)
+            )
+            live.start()
+            self.live_transcribers[session_id] = live
+        
         logger.info(f"Started recording session {session_id} for project {project_id}")
         return session_id
     
@@ -99,57 +237,156 @@ class ConversationRecordingService:
         self, 
         session_id: str, 
         audio_data: bytes,
-        sample_rate: int = 16000
+        sample_rate: int = 16000,
+        channels: int = 1,
+        sample_format: str = 's16le'
     ) -> Dict[str, Any]:
-        """Store audio chunk for later processing"""
-        if session_id not in self.active_sessions:
-            raise ValueError(f"Session {session_id} not found")
-        
-        session = self.active_sessions[session_id]
+        """
+        Store audio chunk for later processing (raw PCM is normalized to 16 kHz mono int16).
+        Raises RecordingLimitError when a quota or the worker's memory ceiling refuses the chunk.
+        """
+        session = self._get_session(session_id)
+        self._check_chunk_limits(session_id, len(audio_data))
         
+        self._buffered_bytes += len(audio_data)
         try:
-            # Store audio chunk
-            session['audio_chunks'].append(audio_data)
+            decoder = session.get('decoder')
+            
+            if decoder is not None:
+                # ffmpeg may push back while it catches up; keep the event loop free
+                await asyncio.to_thread(decoder.feed, audio_data)
+                chunk_count = decoder.chunks_fed
+            elif session['input_format'] != INPUT_FORMAT_PCM:
+                # The compressed stream's container state lives in the ffmpeg process of the starting worker
+                raise ValueError(f"Session {session_id} is decoding {session['input_format']} on another worker")
+            else:
+                # One normalizer per session carries resampler state between chunks
+                normalizer = session.get('normalizer')
+                if normalizer is None:
+                    started_format = session.get('audio_format')
+                    if started_format and started_format != [sample_rate, channels, sample_format]:
+                        raise ValueError(
+                            f"Audio format changed mid-session: {sample_rate} Hz/{channels}ch/{sample_format}, "
+                            f"session started with {started_format[0]} Hz/{started_format[1]}ch/{started_format[2]}"
+                        )
+                    normalizer = AudioNormalizer(sample_rate, channels, sample_format)
+                    session['normalizer'] = normalizer
+                    session['audio_format'] = [sample_rate, channels, sample_format]
+                elif not normalizer.matches(sample_rate, channels, sample_format):
+                    raise ValueError(
+                        f"Audio format changed mid-session: {sample_rate} Hz/{channels}ch/{sample_format}, "
+                        f"session started with {normalizer.sample_rate} Hz/{normalizer.channels}ch/{normalizer.sample_format}"
+                    )
+                
+                # Append audio chunk to the on-disk spool
+                self._store_pcm(session, normalizer.process(audio_data))
+                chunk_count = session['audio_spool'].chunk_count
             
             return {
                 'session_id': session_id,
                 'status': 'stored',
-                'chunk_count': len(session['audio_chunks']),
+                'chunk_count': chunk_count,
+                'bytes_stored': session['audio_spool'].data_bytes,
                 'message': 'Audio chunk stored for processing'
             }
             
         except Exception as e:
             logger.error(f"Error storing audio chunk: {e}")
             return {'error': str(e)}
+        finally:
+            self._buffered_bytes -= len(audio_data)
+    
+    def _check_chunk_limits(self, session_id: str, chunk_bytes: int):
+        """Refuse a chunk the worker cannot buffer or the session has no quota left for"""
+        if self._buffered_bytes + chunk_bytes > RECORDING_MAX_BUFFERED_BYTES:
+            raise RecordingLimitError("Too much audio in flight on this worker; retry shortly", 429, retry_after=1)
+        
+        state = self.session_store.get(session_id)
+        if state is None:
+            raise ValueError(f"Session {session_id} not found")
+        if state['status'] != SESSION_STATUS_ACTIVE:
+            raise RecordingLimitError(f"Session {session_id} is {state['status']} and no longer accepts audio", 410)
+        exceeded = quota_exceeded(state['data_bytes'])
+        if exceeded:
+            raise RecordingLimitError(f"Session {session_id} reached its {exceeded}; end the session", 413)
+    
+    def claim_expired_sessions(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """
+        Mark idle or over-quota sessions as processing so they can be finalized.
+        Returns (session_id, reason) for the sessions this worker claimed.
+        """
+        claimed = []
+        for state in self.session_store.list_sessions(SESSION_STATUS_ACTIVE):
+            if expiry_reason(state, now) is None:
+                continue
+            session_id = state['session_id']
+            with self.session_store.lock(session_id):
+                # Re-check: a chunk or another worker's reaper may have got there first
+                state = self.session_store.get(session_id)
+                reason = expiry_reason(state, now) if state and state['status'] == SESSION_STATUS_ACTIVE else None
+                if reason is None:
+                    continue
+                self.session_store.update(session_id, status=SESSION_STATUS_PROCESSING, expired_reason=reason)
+            claimed.append((session_id, reason))
+        return claimed
     
     async def process_complete_audio(
         self, 
-        session_id: str
+        session_id: str,
+        progress: Optional[ProcessingProgress] = None
     ) -> Dict[str, Any]:
         """Process complete audio file with speaker diarization and transcription"""
-        if session_id not in self.active_sessions:
-            raise ValueError(f"Session {session_id} not found")
-        
-        session = self.active_sessions[session_id]
+        session = self._get_session(session_id)
+        progress = progress or ProcessingProgress()
         
         try:
-            # Combine all audio chunks
-            combined_audio = b''.join(session['audio_chunks'])
+            # Finalize the spooled audio file (patches the WAV header in place)
+            with progress.stage('save_audio'):
+                audio_file_path = await self._save_complete_audio(session)
             
-            # Save complete audio file
-            audio_file_path = await self._save_complete_audio(session, combined_audio)
+            # Cut silence so diarization and Whisper only see speech; times are mapped back
+            with progress.stage('vad'):
+                speech_file_path, timeline = await asyncio.to_thread(self._extract_speech, str(audio_file_path), session)
             
-            # Process with PyAnnote-Audio for speaker diarization
-            diarization_result = await self._process_speaker_diarization(str(audio_file_path))
-            print(f"🔍 DEBUG: Diarization result type: {type(diarization_result)}")
-            print(f"🔍 DEBUG: Diarization result: {diarization_result}")
-            
-            # Transcribe each speaker segment
-            utterances = await self._transcribe_speaker_segments(
-                str(audio_file_path), 
-                diarization_result,
-                session
-            )
+            num_speakers = self._speaker_count_hint(session)
+            live = self.live_transcribers.pop(session_id, None)
+            try:
+                if live is not None:
+                    # Most of the recording was transcribed while it was made: finish the tail
+                    # during diarization, then only the speaker alignment is left
+                    diarization_result, live_segments = await asyncio.gather(
+                        self._run_stage(progress, 'diarization', self._process_speaker_diarization(speech_file_path, progress, num_speakers)),
+                        self._run_stage(progress, 'transcription', live.finish())
+                    )
+                    with progress.stage('alignment'):
+                        utterances = self._align_live_segments(live_segments, diarization_result, session, timeline)
+                elif session.get('processing_mode') == PROCESSING_MODE_TRANSCRIBE_ONCE:
+                    # Diarization and ASR are independent until alignment, so run them together
+                    diarization_result, asr_segments = await asyncio.gather(
+                        self._run_stage(progress, 'diarization', self._process_speaker_diarization(speech_file_path, progress, num_speakers)),
+                        self._run_stage(progress, 'transcription', self._transcribe_full_audio(speech_file_path, progress))
+                    )
+                    with progress.stage('alignment'):
+                        utterances = self._align_transcript_to_speakers(asr_segments, diarization_result, session, timeline)
+                else:
+                    # Process with PyAnnote-Audio for speaker diarization
+                    with progress.stage('diarization'):
+                        diarization_result = await self._process_speaker_diarization(speech_file_path, progress, num_speakers)
+                    print(f"🔍 DEBUG: Diarization result type: {type(diarization_result)}")
+                    print(f"🔍 DEBUG: Diarization result: {diarization_result}")
+                    
+                    # Transcribe each speaker segment
+                    with progress.stage('transcription'):
+                        utterances = await self._transcribe_speaker_segments(
+                            speech_file_path, 
+                            diarization_result,
+                            session,
+                            progress,
+                            timeline
+                        )
+            finally:
+                if speech_file_path != str(audio_file_path):
+                    Path(speech_file_path).unlink(missing_ok=True)
             print(f"🔍 DEBUG: Generated {len(utterances)} utterances")
             
             # Update session with results
@@ -169,90 +406,126 @@ class ConversationRecordingService:
             logger.error(f"Error processing complete audio: {e}")
             return {'error': str(e)}
     
-    async def _process_speaker_diarization(self, audio_file_path: str) -> Any:
+    def _extract_speech(self, audio_file_path: str, session: Dict[str, Any]) -> Tuple[str, Optional[SpeechTimeline]]:
+        """
+        Run VAD and write the speech-only working file.
+        Returns (file to process, timeline back to the recording); the timeline is
+        None when the original file is processed as is.
+        """
+        if not VAD_ENABLED:
+            return audio_file_path, None
+        
+        try:
+            regions, duration = detect_speech_in_file(audio_file_path)
+        except Exception as e:
+            logger.warning(f"Voice activity detection failed, processing full audio: {e}")
+            return audio_file_path, None
+        
+        timeline = SpeechTimeline(regions)
+        session['speech_regions'] = timeline.regions
+        session['speech_seconds'] = round(timeline.speech_seconds, 3)
+        
+        if not regions:
+            # Nothing cleared the thresholds (e.g. a very quiet mic); don't trust VAD over the audio
+            logger.warning("No speech detected, processing full audio")
+            return audio_file_path, None
+        if duration <= 0 or 1 - timeline.speech_seconds / duration < VAD_MIN_SILENCE_RATIO:
+            return audio_file_path, None
+        
+        speech_file_path = Path(session['session_dir']) / "speech_only.wav"
+        write_speech_audio(audio_file_path, regions, speech_file_path)
+        logger.info(f"VAD kept {timeline.speech_seconds:.1f}s of speech out of {duration:.1f}s")
+        return str(speech_file_path), timeline
+    
+    async def _run_stage(self, progress: ProcessingProgress, name: str, awaitable: Any) -> Any:
+        """Await a coroutine inside a timed progress stage"""
+        with progress.stage(name):
+            return await awaitable
+    
+    async def _process_speaker_diarization(
+        self, 
+        audio_file_path: str,
+        progress: Optional[ProcessingProgress] = None,
+        num_speakers: Optional[int] = None
+    ) -> Any:
         """Process audio file with PyAnnote-Audio speaker diarization"""
-        if not self.diarization_pipeline:
+        if not self.diarization_pool.available:
             logger.warning("PyAnnote-Audio pipeline not available - using fallback method")
-            return self._fallback_speaker_diarization(audio_file_path)
+            return await asyncio.to_thread(self._fallback_speaker_diarization, audio_file_path, num_speakers)
         
         try:
-            # Run speaker diarization
-            with ProgressHook() as hook:
-                diarization = self.diarization_pipeline(audio_file_path, hook=hook)
+            # Run speaker diarization in the worker pool, off the event loop
+            on_progress = None
+            if progress is not None:
+                # pyannote step progress (segmentation, embeddings, ...) from the worker's ProgressHook
+                on_progress = lambda step, completed, total: progress.update('diarization', completed, total, detail=step)
+            
+            key = await asyncio.to_thread(self._diarization_cache_key, audio_file_path, DIARIZATION_MODEL)
+            cached = self.result_cache.get_diarization(key)
+            if cached is not None:
+                logger.info(f"Speaker diarization for {audio_file_path} served from cache")
+                return FallbackDiarization(cached)
+            
+            diarization = await self.diarization_pool.diarize(audio_file_path, on_progress=on_progress)
+            if diarization is None:
+                logger.warning("PyAnnote-Audio pipeline failed to load in worker - using fallback method")
+                return await asyncio.to_thread(self._fallback_speaker_diarization, audio_file_path, num_speakers)
             
+            self.result_cache.put_diarization(key, diarization)
             logger.info(f"Speaker diarization completed for {audio_file_path}")
             return diarization
             
         except Exception as e:
             logger.error(f"Error in speaker diarization: {e}")
-            logger.info("Falling back to basic speaker separation")
-            return self._fallback_speaker_diarization(audio_file_path)
+            logger.info("Falling back to CPU speaker diarization")
+            return await asyncio.to_thread(self._fallback_speaker_diarization, audio_file_path, num_speakers)
     
-    def _fallback_speaker_diarization(self, audio_file_path: str) -> Any:
-        """Fallback speaker diarization using simple time-based segmentation"""
+    def _fallback_speaker_diarization(self, audio_file_path: str, num_speakers: Optional[int] = None) -> Any:
+        """CPU-only speaker diarization (MFCC features + k-means) for when pyannote is unavailable"""
         logger.info("Using fallback speaker diarization")
         
-        # Load audio file to get duration
         try:
-            import soundfile as sf
-            audio_data, sample_rate = sf.read(audio_file_path)
-            duration = len(audio_data) / sample_rate
-            
-            # Create a simple mock diarization result
-            # Split the audio into 10-second segments and alternate speakers
-            segments = []
-            segment_duration = 10.0  # 10 seconds per segment
-            current_time = 0.0
-            speaker_id = 0
-            
-            while current_time < duration:
-                end_time = min(current_time + segment_duration, duration)
-                segments.append({
-                    'start': current_time,
-                    'end': end_time,
-                    'speaker': f'SPEAKER_{speaker_id:02d}'
-                })
-                current_time = end_time
-                speaker_id = (speaker_id + 1) % 2  # Alternate between 2 speakers
-            
-            # Create a mock diarization object
-            class MockDiarization:
-                def __init__(self, segments):
-                    self.segments = segments
-                
-                def __iter__(self):
-                    for segment in self.segments:
-                        # Create mock turn and speaker objects
-                        class MockTurn:
-                            def __init__(self, start, end):
-                                self.start = start
-                                self.end = end
-                        
-                        class MockSpeaker:
-                            def __init__(self, speaker_id):
-                                self.speaker_id = speaker_id
-                            
-                            def __str__(self):
-                                return self.speaker_id
-                        
-                        yield MockTurn(segment['start'], segment['end']), MockSpeaker(segment['speaker'])
-            
-            return MockDiarization(segments)
-            
+            key = self._diarization_cache_key(audio_file_path, 'fallback', {**fallback_settings(), 'num_speakers': num_speakers})
+            cached = self.result_cache.get_diarization(key)
+            if cached is not None:
+                return FallbackDiarization(cached)
+            diarization = diarize_file(audio_file_path, num_speakers)
         except Exception as e:
             logger.error(f"Error in fallback diarization: {e}")
             # Return empty diarization
-            class EmptyDiarization:
-                def __iter__(self):
-                    return iter([])
-            
-            return EmptyDiarization()
+            return FallbackDiarization([])
+        
+        self.result_cache.put_diarization(key, diarization)
+        return diarization
+    
+    def _diarization_cache_key(self, audio_file_path: str, model: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Result cache key for diarizing this file's content (None when caching is off)"""
+        audio_hash = self.result_cache.audio_hash(audio_file_path)
+        return cache_key('diarization', audio_hash, model, params) if audio_hash else None
+    
+    def _transcription_cache_key(self, audio_hash: Optional[str], start_time: float, end_time: float, padding: float) -> Optional[str]:
+        """Result cache key for one Whisper upload of a span of the file"""
+        if not audio_hash:
+            return None
+        params = {
+            'response_format': 'verbose_json',
+            'timestamp_granularities': TRANSCRIPTION_TIMESTAMP_GRANULARITIES,
+            'padding': padding
+        }
+        return cache_key('transcription', audio_hash, TRANSCRIPTION_MODEL, params, (start_time, end_time))
+    
+    def _speaker_count_hint(self, session: Dict[str, Any]) -> Optional[int]:
+        """Number of speakers to expect, from the session's participant list"""
+        participants = session.get('participants') or []
+        return len(participants) or None
     
     async def _transcribe_speaker_segments(
         self, 
         audio_file_path: str, 
         diarization_result: Any,
-        session: Dict[str, Any]
+        session: Dict[str, Any],
+        progress: Optional[ProcessingProgress] = None,
+        timeline: Optional[SpeechTimeline] = None
     ) -> List[Dict[str, Any]]:
         """Transcribe each speaker segment using OpenAI Whisper"""
         utterances = []
@@ -260,88 +533,453 @@ class ConversationRecordingService:
         try:
             print(f"🔍 DEBUG: Processing diarization result: {type(diarization_result)}")
             
-            # Handle both old and new PyAnnote formats
-            segment_count = 0
+            # Map the recording once; each segment is sliced out of it for upload
+            audio_reader = PCMAudioReader(audio_file_path)
+            audio_hash = await asyncio.to_thread(self.result_cache.audio_hash, audio_file_path)
+        except Exception as e:
+            logger.error(f"Error opening audio for transcription: {e}")
+            return []
+        
+        try:
+            # Build utterance records in diarization order
+            segment_ranges = []
             for segment, _, speaker in diarization_result.itertracks(yield_label=True):
-                segment_count += 1
-                print(f"🔍 DEBUG: Processing segment {segment_count}: {segment.start:.1f}s - {segment.end:.1f}s, speaker: {speaker}")
+                print(f"🔍 DEBUG: Processing segment {len(utterances) + 1}: {segment.start:.1f}s - {segment.end:.1f}s, speaker: {speaker}")
                 
                 # Extract audio segment
                 start_time = segment.start
                 end_time = segment.end
-                duration = end_time - start_time
+                segment_ranges.append((start_time, end_time))
+                
+                # Report times on the original recording when processing speech-only audio
+                if timeline is not None:
+                    start_time, end_time = timeline.to_original_span(start_time, end_time)
                 
                 # Create utterance record
-                utterance = {
-                    'id': str(uuid.uuid4()),
+                utterance_id = str(uuid.uuid4())
+                utterances.append({
+                    'id': utterance_id,
                     'speaker_id': str(speaker),  # Convert to string for JSON serialization
                     'speaker_name': self._get_speaker_name(session, str(speaker)),
-                    'start_time': f"{int(start_time//60):02d}:{int(start_time%60):02d}",
-                    'end_time': f"{int(end_time//60):02d}:{int(end_time%60):02d}",
-                    'duration': int(duration * 1000),  # Convert to milliseconds
+                    **utterance_times(start_time, end_time),
                     'timestamp': datetime.now().isoformat(),
-                    'audio_segment_path': None,  # Could extract and save segments
+                    **self._index_segment(session, utterance_id, start_time, end_time),
                     'text': '',  # Will be filled by transcription
                     'confidence': '0.95'  # Default confidence
-                }
+                })
+            
+            # Transcribe all segments concurrently; gather keeps diarization order
+            if OPENAI_AVAILABLE:
+                completed = 0
                 
-                # Transcribe this segment
-                if OPENAI_AVAILABLE:
-                    transcription = await self._transcribe_audio_segment(
-                        audio_file_path, start_time, end_time
-                    )
+                async def transcribe(start_time: float, end_time: float) -> Dict[str, Any]:
+                    nonlocal completed
+                    transcription = await self._transcribe_audio_segment(audio_reader, start_time, end_time, audio_hash)
+                    completed += 1
+                    if progress is not None:
+                        progress.update('transcription', completed, len(segment_ranges))
+                    return transcription
+                
+                transcriptions = await asyncio.gather(*[
+                    transcribe(start_time, end_time)
+                    for start_time, end_time in segment_ranges
+                ])
+                for utterance, transcription in zip(utterances, transcriptions):
                     utterance['text'] = transcription.get('text', '')
                     utterance['confidence'] = transcription.get('confidence', '0.95')
-                
-                utterances.append(utterance)
+                    self._index_words(session, utterance['id'], transcription.get('words', []), timeline)
             
             return utterances
             
         except Exception as e:
             logger.error(f"Error transcribing speaker segments: {e}")
             return []
+        finally:
+            audio_reader.close()
+    
+    def _get_transcription_client(self) -> Tuple[Any, asyncio.Semaphore]:
+        """Shared async OpenAI client and request semaphore for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._transcription_loop is not loop:
+            # Retries are handled in _request_transcription so the backoff is ours to tune
+            self._openai_client = openai.AsyncOpenAI(max_retries=0)
+            self._transcription_semaphore = asyncio.Semaphore(TRANSCRIPTION_CONCURRENCY)
+            self._transcription_loop = loop
+        return self._openai_client, self._transcription_semaphore
+    
+    async def _request_transcription(
+        self,
+        filename: str,
+        load_audio: Callable[[], bytes],
+        result_key: Optional[str] = None
+    ) -> Any:
+        """Call Whisper within the concurrency limit, backing off on rate limits; cached results skip the upload"""
+        cached = self.result_cache.get_transcript(result_key)
+        if cached is not None:
+            return cached
+        
+        client, semaphore = self._get_transcription_client()
+        
+        async with semaphore:
+            # Audio is sliced only once a slot is free, so waiting requests hold no buffers
+            audio_data = load_audio()
+            attempt = 0
+            while True:
+                try:
+                    transcript = await client.audio.transcriptions.create(
+                        model=TRANSCRIPTION_MODEL,
+                        file=(filename, audio_data),
+                        response_format="verbose_json",
+                        timestamp_granularities=TRANSCRIPTION_TIMESTAMP_GRANULARITIES
+                    )
+                    break
+                except openai.RateLimitError as e:
+                    if attempt >= TRANSCRIPTION_MAX_RETRIES:
+                        raise
+                    delay = self._rate_limit_delay(e, attempt)
+                    attempt += 1
+                    logger.warning(f"Whisper rate limited, retry {attempt}/{TRANSCRIPTION_MAX_RETRIES} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+        
+        self.result_cache.put_transcript(result_key, transcript)
+        return transcript
+    
+    def _rate_limit_delay(self, error: Exception, attempt: int) -> float:
+        """Honor Retry-After when present, otherwise exponential backoff with jitter"""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), TRANSCRIPTION_BACKOFF_MAX)
+        except ValueError:
+            pass
+        backoff = min(TRANSCRIPTION_BACKOFF_BASE * (2 ** attempt), TRANSCRIPTION_BACKOFF_MAX)
+        return backoff * random.uniform(0.5, 1.0)
     
     async def _transcribe_audio_segment(
         self, 
-        audio_file_path: str, 
+        audio_reader: PCMAudioReader, 
         start_time: float, 
-        end_time: float
+        end_time: float,
+        audio_hash: Optional[str] = None
     ) -> Dict[str, Any]:
         """Transcribe a specific audio segment using OpenAI Whisper"""
         if not OPENAI_AVAILABLE:
             return {'text': '[Transcription not available]', 'confidence': '0.0'}
         
         try:
-            # Use OpenAI client v1.0+ API
-            client = openai.OpenAI()
-            
-            with open(audio_file_path, 'rb') as audio_file:
-                transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="verbose_json"
-                )
+            # Upload only this segment's audio, not the whole recording
+            transcript = await self._request_transcription(
+                "segment.wav",
+                lambda: audio_reader.segment_wav(start_time, end_time),
+                self._transcription_cache_key(audio_hash, start_time, end_time, DEFAULT_SEGMENT_PADDING)
+            )
             
             return {
                 'text': transcript.text,
-                'confidence': str(transcript.segments[0].avg_logprob if transcript.segments else 0.95)
+                'confidence': str(transcript.segments[0].avg_logprob if transcript.segments else 0.95),
+                # The upload started `padding` seconds before the segment
+                'words': transcript_words(transcript, max(0.0, start_time - DEFAULT_SEGMENT_PADDING))
             }
             
         except Exception as e:
             logger.error(f"OpenAI transcription error: {e}")
             return {'text': '[Transcription failed]', 'confidence': '0.0'}
     
-    async def _save_complete_audio(self, session: Dict[str, Any], audio_data: bytes) -> Path:
-        """Save complete audio file"""
-        session_dir = Path(session['session_dir'])
-        audio_file_path = session_dir / "complete_audio.wav"
+    async def _transcribe_full_audio(
+        self, 
+        audio_file_path: str,
+        progress: Optional[ProcessingProgress] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Transcribe the whole recording once and return time-stamped segments
+        Returns: [{'start': float, 'end': float, 'text': str, 'confidence': str}, ...]
+        """
+        if not OPENAI_AVAILABLE:
+            return []
+        
+        try:
+            audio_hash = await asyncio.to_thread(self.result_cache.audio_hash, audio_file_path)
+            with PCMAudioReader(audio_file_path) as audio_reader:
+                # Upload-sized windows, transcribed concurrently
+                duration = audio_reader.duration_seconds
+                windows = []
+                window_start = 0.0
+                while window_start < duration:
+                    window_end = min(window_start + FULL_TRANSCRIPTION_WINDOW_SECONDS, duration)
+                    windows.append((window_start, window_end))
+                    window_start = window_end
+                
+                completed = 0
+                
+                async def transcribe(start: float, end: float) -> Any:
+                    nonlocal completed
+                    transcript = await self._request_transcription(
+                        "window.wav",
+                        lambda: audio_reader.segment_wav(start, end, padding=0.0),
+                        self._transcription_cache_key(audio_hash, start, end, 0.0)
+                    )
+                    completed += 1
+                    if progress is not None:
+                        progress.update('transcription', completed, len(windows))
+                    return transcript
+                
+                transcripts = await asyncio.gather(*[transcribe(start, end) for start, end in windows])
+        except Exception as e:
+            logger.error(f"OpenAI full-audio transcription error: {e}")
+            return []
+        
+        segments = []
+        for (window_start, _), transcript in zip(windows, transcripts):
+            # Whisper timestamps are relative to the uploaded window
+            window_segments = transcript.segments or []
+            spans = [(window_start + float(seg.start), window_start + float(seg.end)) for seg in window_segments]
+            for seg, (start, end), words in zip(window_segments, spans, split_words(transcript_words(transcript, window_start), spans)):
+                segments.append({
+                    'start': start,
+                    'end': end,
+                    'text': seg.text.strip(),
+                    'confidence': str(seg.avg_logprob),
+                    'words': words
+                })
+        
+        logger.info(f"Transcribed {len(segments)} segments from {audio_file_path}")
+        return segments
+    
+    def _align_transcript_to_speakers(
+        self,
+        asr_segments: List[Dict[str, Any]],
+        diarization_result: Any,
+        session: Dict[str, Any],
+        timeline: Optional[SpeechTimeline] = None
+    ) -> List[Dict[str, Any]]:
+        """Assign each ASR segment to the speaker it overlaps most"""
+        # Both inputs share the processed file's timeline, so align before mapping times back
+        assignments = assign_speakers_by_overlap(asr_segments, diarization_result)
+        
+        utterances = []
+        for seg, (speaker, _) in zip(asr_segments, assignments):
+            start_time, end_time = seg['start'], seg['end']
+            if timeline is not None:
+                start_time, end_time = timeline.to_original_span(start_time, end_time)
+            speaker = speaker or 'UNKNOWN'
+            utterance_id = str(uuid.uuid4())
+            
+            utterances.append({
+                'id': utterance_id,
+                'speaker_id': speaker,
+                'speaker_name': self._get_speaker_name(session, speaker),
+                **utterance_times(start_time, end_time),
+                'timestamp': datetime.now().isoformat(),
+                **self._index_segment(session, utterance_id, start_time, end_time),
+                'text': seg['text'],
+                'confidence': seg.get('confidence', '0.95')
+            })
+            self._index_words(session, utterance_id, seg.get('words', []), timeline)
+        
+        return utterances
+    
+    def _align_live_segments(
+        self,
+        live_segments: List[Dict[str, Any]],
+        diarization_result: Any,
+        session: Dict[str, Any],
+        timeline: Optional[SpeechTimeline] = None
+    ) -> List[Dict[str, Any]]:
+        """Assign live segments (recording times) to speakers diarized on the processed file"""
+        if timeline is not None:
+            diarization_result = FallbackDiarization([
+                (*timeline.to_original_span(start, end), speaker)
+                for start, end, speaker in turns_from_diarization(diarization_result)
+            ])
+        return self._align_transcript_to_speakers(live_segments, diarization_result, session)
+    
+    async def _transcribe_live_window(self, audio_file_path: Path, start: float, end: float) -> List[Dict[str, Any]]:
+        """Whisper segments for [start, end) of a recording that may still be growing"""
+        with PCMAudioReader(audio_file_path) as audio_reader:
+            transcript = await self._request_transcription(
+                "live.wav", lambda: audio_reader.segment_wav(start, end, padding=0.0)
+            )
+        window_segments = transcript.segments or []
+        spans = [(start + float(seg.start), min(end, start + float(seg.end))) for seg in window_segments]
+        return [
+            {
+                'start': seg_start,
+                'end': seg_end,
+                'text': seg.text.strip(),
+                'confidence': str(seg.avg_logprob),
+                'words': words
+            }
+            for seg, (seg_start, seg_end), words in zip(window_segments, spans, split_words(transcript_words(transcript, start), spans))
+        ]
+    
+    def _recorded_seconds(self, session_id: str) -> float:
+        """Seconds of audio every worker has committed to the working copy"""
+        state = self.session_store.get(session_id)
+        return state['data_bytes'] / BYTES_PER_SECOND if state else 0.0
+    
+    def live_transcriber(self, session_id: str) -> Optional[LiveTranscriber]:
+        return self.live_transcribers.get(session_id)
+    
+    def _index_segment(self, session: Dict[str, Any], utterance_id: str, start_time: float, end_time: float) -> Dict[str, Any]:
+        """Record an utterance's offsets in the recording; returns the fields to merge into the utterance"""
+        segment_index = session.setdefault('segment_index', SegmentIndex(sample_rate=16000))
+        offsets = segment_index.add(utterance_id, start_time, end_time)
+        session_id = session.get('session_id')
+        return {
+            **offsets,
+            # Served by range straight out of the session recording, nothing is cut to disk
+            'audio_segment_path': f"/conversation/session/{session_id}/utterances/{utterance_id}/audio" if session_id else None
+        }
+    
+    def _index_words(self, session: Dict[str, Any], utterance_id: str, words: List[Word], timeline: Optional[SpeechTimeline] = None):
+        """Keep an utterance's word timestamps (on the original recording) for the session's word timeline"""
+        if words and timeline is not None:
+            starts = timeline.to_original([start for _, start, _ in words])
+            ends = timeline.to_original([end for _, _, end in words], is_end=True)
+            words = [(text, float(start), float(end)) for (text, _, _), start, end in zip(words, starts, ends)]
+        session.setdefault('utterance_words', {})[utterance_id] = words
+    
+    async def _save_complete_audio(self, session: Dict[str, Any]) -> Path:
+        """Finalize the session's spooled audio file (safe to call more than once)"""
+        decoder = session.get('decoder')
+        if decoder is not None:
+            # Flush ffmpeg so the last decoded samples reach the spool first
+            await asyncio.to_thread(decoder.close)
+        
+        session_id = session['session_id']
+        spool = session.get('audio_spool')
+        if spool is not None and spool.closed and session.get('audio_file_path'):
+            return spool.path
+        if self.session_store.get(session_id) is None:
+            # Reprocessing a stored session: the recording is already complete on disk
+            return Path(session['session_dir']) / WORKING_COPY_NAME
         
-        # Convert bytes to numpy array and save
-        audio_array = np.frombuffer(audio_data, dtype=np.int16)
-        sf.write(audio_file_path, audio_array, 16000)
+        with self.session_store.lock(session_id):
+            state = self.session_store.get(session_id)
+            normalizer = session.get('normalizer')
+            if normalizer is not None and not state.get('finalized'):
+                # Resampler tail (the last few milliseconds still inside the filter)
+                state = self._append_pcm(session, state, normalizer.flush())
+            spool = self._sync_spool(session, state)
+            audio_file_path = spool.finalize()
+            session['audio_file_path'] = str(audio_file_path)
+            state = self.session_store.update(session_id, finalized=True)
         
+        archive = session.get('archive')
+        if archive is not None and state['archive_owner'] == WORKER_ID:
+            session['archive_file_path'] = str(archive.close())
+        elif session.get('archive_format', ARCHIVE_FORMAT_WAV) != ARCHIVE_FORMAT_WAV:
+            # Chunks came through more than one worker (or across a restart): encode the archive in one pass
+            if archive is not None:
+                archive.close()
+            session['archive_file_path'] = str(await asyncio.to_thread(
+                encode_archive, audio_file_path, session['session_dir'], session['archive_format']
+            ))
         return audio_file_path
     
+    def _store_pcm(self, session: Dict[str, Any], pcm: bytes):
+        """Write normalized PCM to the working spool and the compressed archive"""
+        session_id = session['session_id']
+        with self.session_store.lock(session_id):
+            state = self.session_store.get(session_id)
+            if state is None or state.get('finalized'):
+                raise ValueError(f"Session {session_id} is no longer recording")
+            self._append_pcm(session, state, pcm)
+    
+    def _append_pcm(self, session: Dict[str, Any], state: Dict[str, Any], pcm: bytes) -> Dict[str, Any]:
+        """Append under the session lock and record the new end offset in the session store"""
+        spool = self._sync_spool(session, state)
+        spool.append(pcm)
+        # Visible to a worker that picks the session up next
+        spool.flush()
+        
+        archive = session.get('archive')
+        archive_owner = state.get('archive_owner')
+        if archive is not None and archive_owner == WORKER_ID:
+            archive.write(pcm)
+        else:
+            # Some chunks bypass the live encoder; the archive is encoded from the spool at the end
+            archive_owner = None
+            if archive is not None:
+                archive.close()
+                session['archive'] = None
+        
+        return self.session_store.update(
+            session['session_id'],
+            data_bytes=spool.data_bytes,
+            chunk_count=spool.chunk_count,
+            last_activity_at=time.time(),
+            archive_owner=archive_owner,
+            audio_format=session.get('audio_format') or state.get('audio_format')
+        )
+    
+    def _sync_spool(self, session: Dict[str, Any], state: Dict[str, Any]) -> AudioSpool:
+        """This process's spool handle, reopened if another worker (or a previous run) wrote past it"""
+        spool = session.get('audio_spool')
+        if spool is not None and not spool.closed and spool.data_bytes == state['data_bytes']:
+            return spool
+        if spool is not None:
+            spool.detach()
+        spool = AudioSpool(
+            Path(state['session_dir']) / WORKING_COPY_NAME,
+            sample_rate=16000,
+            resume_bytes=state['data_bytes'],
+            chunk_count=state['chunk_count']
+        )
+        session['audio_spool'] = spool
+        return spool
+    
+    def _get_session(self, session_id: str) -> Dict[str, Any]:
+        """This process's view of a session, loaded from the session store if another worker started it"""
+        session = self.active_sessions.get(session_id)
+        if session is not None:
+            return session
+        
+        state = self.session_store.get(session_id)
+        if state is None:
+            raise ValueError(f"Session {session_id} not found")
+        
+        # Handles are opened lazily; the spool resumes at the offset recorded in the store
+        session = {
+            **{field: state.get(field) for field in DURABLE_SESSION_FIELDS},
+            'audio_spool': None,
+            'archive': None,
+            'decoder': None,
+            'segment_index': SegmentIndex(sample_rate=16000)
+        }
+        self.active_sessions[session_id] = session
+        logger.info(f"Picked up recording session {session_id} from the session store")
+        return session
+    
+    def has_session(self, session_id: str) -> bool:
+        """Whether a session is recording (or processing) on any worker"""
+        return self.session_store.get(session_id) is not None
+    
+    def _drop_stale_sessions(self):
+        """Close handles of sessions another worker has ended since this process last saw them"""
+        for session_id, session in list(self.active_sessions.items()):
+            if session.get('reprocessed_at') or self.session_store.get(session_id) is not None:
+                continue
+            self.active_sessions.pop(session_id, None)
+            live = self.live_transcribers.pop(session_id, None)
+            if live is not None:
+                live.close()
+            if session.get('decoder') is not None:
+                session['decoder'].close()
+            if session.get('audio_spool') is not None:
+                session['audio_spool'].detach()
+            if session.get('archive') is not None:
+                session['archive'].close()
+    
+    def _release_working_copy(self, session: Dict[str, Any]):
+        """Delete the PCM working copy once the archive holds the recording"""
+        if not session.get('archive_file_path'):
+            return
+        working_copy = Path(session['session_dir']) / WORKING_COPY_NAME
+        working_copy.unlink(missing_ok=True)
+        logger.info(f"Released PCM working copy for session {session['session_id']}")
+    
     def _get_speaker_name(self, session: Dict[str, Any], speaker_id: str) -> str:
         """Get human-readable speaker name"""
         # Map speaker IDs to participant names
@@ -359,38 +997,240 @@ class ConversationRecordingService:
         # Use default mapping
         return speaker_mapping.get(speaker_id, f"Speaker {speaker_id}")
     
-    async def end_recording_session(self, session_id: str) -> Dict[str, Any]:
+    async def end_recording_session(
+        self, 
+        session_id: str,
+        progress: Optional[ProcessingProgress] = None
+    ) -> Dict[str, Any]:
         """End recording session and process all audio"""
-        if session_id not in self.active_sessions:
-            raise ValueError(f"Session {session_id} not found")
-        
-        session = self.active_sessions[session_id]
-        session['status'] = 'processing'
-        session['ended_at'] = datetime.now().isoformat()
+        session = self._get_session(session_id)
+        with self.session_store.lock(session_id):
+            state = self.session_store.get(session_id)
+            if state is None:
+                self.active_sessions.pop(session_id, None)
+                raise ValueError(f"Session {session_id} not found")
+            # A retry after a failed run keeps the original end time
+            session['ended_at'] = state.get('ended_at') or datetime.now().isoformat()
+            session['status'] = SESSION_STATUS_PROCESSING
+            session['expired_reason'] = state.get('expired_reason')
+            self.session_store.update(session_id, status=SESSION_STATUS_PROCESSING, ended_at=session['ended_at'])
+        progress = progress or ProcessingProgress()
         
         # Process complete audio with speaker diarization
-        result = await self.process_complete_audio(session_id)
+        result = await self.process_complete_audio(session_id, progress)
         
         if 'error' in result:
             return result
         
         # Save transcription file
-        transcription_file_path = await self._save_transcription(session)
-        session['transcription_file_path'] = str(transcription_file_path)
+        with progress.stage('persist'):
+            session['stage_durations'] = progress.durations()
+            transcription_file_path = await self._save_transcription(session)
+            session['transcription_file_path'] = str(transcription_file_path)
+            await self._persist_session(session)
+        
+        # Only the compressed archive is kept; reprocessing decodes it on demand
+        self._release_working_copy(session)
         
         # Remove from active sessions
-        del self.active_sessions[session_id]
+        self.session_store.delete(session_id)
+        self.active_sessions.pop(session_id, None)
         
         logger.info(f"Ended recording session {session_id}")
         return {
             'session_id': session_id,
             'status': 'completed',
-            'audio_file_path': result.get('audio_file_path'),
+            'audio_file_path': session.get('archive_file_path') or result.get('audio_file_path'),
             'transcription_file_path': str(transcription_file_path),
             'utterance_count': len(result.get('utterances', [])),
-            'utterances': result.get('utterances', [])
+            'utterances': result.get('utterances', []),
+            'stage_durations': progress.durations()
         }
     
+    async def reprocess_session(
+        self,
+        session_dir: str,
+        processing_mode: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        progress: Optional[ProcessingProgress] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-run diarization and transcription on a stored session and rewrite its transcription.json.
+        The archive is decoded to a temporary working copy if the original was released; only
+        that temporary copy is deleted afterwards.
+        """
+        session_dir = Path(session_dir)
+        transcription_file_path = session_dir / "transcription.json"
+        previous = {}
+        if transcription_file_path.exists():
+            with open(transcription_file_path) as f:
+                previous = json.load(f)
+        
+        session_id = previous.get('session_id') or session_dir.name
+        if self.session_store.get(session_id) is not None:
+            return {'error': f'Session {session_id} is still recording'}
+        
+        processing_mode = processing_mode or previous.get('processing_mode') or DEFAULT_PROCESSING_MODE
+        if processing_mode not in PROCESSING_MODES:
+            raise ValueError(f"Unknown processing mode '{processing_mode}' (expected one of {', '.join(PROCESSING_MODES)})")
+        
+        # Processing reads the PCM working copy, so restore it from the archive if it was released
+        created_working_copy = not (session_dir / WORKING_COPY_NAME).exists()
+        await asyncio.to_thread(ensure_working_copy, session_dir)
+        archive_path = find_archive(session_dir)
+        session = {
+            'session_id': session_id,
+            'project_id': previous.get('project_id'),
+            'session_name': previous.get('session_name'),
+            'participants': previous.get('participants') or [
+                {'id': 'interviewer', 'name': 'Interviewer'},
+                {'id': 'subject', 'name': 'Interview Subject'}
+            ],
+            'started_at': previous.get('started_at'),
+            'ended_at': previous.get('ended_at'),
+            'status': 'processing',
+            'processing_mode': processing_mode,
+            'input_format': previous.get('input_format', INPUT_FORMAT_PCM),
+            'audio_spool': None,
+            'archive_file_path': str(archive_path) if archive_path else None,
+            'archive_format': previous.get('archive_format', ARCHIVE_FORMAT_WAV),
+            'segment_index': SegmentIndex(sample_rate=16000),
+            'session_dir': str(session_dir),
+            'processing_fingerprint': fingerprint,
+            'reprocessed_at': datetime.now().isoformat()
+        }
+        progress = progress or ProcessingProgress()
+        
+        self.active_sessions[session_id] = session
+        try:
+            result = await self.process_complete_audio(session_id, progress)
+            if 'error' in result:
+                return result
+            
+            with progress.stage('persist'):
+                session['stage_durations'] = progress.durations()
+                transcription_file_path = await self._save_transcription(session)
+                session['transcription_file_path'] = str(transcription_file_path)
+                await self._persist_session(session)
+        finally:
+            self.active_sessions.pop(session_id, None)
+            if created_working_copy:
+                self._release_working_copy(session)
+        
+        logger.info(f"Reprocessed session {session_id}")
+        return {
+            'session_id': session_id,
+            'status': 'completed',
+            'transcription_file_path': str(transcription_file_path),
+            'utterance_count': len(result.get('utterances', [])),
+            'stage_durations': progress.durations()
+        }
+    
+    async def _persist_session(self, session: Dict[str, Any]):
+        """Bulk-insert the session and its utterances; transcription.json stays the fallback if this fails"""
+        saved = await asyncio.to_thread(self.database.save_conversation_session, session, session.get('utterances', []))
+        if not saved:
+            logger.warning(f"Session {session['session_id']} was not saved to the database")
+    
+    def load_saved_transcription(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """transcription.json of a processed session, or None"""
+        try:
+            with open(self.storage_path / session_id / "transcription.json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def turn_index(self, session_id: str) -> Optional[TurnIndex]:
+        """
+        Timeline index of a processed session, kept in memory while its transcription.json
+        is unchanged (the TURN_INDEX_CACHE_SIZE most recently used sessions)
+        """
+        try:
+            mtime = (self.storage_path / session_id / "transcription.json").stat().st_mtime_ns
+        except OSError:
+            return None
+        
+        cached = self._turn_indexes.get(session_id)
+        if cached is None or cached[0] != mtime:
+            data = self.load_saved_transcription(session_id)
+            if data is None:
+                return None
+            cached = (mtime, TurnIndex(utterance_rows(data.get('utterances', []))))
+            self._turn_indexes[session_id] = cached
+        self._turn_indexes.move_to_end(session_id)
+        while len(self._turn_indexes) > TURN_INDEX_CACHE_SIZE:
+            self._turn_indexes.popitem(last=False)
+        return cached[1]
+    
+    def word_index(self, project_id: str) -> WordIndex:
+        """
+        Search index over the word timelines of a project's sessions, rebuilt when any
+        session's words.npz changes (timelines that did not change are reused)
+        """
+        mtimes = {}
+        for path in self.storage_path.glob(f"*/{WORD_TIMELINE_NAME}"):
+            try:
+                mtimes[path.parent.name] = path.stat().st_mtime_ns
+            except OSError:
+                continue
+        
+        cached = self._word_indexes.get(project_id)
+        if cached is None or cached[0] != mtimes:
+            previous_mtimes, previous = cached or ({}, WordIndex({}))
+            timelines = {}
+            for session_id, mtime in sorted(mtimes.items()):
+                if previous_mtimes.get(session_id) == mtime:
+                    if session_id in previous.timelines:
+                        timelines[session_id] = previous.timelines[session_id]
+                    continue
+                path = self.storage_path / session_id / WORD_TIMELINE_NAME
+                try:
+                    if read_project_id(path) == project_id:
+                        timelines[session_id] = WordTimeline.load(path)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Skipping unreadable word timeline {path}: {e}")
+            cached = (mtimes, WordIndex(timelines))
+            self._word_indexes[project_id] = cached
+        self._word_indexes.move_to_end(project_id)
+        while len(self._word_indexes) > WORD_INDEX_CACHE_SIZE:
+            self._word_indexes.popitem(last=False)
+        return cached[1]
+    
+    def search_words(self, project_id: str, query: str, limit: int = WORD_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Where a project's sessions mention `query`, with ms offsets and the speaker of each hit"""
+        hits = self.word_index(project_id).search(query, limit)
+        for hit in hits:
+            index = self.turn_index(hit['session_id'])
+            utterance = next(
+                (u for u in (index.between(hit['start_ms'], hit['end_ms'] + 1) if index else []) if u.get('id') == hit['utterance_id']),
+                None
+            )
+            hit['speaker_id'] = utterance.get('speaker_id') if utterance else None
+            hit['speaker'] = utterance.get('speaker_name') if utterance else None
+            hit['audio_segment_path'] = utterance.get('audio_segment_path') if utterance else None
+        return hits
+    
+    def list_saved_sessions(self, project_id: str) -> List[Dict[str, Any]]:
+        """Summaries of a project's processed sessions, read from their transcription.json files"""
+        sessions = []
+        for path in self.storage_path.glob("*/transcription.json"):
+            data = self.load_saved_transcription(path.parent.name)
+            if data is None or data.get('project_id') != project_id:
+                continue
+            utterances = data.get('utterances', [])
+            sessions.append({
+                'id': data.get('session_id') or path.parent.name,
+                'project_id': project_id,
+                'session_name': data.get('session_name'),
+                'status': 'completed',
+                'started_at': data.get('started_at'),
+                'ended_at': data.get('ended_at'),
+                'participants': data.get('participants', []),
+                'utterance_count': len(utterances),
+                'duration': max((row['end_ms'] for row in utterance_rows(utterances)), default=0)
+            })
+        return sessions
+    
     async def _save_transcription(self, session: Dict[str, Any]) -> Path:
         """Save transcription as JSON file"""
         session_dir = Path(session['session_dir'])
@@ -404,13 +1244,42 @@ class ConversationRecordingService:
             'ended_at': session['ended_at'],
             'participants': session['participants'],
             'utterances': session.get('utterances', []),
-            'audio_file_path': session.get('audio_file_path'),
-            'processing_method': 'pyannote-audio'
+            'audio_file_path': session.get('archive_file_path') or session.get('audio_file_path'),
+            'archive_format': session.get('archive_format', ARCHIVE_FORMAT_WAV),
+            'processing_method': 'pyannote-audio',
+            'processing_mode': session.get('processing_mode', PROCESSING_MODE_PER_SEGMENT),
+            'input_format': session.get('input_format', INPUT_FORMAT_PCM),
+            'live_transcription': bool(session.get('live_transcription')),
+            'stage_durations': session.get('stage_durations', {}),
+            'speech_seconds': session.get('speech_seconds'),
+            'speech_regions': session.get('speech_regions', [])
         }
+        if session.get('expired_reason'):
+            # Finalized by the session reaper rather than ended by the client
+            transcription_data['expired_reason'] = session['expired_reason']
+        if session.get('processing_fingerprint'):
+            transcription_data['processing_fingerprint'] = session['processing_fingerprint']
+            transcription_data['reprocessed_at'] = session.get('reprocessed_at')
         
         with open(transcription_file_path, 'w') as f:
             json.dump(transcription_data, f, indent=2)
         
+        # Lets the playback endpoint find an utterance's samples without parsing the transcription
+        segment_index = session.get('segment_index')
+        if segment_index is not None:
+            segment_index.save(session_dir / SEGMENT_INDEX_NAME)
+        
+        # Word timestamps in utterance order, for search; dropped if this run produced none
+        words_path = session_dir / WORD_TIMELINE_NAME
+        utterance_words = session.get('utterance_words') or {}
+        if any(utterance_words.values()):
+            WordTimeline.from_utterances(
+                ((u['id'], utterance_words.get(u['id'], [])) for u in session.get('utterances', [])),
+                session.get('project_id')
+            ).save(words_path)
+        else:
+            words_path.unlink(missing_ok=True)
+        
         return transcription_file_path
 
 # Global service instance
@@ -5,19 +5,29 @@ Provides a bridge between in-memory operations and PostgreSQL persistence
 import os
 import sys
 import json
+import uuid
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, insert, delete, select, tuple_
 from sqlalchemy.orm import sessionmaker
 from contextlib import contextmanager
 import logging
 
 # Add parent directory to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
-from backend.database_models import Project as DBProject, Base
+from backend.database_models import Project as DBProject, Base, ConversationSession, ConversationUtterance
+from .transcript_query import SESSION_PAGE_SIZE, clamp_limit, decode_cursor, encode_cursor, utterance_rows
 
 logger = logging.getLogger(__name__)
 
+# Utterance fields with a column of their own; the rest (sample and byte offsets...) go to metadata
+UTTERANCE_COLUMNS = (
+    'speaker_id', 'speaker_name', 'text', 'confidence', 'duration',
+    'audio_segment_path', 'sequence', 'start_ms', 'end_ms'
+)
+# Not stored: the row's own timestamp, and the MM:SS display times derived from start_ms/end_ms
+UTTERANCE_DERIVED_FIELDS = ('id', 'timestamp', 'start_time', 'end_time')
+
 class DatabaseService:
     """
     Database service that handles persistence while maintaining compatibility
@@ -225,5 +235,181 @@ class DatabaseService:
             logger.error(f"Failed to list projects: {e}")
             return all_projects
 
+    def save_conversation_session(self, session_data: Dict[str, Any], utterances: List[Dict[str, Any]]) -> bool:
+        """
+        Save a processed recording session and all of its utterances in one transaction.
+        Utterances go in as one executemany, which the driver batches into multi-row INSERTs;
+        a reprocessed session replaces its previous utterances.
+        """
+        if not self.use_database:
+            return True
+        
+        session_id = session_data["session_id"]
+        rows = utterance_rows(utterances)
+        try:
+            session_uuid = uuid.UUID(str(session_id))
+            with self.get_db_session() as session:
+                if session is None:
+                    return True
+                
+                session.merge(ConversationSession(
+                    id=session_uuid,
+                    project_id=uuid.UUID(str(session_data["project_id"])),
+                    session_name=session_data.get("session_name") or "Recording",
+                    status="completed",
+                    started_at=_parse_datetime(session_data.get("started_at")),
+                    ended_at=_parse_datetime(session_data.get("ended_at")),
+                    audio_file_path=session_data.get("archive_file_path") or session_data.get("audio_file_path"),
+                    transcription_file_path=session_data.get("transcription_file_path"),
+                    participants=session_data.get("participants", []),
+                    utterance_count=len(rows),
+                    duration=max((row["end_ms"] for row in rows), default=0),
+                    extra_metadata={
+                        key: session_data[key]
+                        for key in ("processing_mode", "archive_format", "input_format", "expired_reason", "speech_seconds")
+                        if session_data.get(key) is not None
+                    }
+                ))
+                session.execute(
+                    delete(ConversationUtterance.__table__).where(ConversationUtterance.session_id == session_uuid)
+                )
+                # The session row must exist before the utterance foreign keys are checked
+                session.flush()
+                if rows:
+                    session.execute(
+                        insert(ConversationUtterance.__table__),
+                        [_utterance_record(session_uuid, row) for row in rows]
+                    )
+            
+            logger.info(f"💾 Saved conversation session {session_id} with {len(rows)} utterances")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to save conversation session {session_id}: {e}")
+            return False
+    
+    def list_conversation_sessions(
+        self,
+        project_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        One page of a project's sessions, newest first.
+        Returns None when the database is unavailable so callers can fall back to the recordings on disk.
+        """
+        limit = clamp_limit(limit, SESSION_PAGE_SIZE)
+        before = decode_cursor(cursor, 2)
+        if not self.use_database:
+            return None
+        
+        try:
+            project_uuid = uuid.UUID(project_id)
+        except ValueError:
+            return {"sessions": [], "next_cursor": None}
+        
+        try:
+            with self.get_db_session() as session:
+                if session is None:
+                    return None
+                
+                query = select(ConversationSession).where(ConversationSession.project_id == project_uuid)
+                if before is not None:
+                    query = query.where(
+                        tuple_(ConversationSession.started_at, ConversationSession.id)
+                        < (datetime.fromisoformat(before[0]), uuid.UUID(before[1]))
+                    )
+                query = query.order_by(ConversationSession.started_at.desc(), ConversationSession.id.desc()).limit(limit + 1)
+                records = session.execute(query).scalars().all()
+                
+                page = records[:limit]
+                next_cursor = None
+                if len(records) > limit:
+                    next_cursor = encode_cursor(page[-1].started_at.isoformat(), str(page[-1].id))
+                return {"sessions": [record.to_dict() for record in page], "next_cursor": next_cursor}
+                
+        except Exception as e:
+            logger.error(f"Failed to list conversation sessions for {project_id}: {e}")
+            return None
+    
+    def get_conversation_transcript(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        speaker_id: Optional[str] = None,
+        from_ms: Optional[int] = None,
+        to_ms: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        A session and one page of its utterances in recording order.
+        Returns None when the database is unavailable or does not hold the session.
+        """
+        limit = clamp_limit(limit)
+        after = decode_cursor(cursor, 1)
+        if not self.use_database:
+            return None
+        
+        try:
+            with self.get_db_session() as session:
+                if session is None:
+                    return None
+                
+                record = session.get(ConversationSession, uuid.UUID(session_id))
+                if record is None:
+                    return None
+                
+                query = utterance_page_query(
+                    record.id, limit + 1, after[0] if after else None, speaker_id, from_ms, to_ms
+                )
+                utterances = [utterance.to_dict() for utterance in session.execute(query).scalars().all()]
+                
+                page = utterances[:limit]
+                next_cursor = encode_cursor(page[-1]["sequence"]) if len(utterances) > limit else None
+                return {"session": record.to_dict(), "utterances": page, "next_cursor": next_cursor}
+                
+        except Exception as e:
+            logger.error(f"Failed to load transcript for session {session_id}: {e}")
+            return None
+
+def utterance_page_query(
+    session_uuid: uuid.UUID,
+    limit: int,
+    after_sequence: Optional[int] = None,
+    speaker_id: Optional[str] = None,
+    from_ms: Optional[int] = None,
+    to_ms: Optional[int] = None
+):
+    """Keyset page of a session's utterances; the time filter keeps utterances overlapping [from_ms, to_ms)"""
+    query = select(ConversationUtterance).where(ConversationUtterance.session_id == session_uuid)
+    if after_sequence is not None:
+        query = query.where(ConversationUtterance.sequence > after_sequence)
+    if speaker_id is not None:
+        query = query.where(ConversationUtterance.speaker_id == speaker_id)
+    if from_ms is not None:
+        query = query.where(ConversationUtterance.end_ms > from_ms)
+    if to_ms is not None:
+        query = query.where(ConversationUtterance.start_ms < to_ms)
+    return query.order_by(ConversationUtterance.sequence).limit(limit)
+
+def _utterance_record(session_uuid: uuid.UUID, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values of one utterance row (keys are table column names)"""
+    record = {key: row.get(key) for key in UTTERANCE_COLUMNS}
+    record["id"] = uuid.UUID(row["id"]) if row.get("id") else uuid.uuid4()
+    record["session_id"] = session_uuid
+    record["speaker_id"] = row.get("speaker_id") or "UNKNOWN"
+    record["text"] = row.get("text") or ""
+    record["confidence"] = str(row["confidence"]) if row.get("confidence") is not None else None
+    record["metadata"] = {
+        key: value for key, value in row.items()
+        if key not in UTTERANCE_COLUMNS and key not in UTTERANCE_DERIVED_FIELDS
+    }
+    return record
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
 # Global database service instance
 db_service = DatabaseService()
@@ -0,0 +1,205 @@
+"""
+Diarization Pool - runs PyAnnote-Audio speaker diarization in worker processes
+Keeps CPU-heavy torch inference off the FastAPI event loop
+"""
+import os
+import queue
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pyannote.audio import Pipeline
+    from pyannote.audio.pipelines.utils.hook import ProgressHook
+    PYANNOTE_AVAILABLE = True
+except ImportError:
+    PYANNOTE_AVAILABLE = False
+
+DIARIZATION_MODEL = "pyannote/speaker-diarization-3.1"
+# Number of diarization worker processes (0 runs the pipeline in a thread of this process)
+DIARIZATION_WORKERS = int(os.getenv('DIARIZATION_WORKERS', '2'))
+# Torch intra-op threads per worker (0 splits the machine's cores evenly across workers)
+DIARIZATION_TORCH_THREADS = int(os.getenv('DIARIZATION_TORCH_THREADS', '0'))
+DIARIZATION_START_METHOD = os.getenv('DIARIZATION_START_METHOD', 'spawn')
+# How often the parent drains progress messages from a running worker
+PROGRESS_POLL_SECONDS = 0.25
+
+# Warm pipeline for the current process (each worker keeps its own)
+_pipeline = None
+_pipeline_failed = False
+
+
+def load_pipeline() -> Optional[Any]:
+    """Load the PyAnnote pipeline once per process; None when unavailable"""
+    global _pipeline, _pipeline_failed
+    if _pipeline is not None or _pipeline_failed:
+        return _pipeline
+
+    if not PYANNOTE_AVAILABLE:
+        _pipeline_failed = True
+        return None
+
+    hf_token = os.getenv('HF_TOKEN')
+    if not hf_token:
+        logger.warning("HF_TOKEN not found in environment - PyAnnote-Audio will use fallback")
+        _pipeline_failed = True
+        return None
+
+    try:
+        _pipeline = Pipeline.from_pretrained(DIARIZATION_MODEL, use_auth_token=hf_token)
+        logger.info(f"PyAnnote-Audio pipeline loaded in process {os.getpid()}")
+    except Exception as e:
+        logger.warning(f"Failed to load PyAnnote-Audio pipeline: {e}")
+        _pipeline_failed = True
+    return _pipeline
+
+
+def warm_pipeline() -> Any:
+    """
+    Load the pipeline in this process, raising when it is unavailable.
+
+    Called before the pool starts (e.g. in a pre-forking server's master), it
+    lets fork-started workers inherit the loaded weights copy-on-write instead
+    of each loading its own copy.
+    """
+    pipeline = load_pipeline()
+    if pipeline is None:
+        raise RuntimeError("PyAnnote-Audio pipeline unavailable (pyannote.audio or HF_TOKEN missing)")
+    return pipeline
+
+
+def _init_worker(torch_threads: int):
+    """Process pool initializer: pin torch threads and warm the pipeline (a no-op when inherited)"""
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    load_pipeline()
+
+
+class _ForwardingProgressHook:
+    """Wraps pyannote's ProgressHook and forwards (step, completed, total) to a queue"""
+
+    def __init__(self, progress_queue: Any):
+        self.progress_queue = progress_queue
+        self._hook = ProgressHook()
+        self._last_percent = {}
+
+    def __enter__(self):
+        self._hook.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._hook.__exit__(*exc_info)
+
+    def __call__(self, step_name, step_artifact, file=None, total=None, completed=None):
+        self._hook(step_name, step_artifact, file=file, total=total, completed=completed)
+
+        if total is None or completed is None:
+            total, completed = 1, 1
+        # Only forward whole-percent changes to keep IPC traffic small
+        percent = int(100 * completed / total) if total else 100
+        if self._last_percent.get(step_name) != percent:
+            self._last_percent[step_name] = percent
+            self.progress_queue.put((step_name, completed, total))
+
+
+def _diarize(audio_file_path: str, progress_queue: Any = None) -> Optional[Any]:
+    """Run diarization with this process's pipeline; None when it cannot load"""
+    pipeline = load_pipeline()
+    if pipeline is None:
+        return None
+
+    hook = _ForwardingProgressHook(progress_queue) if progress_queue is not None else ProgressHook()
+    with hook:
+        return pipeline(audio_file_path, hook=hook)
+
+
+class DiarizationPool:
+    """Dedicated process pool for speaker diarization"""
+
+    def __init__(self, workers: int = DIARIZATION_WORKERS, torch_threads: int = DIARIZATION_TORCH_THREADS):
+        self.workers = max(0, workers)
+        if torch_threads <= 0:
+            torch_threads = max(1, (os.cpu_count() or 1) // max(1, self.workers))
+        self.torch_threads = torch_threads
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Manager process hosting progress queues shared with workers
+        self._manager = None
+
+    @property
+    def available(self) -> bool:
+        """Whether real diarization can run at all (otherwise callers use their fallback)"""
+        return PYANNOTE_AVAILABLE and bool(os.getenv('HF_TOKEN')) and not _pipeline_failed
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(DIARIZATION_START_METHOD),
+                initializer=_init_worker,
+                initargs=(self.torch_threads,)
+            )
+            logger.info(f"Started diarization pool with {self.workers} workers x {self.torch_threads} torch threads")
+        return self._executor
+
+    def _progress_queue(self) -> Any:
+        """Queue a worker can report progress through"""
+        if self.workers == 0:
+            return queue.Queue()
+        if self._manager is None:
+            self._manager = multiprocessing.get_context(DIARIZATION_START_METHOD).Manager()
+        return self._manager.Queue()
+
+    async def diarize(
+        self,
+        audio_file_path: str,
+        on_progress: Optional[Callable[[str, int, int], None]] = None
+    ) -> Optional[Any]:
+        """
+        Diarize a file without blocking the event loop; None when the pipeline is unavailable.
+        `on_progress(step_name, completed, total)` is called on the event loop as
+        pyannote's ProgressHook reports each pipeline step.
+        """
+        loop = asyncio.get_running_loop()
+        progress_queue = self._progress_queue() if on_progress else None
+
+        try:
+            if self.workers == 0:
+                future = asyncio.ensure_future(asyncio.to_thread(_diarize, audio_file_path, progress_queue))
+            else:
+                future = loop.run_in_executor(self._get_executor(), _diarize, audio_file_path, progress_queue)
+
+            if progress_queue is not None:
+                while not future.done():
+                    await asyncio.wait({future}, timeout=PROGRESS_POLL_SECONDS)
+                    self._drain_progress(progress_queue, on_progress)
+            return await future
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool on the next request
+            logger.error("Diarization worker crashed - restarting pool on next request")
+            self._executor = None
+            raise
+
+    def _drain_progress(self, progress_queue: Any, on_progress: Callable[[str, int, int], None]):
+        while True:
+            try:
+                step_name, completed, total = progress_queue.get_nowait()
+            except queue.Empty:
+                return
+            on_progress(step_name, completed, total)
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
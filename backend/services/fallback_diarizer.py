@@ -0,0 +1,343 @@
+"""
+Fallback Diarizer - CPU-only speaker diarization with NumPy
+MFCC features, VAD speech regions and k-means clustering when pyannote is unavailable
+"""
+import os
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .audio_slicing import PCMAudioReader
+from .voice_activity import Region, detect_speech_in_file
+
+logger = logging.getLogger(__name__)
+
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+N_FFT = 512
+N_MELS = 40
+N_MFCC = 20
+# Speaker embeddings are MFCC statistics over sliding windows inside speech regions
+FALLBACK_WINDOW_SECONDS = float(os.getenv('FALLBACK_DIARIZATION_WINDOW_SECONDS', '1.5'))
+FALLBACK_WINDOW_HOP_SECONDS = float(os.getenv('FALLBACK_DIARIZATION_HOP_SECONDS', '0.75'))
+FALLBACK_MIN_REGION_SECONDS = 0.3
+# Speaker count search when the session gives no hint
+FALLBACK_MAX_SPEAKERS = int(os.getenv('FALLBACK_DIARIZATION_MAX_SPEAKERS', '4'))
+FALLBACK_MIN_SILHOUETTE = 0.1
+# Silhouette needs all pairwise distances, so it is scored on a sample of windows
+SILHOUETTE_SAMPLE = 1000
+KMEANS_RESTARTS = 5
+KMEANS_ITERATIONS = 50
+# Seconds of audio turned into features per read (bounded memory for long recordings)
+FEATURE_BLOCK_SECONDS = 60
+
+
+class Segment:
+    """Time span of a speaker turn (mirrors pyannote.core.Segment)"""
+
+    def __init__(self, start: float, end: float):
+        self.start = start
+        self.end = end
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return f"<Segment({self.start:.3f}, {self.end:.3f})>"
+
+
+class FallbackDiarization:
+    """Speaker turns with the parts of pyannote's Annotation interface the service uses"""
+
+    def __init__(self, turns: List[Tuple[float, float, str]]):
+        self.turns = sorted(turns)
+
+    def itertracks(self, yield_label: bool = False) -> Iterator[Tuple]:
+        for index, (start, end, label) in enumerate(self.turns):
+            if yield_label:
+                yield Segment(start, end), index, label
+            else:
+                yield Segment(start, end), index
+
+    def __iter__(self) -> Iterator[Tuple[Segment, str]]:
+        for start, end, label in self.turns:
+            yield Segment(start, end), label
+
+    def labels(self) -> List[str]:
+        return sorted({label for _, _, label in self.turns})
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def __repr__(self) -> str:
+        return f"<FallbackDiarization {len(self.turns)} turns, speakers={self.labels()}>"
+
+
+def mel_filterbank(sample_rate: int, n_fft: int = N_FFT, n_mels: int = N_MELS) -> np.ndarray:
+    """(n_mels, n_fft // 2 + 1) triangular filters on the mel scale"""
+    to_mel = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)
+    to_hz = lambda mel: 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+    edges = to_hz(np.linspace(to_mel(20.0), to_mel(sample_rate / 2), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+
+    lower, centre, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (centre - lower)
+    falling = (upper - bins) / (upper - centre)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+def dct_matrix(n_mfcc: int = N_MFCC, n_mels: int = N_MELS) -> np.ndarray:
+    """Orthonormal DCT-II basis, (n_mfcc, n_mels)"""
+    k = np.arange(n_mfcc)[:, None]
+    n = np.arange(n_mels)[None, :]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+def mfcc(
+    samples: np.ndarray,
+    sample_rate: int,
+    filterbank: Optional[np.ndarray] = None,
+    previous_sample: float = 0.0
+) -> np.ndarray:
+    """
+    (frames, N_MFCC) MFCCs of mono float samples, 25 ms frames every 10 ms.
+    `previous_sample` continues the pre-emphasis filter from an earlier block.
+    """
+    frame_length = int(round(FRAME_SECONDS * sample_rate))
+    hop = int(round(HOP_SECONDS * sample_rate))
+    if len(samples) < frame_length:
+        return np.zeros((0, N_MFCC), dtype=np.float32)
+
+    emphasized = (samples - 0.97 * np.concatenate(([previous_sample], samples[:-1]))).astype(np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(emphasized, frame_length)[::hop]
+    spectrum = np.fft.rfft(frames * np.hamming(frame_length).astype(np.float32), n=N_FFT)
+    power = (spectrum.real ** 2 + spectrum.imag ** 2) / N_FFT
+
+    if filterbank is None:
+        filterbank = mel_filterbank(sample_rate)
+    log_mel = np.log(power @ filterbank.T + 1e-10)
+    return (log_mel @ dct_matrix().T).astype(np.float32)
+
+
+def file_mfcc(audio_file_path: Union[str, Path]) -> Tuple[np.ndarray, int]:
+    """MFCCs of a PCM WAV file, computed block by block; returns (features, sample_rate)"""
+    with PCMAudioReader(audio_file_path) as reader:
+        if reader.sample_width != 2:
+            raise ValueError(f"Unsupported sample width {reader.sample_width} for diarization")
+        sample_rate = reader.sample_rate
+        frame_length = int(round(FRAME_SECONDS * sample_rate))
+        hop = int(round(HOP_SECONDS * sample_rate))
+        filterbank = mel_filterbank(sample_rate)
+
+        # Blocks start on hop boundaries and overlap by one frame, so frames come out exactly as for the whole file
+        block_samples = FEATURE_BLOCK_SECONDS * sample_rate // hop * hop
+        blocks = []
+        for block_start in range(0, reader.frame_count, block_samples):
+            # One sample of history keeps pre-emphasis continuous across blocks
+            history = 1 if block_start else 0
+            pcm = reader.read_frames(block_start - history, block_start + block_samples + frame_length - hop)
+            samples = np.frombuffer(pcm, dtype='<i2').reshape(-1, reader.channels)
+            mono = samples.mean(axis=1, dtype=np.float32) / 32768.0
+            previous = float(mono[0]) if history else 0.0
+            blocks.append(mfcc(mono[history:], sample_rate, filterbank, previous)[:block_samples // hop])
+    if not blocks:
+        return np.zeros((0, N_MFCC), dtype=np.float32), sample_rate
+    return np.concatenate(blocks), sample_rate
+
+
+def window_spans(regions: List[Region]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Embedding windows over the speech regions: (window starts, window ends, region index).
+    Regions shorter than one window get a single window covering them.
+    """
+    starts, ends, owners = [], [], []
+    for index, (region_start, region_end) in enumerate(regions):
+        length = region_end - region_start
+        if length < FALLBACK_MIN_REGION_SECONDS:
+            continue
+        count = max(1, int(np.ceil((length - FALLBACK_WINDOW_SECONDS) / FALLBACK_WINDOW_HOP_SECONDS)) + 1)
+        window_starts = region_start + np.arange(count) * FALLBACK_WINDOW_HOP_SECONDS
+        window_starts = np.minimum(window_starts, max(region_start, region_end - FALLBACK_WINDOW_SECONDS))
+        starts.append(window_starts)
+        ends.append(np.minimum(window_starts + FALLBACK_WINDOW_SECONDS, region_end))
+        owners.append(np.full(count, index))
+    if not starts:
+        empty = np.zeros(0)
+        return empty, empty, np.zeros(0, dtype=np.int64)
+    return np.concatenate(starts), np.concatenate(ends), np.concatenate(owners)
+
+
+def window_embeddings(features: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Mean (mean-normalized) MFCCs of each window - the average spectral envelope,
+    which follows the speaker's vocal tract rather than what they are saying.
+    Prefix sums make every window O(1) however much the windows overlap.
+    """
+    features = features - features.mean(axis=0)
+    first = np.clip(np.round(starts / HOP_SECONDS).astype(np.int64), 0, len(features))
+    last = np.clip(np.round(ends / HOP_SECONDS).astype(np.int64), 0, len(features))
+    last = np.maximum(last, np.minimum(first + 1, len(features)))
+    counts = np.maximum(last - first, 1)[:, None]
+
+    sums = np.concatenate((np.zeros((1, features.shape[1])), np.cumsum(features, axis=0, dtype=np.float64)))
+    # c0 is overall loudness, which says more about microphone distance than about the speaker
+    return ((sums[last] - sums[first]) / counts)[:, 1:]
+
+
+def kmeans(points: np.ndarray, k: int, seed: int = 0) -> Tuple[np.ndarray, float]:
+    """k-means++ initialised k-means with restarts; returns (labels, inertia)"""
+    rng = np.random.default_rng(seed)
+    best_labels, best_inertia = np.zeros(len(points), dtype=np.int64), np.inf
+    for _ in range(KMEANS_RESTARTS):
+        centres = points[[rng.integers(len(points))]]
+        for _ in range(1, k):
+            distance = ((points[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+            if distance.sum() == 0:
+                break
+            centres = np.vstack((centres, points[rng.choice(len(points), p=distance / distance.sum())]))
+
+        labels = np.full(len(points), -1, dtype=np.int64)
+        for _ in range(KMEANS_ITERATIONS):
+            distance = squared_distances(points, centres)
+            new_labels = distance.argmin(axis=1)
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+            centres = np.vstack([
+                points[labels == cluster].mean(axis=0) if np.any(labels == cluster) else centres[cluster]
+                for cluster in range(len(centres))
+            ])
+
+        inertia = float(distance[np.arange(len(points)), labels].sum())
+        if inertia < best_inertia:
+            best_labels, best_inertia = labels, inertia
+    return best_labels, best_inertia
+
+
+def squared_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise squared euclidean distances as ||a||^2 + ||b||^2 - 2 a.b, without an (N, M, D) temporary"""
+    distance = (a ** 2).sum(axis=1)[:, None] + (b ** 2).sum(axis=1)[None, :] - 2.0 * (a @ b.T)
+    # Rounding can leave tiny negatives where points coincide
+    return np.maximum(distance, 0.0)
+
+
+def silhouette(points: np.ndarray, labels: np.ndarray) -> float:
+    """Mean silhouette coefficient (-1..1) of a clustering"""
+    clusters = np.unique(labels)
+    if len(clusters) < 2:
+        return 0.0
+    distance = np.sqrt(squared_distances(points, points))
+    members = labels[None, :] == clusters[:, None]
+    # Mean distance from every point to every cluster
+    sizes = members.sum(axis=1)
+    mean_to_cluster = (distance @ members.T) / sizes[None, :]
+    own = np.searchsorted(clusters, labels)
+    own_size = sizes[own]
+    # Exclude the point itself from its own cluster's mean
+    a = mean_to_cluster[np.arange(len(points)), own] * own_size / np.maximum(own_size - 1, 1)
+    mean_to_cluster[np.arange(len(points)), own] = np.inf
+    b = mean_to_cluster.min(axis=1)
+    scores = np.where(own_size > 1, (b - a) / np.maximum(np.maximum(a, b), 1e-10), 0.0)
+    return float(scores.mean())
+
+
+def cluster_speakers(embeddings: np.ndarray, num_speakers: Optional[int] = None) -> np.ndarray:
+    """Speaker label per window; the count is the hint if given, otherwise the best silhouette"""
+    if len(embeddings) == 0:
+        return np.zeros(0, dtype=np.int64)
+    spread = embeddings.std(axis=0)
+    points = (embeddings - embeddings.mean(axis=0)) / np.where(spread > 0, spread, 1.0)
+
+    if num_speakers:
+        return kmeans(points, max(1, min(num_speakers, len(points))))[0]
+
+    sample = np.random.default_rng(0).permutation(len(points))[:SILHOUETTE_SAMPLE]
+    best_labels, best_score = np.zeros(len(points), dtype=np.int64), FALLBACK_MIN_SILHOUETTE
+    for k in range(2, min(FALLBACK_MAX_SPEAKERS, len(points) - 1) + 1):
+        labels, _ = kmeans(points, k)
+        score = silhouette(points[sample], labels[sample])
+        if score > best_score:
+            best_labels, best_score = labels, score
+    return best_labels
+
+
+def smooth_labels(labels: np.ndarray, owners: np.ndarray) -> np.ndarray:
+    """Relabel single windows that disagree with both neighbours in the same region"""
+    if len(labels) < 3:
+        return labels
+    previous, current, following = labels[:-2], labels[1:-1], labels[2:]
+    same_region = (owners[:-2] == owners[1:-1]) & (owners[1:-1] == owners[2:])
+    flip = same_region & (previous == following) & (current != previous)
+    smoothed = labels.copy()
+    smoothed[1:-1][flip] = previous[flip]
+    return smoothed
+
+
+def turns_from_windows(
+    regions: List[Region],
+    starts: np.ndarray,
+    ends: np.ndarray,
+    owners: np.ndarray,
+    labels: np.ndarray
+) -> List[Tuple[float, float, str]]:
+    """Cut each region at the midpoints between window centres and merge same-speaker runs"""
+    if len(labels) == 0:
+        return []
+    # Name speakers in order of first appearance
+    _, first_seen = np.unique(labels, return_index=True)
+    order = np.argsort(np.argsort(first_seen))
+    names = [f"SPEAKER_{order[cluster]:02d}" for cluster in range(len(first_seen))]
+    clusters = np.searchsorted(np.unique(labels), labels)
+
+    centres = (starts + ends) / 2
+    region_starts = np.array([regions[owner][0] for owner in owners])
+    region_ends = np.array([regions[owner][1] for owner in owners])
+    same_as_next = np.append(owners[1:] == owners[:-1], False)
+    same_as_previous = np.insert(owners[1:] == owners[:-1], 0, False)
+    midpoints = np.append((centres[1:] + centres[:-1]) / 2, 0.0)
+    cut_ends = np.where(same_as_next, midpoints, region_ends)
+    cut_starts = np.where(same_as_previous, np.insert(midpoints[:-1], 0, 0.0), region_starts)
+
+    # A new turn starts at a region boundary or a speaker change
+    new_turn = ~same_as_previous | np.insert(clusters[1:] != clusters[:-1], 0, True)
+    turn_starts = np.flatnonzero(new_turn)
+    turn_ends = np.append(turn_starts[1:], len(clusters)) - 1
+    return [
+        (float(cut_starts[first]), float(cut_ends[last]), names[clusters[first]])
+        for first, last in zip(turn_starts, turn_ends)
+    ]
+
+
+def fallback_settings() -> Dict[str, Any]:
+    """Parameters that change the fallback diarizer's output"""
+    return {
+        'fallback': True,
+        'window_seconds': FALLBACK_WINDOW_SECONDS,
+        'hop_seconds': FALLBACK_WINDOW_HOP_SECONDS,
+        'max_speakers': FALLBACK_MAX_SPEAKERS,
+    }
+
+
+def diarize_file(
+    audio_file_path: Union[str, Path],
+    num_speakers: Optional[int] = None,
+    regions: Optional[List[Region]] = None
+) -> FallbackDiarization:
+    """Speaker turns of a PCM WAV file, entirely on the CPU"""
+    if regions is None:
+        regions, _ = detect_speech_in_file(audio_file_path)
+    features, _ = file_mfcc(audio_file_path)
+    starts, ends, owners = window_spans(regions)
+    if len(starts) == 0 or len(features) == 0:
+        return FallbackDiarization([])
+
+    embeddings = window_embeddings(features, starts, ends)
+    labels = smooth_labels(cluster_speakers(embeddings, num_speakers), owners)
+    turns = turns_from_windows(regions, starts, ends, owners, labels)
+    logger.info(f"Fallback diarization found {len(set(label for _, _, label in turns))} speakers in {len(turns)} turns")
+    return FallbackDiarization(turns)
@@ -0,0 +1,235 @@
+"""
+Live Transcription - rolling-window transcription of a recording while it is still being made
+Every few seconds the newest stable audio is transcribed with a small overlap into the previous
+window; repeated words at the seams are dropped, and partial/final segments go to subscribers
+"""
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .turn_index import to_ms
+from .word_index import normalize_word
+
+logger = logging.getLogger(__name__)
+
+LIVE_TRANSCRIPTION_ENABLED = os.getenv('LIVE_TRANSCRIPTION', 'false').lower() == 'true'
+LIVE_TRANSCRIPTION_INTERVAL_SECONDS = float(os.getenv('LIVE_TRANSCRIPTION_INTERVAL_SECONDS', '10'))
+# Audio re-sent from before the last finalized segment, and the margin at the newest edge
+# inside which segments may still be cut mid-word
+LIVE_TRANSCRIPTION_OVERLAP_SECONDS = float(os.getenv('LIVE_TRANSCRIPTION_OVERLAP_SECONDS', '1.5'))
+# Longest window per request when catching up (well under Whisper's 25 MB upload cap)
+LIVE_TRANSCRIPTION_MAX_WINDOW_SECONDS = float(os.getenv('LIVE_TRANSCRIPTION_MAX_WINDOW_SECONDS', '120'))
+
+# Whisper rejects clips shorter than 0.1s
+MIN_WINDOW_SECONDS = 0.1
+# Words of a segment compared against the end of the previous one when de-duplicating
+MAX_REPEATED_WORDS = 12
+
+Segment = Dict[str, Any]
+
+
+def drop_repeated_prefix(previous_text: str, text: str, max_words: int = MAX_REPEATED_WORDS) -> str:
+    """`text` without the leading words that repeat the end of `previous_text` (overlapping windows)"""
+    previous, current = previous_text.split(), text.split()
+    previous_norm, current_norm = [normalize_word(w) for w in previous], [normalize_word(w) for w in current]
+    for count in range(min(len(previous), len(current), max_words), 0, -1):
+        if previous_norm[-count:] == current_norm[:count]:
+            return ' '.join(current[count:])
+    return text
+
+
+def segment_event(segment: Segment) -> Dict[str, Any]:
+    """Client-facing form of a live segment"""
+    return {
+        'start_ms': to_ms(segment['start']),
+        'end_ms': to_ms(segment['end']),
+        'text': segment['text'],
+        'confidence': segment.get('confidence')
+    }
+
+
+class RollingTranscript:
+    """
+    Merges overlapping window transcripts into finalized segments plus a partial tail.
+
+    Everything before `committed_until` is final. Each window starts `overlap`
+    seconds before it, so a word cut by the previous window is heard whole. A
+    segment ending inside the last `overlap` seconds of a window may itself be
+    cut, so it stays partial and is transcribed again by the next window.
+    """
+
+    def __init__(self, overlap: float = LIVE_TRANSCRIPTION_OVERLAP_SECONDS):
+        self.overlap = overlap
+        self.segments: List[Segment] = []
+        self.partial: List[Segment] = []
+        self.committed_until = 0.0
+
+    def next_window(
+        self,
+        audio_end: float,
+        final: bool = False,
+        max_window: float = LIVE_TRANSCRIPTION_MAX_WINDOW_SECONDS
+    ) -> Optional[Tuple[float, float]]:
+        """The next (start, end) to transcribe, or None until enough new audio has arrived"""
+        start = max(0.0, self.committed_until - self.overlap)
+        end = min(audio_end, start + max_window)
+        if end - start < MIN_WINDOW_SECONDS or end <= self.committed_until + (0.0 if final else self.overlap):
+            return None
+        return start, end
+
+    def merge(self, window_end: float, segments: List[Segment], final: bool = False) -> Tuple[List[Segment], List[Segment]]:
+        """
+        Fold one window's segments (recording times) into the transcript.
+        Returns (newly finalized segments, current partial segments).
+        """
+        stable_until = window_end if final else window_end - self.overlap
+        finalized, partial = [], []
+        for segment in sorted(segments, key=lambda s: s['start']):
+            # Already finalized by the previous window
+            if segment['end'] <= self.committed_until:
+                continue
+            text = segment['text'].strip()
+            # Words heard before the commit point were finalized with the previous segment
+            words = [w for w in segment.get('words', []) if (w[1] + w[2]) / 2 >= self.committed_until]
+            if segment['start'] < self.committed_until and self.segments:
+                text = drop_repeated_prefix(self.segments[-1]['text'], text)
+            if not text:
+                continue
+            segment = {**segment, 'start': max(segment['start'], self.committed_until), 'text': text, 'words': words}
+
+            if segment['end'] <= stable_until and not partial:
+                finalized.append(segment)
+                self.segments.append(segment)
+                self.committed_until = segment['end']
+            else:
+                partial.append(segment)
+
+        if partial:
+            # Any gap before the partial tail is silence that needs no second look
+            self.committed_until = max(self.committed_until, min(partial[0]['start'], stable_until))
+        else:
+            self.committed_until = max(self.committed_until, stable_until)
+        self.partial = partial
+        return finalized, partial
+
+
+class LiveTranscriber:
+    """
+    Background rolling-window transcription of one recording session.
+
+    `transcribe_window(start, end)` returns Whisper segments on the recording's
+    timeline; `audio_end()` is how many seconds are safely on disk. Subscribers
+    get a `snapshot`, then `final` and `partial` events, and a last `done`.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        transcribe_window: Callable[[float, float], Awaitable[List[Segment]]],
+        audio_end: Callable[[], float],
+        interval: float = LIVE_TRANSCRIPTION_INTERVAL_SECONDS,
+        overlap: float = LIVE_TRANSCRIPTION_OVERLAP_SECONDS,
+        max_window: float = LIVE_TRANSCRIPTION_MAX_WINDOW_SECONDS
+    ):
+        self.session_id = session_id
+        self.transcribe_window = transcribe_window
+        self.audio_end = audio_end
+        self.interval = interval
+        self.max_window = max_window
+        self.transcript = RollingTranscript(overlap)
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+        self._subscribers: List[asyncio.Queue] = []
+        self._tick_lock = asyncio.Lock()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'session_id': self.session_id,
+            'utterances': [segment_event(s) for s in self.transcript.segments],
+            'partial': [segment_event(s) for s in self.transcript.partial],
+            'done': self.done
+        }
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue of events for this session; ends with a 'done' event"""
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait({'event': 'snapshot', 'data': self.snapshot()})
+        if self.done:
+            queue.put_nowait({'event': 'done', 'data': self.snapshot()})
+        else:
+            self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def _publish(self, event: Dict[str, Any]):
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                # The next tick retries the same window; finalization does not depend on this one
+                logger.warning(f"Live transcription of session {self.session_id} failed: {e}")
+
+    async def tick(self, final: bool = False) -> int:
+        """Transcribe the audio that arrived since the last tick; returns the segments finalized"""
+        async with self._tick_lock:
+            audio_end = self.audio_end()
+            count = 0
+            while True:
+                window = self.transcript.next_window(audio_end, final, self.max_window)
+                if window is None:
+                    break
+                start, end = window
+                segments = await self.transcribe_window(start, end)
+                committed_until = self.transcript.committed_until
+                finalized, partial = self.transcript.merge(end, segments, final and end >= audio_end)
+                if end < audio_end and self.transcript.committed_until <= committed_until:
+                    # One turn outlasts a whole catch-up window: accept the cut rather than stall
+                    forced, partial = self.transcript.merge(end, partial, final=True)
+                    finalized += forced
+                for segment in finalized:
+                    self._publish({'event': 'final', 'data': segment_event(segment)})
+                self._publish({'event': 'partial', 'data': {'segments': [segment_event(s) for s in partial]}})
+                count += len(finalized)
+                if end >= audio_end:
+                    break
+            return count
+
+    async def _stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def finish(self) -> List[Segment]:
+        """Transcribe the remaining tail and return every segment, in recording order"""
+        await self._stop()
+        try:
+            await self.tick(final=True)
+        finally:
+            self.close()
+        return list(self.transcript.segments)
+
+    def close(self):
+        """Stop publishing; subscribers receive 'done'"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        if not self.done:
+            self.done = True
+            self._publish({'event': 'done', 'data': self.snapshot()})
+            self._subscribers.clear()
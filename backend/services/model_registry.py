@@ -0,0 +1,128 @@
+"""
+Model Registry - lazily constructed heavy components (Agno agents, ML pipelines)
+Lets the API start without loading models and report which ones are warm
+"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Components to load in the background at startup: "all", or comma-separated names
+PRELOAD_MODELS = os.getenv('PRELOAD_MODELS', '')
+
+COMPONENT_COLD = 'cold'
+COMPONENT_LOADING = 'loading'
+COMPONENT_WARM = 'warm'
+COMPONENT_FAILED = 'failed'
+
+
+class LazyComponent:
+    """
+    Proxy that builds its component on first attribute access.
+
+    `planner_agent.generate_seed_questions(...)` works unchanged whether the
+    agent was preloaded or not; the first caller pays the construction cost.
+    Construction is serialized so concurrent first uses build it only once,
+    and a failed build is retried on the next use.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._status = COMPONENT_COLD
+        self._error: Optional[str] = None
+        self._load_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._status == COMPONENT_WARM
+
+    def get(self) -> Any:
+        """The component instance, building it if needed"""
+        if self._status == COMPONENT_WARM:
+            return self._instance
+
+        with self._lock:
+            if self._status != COMPONENT_WARM:
+                self._status = COMPONENT_LOADING
+                start = time.perf_counter()
+                try:
+                    self._instance = self._factory()
+                except Exception as e:
+                    self._status = COMPONENT_FAILED
+                    self._error = str(e)
+                    logger.error(f"Failed to load {self._name}: {e}")
+                    raise
+                self._load_seconds = round(time.perf_counter() - start, 3)
+                self._error = None
+                self._status = COMPONENT_WARM
+                logger.info(f"Loaded {self._name} in {self._load_seconds}s")
+        return self._instance
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'status': self._status,
+            'load_seconds': self._load_seconds,
+            'error': self._error
+        }
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only called for attributes the proxy itself does not have
+        return getattr(self.get(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyComponent {self._name} ({self._status})>"
+
+
+class ModelRegistry:
+    """Named lazy components with background preload and readiness reporting"""
+
+    def __init__(self):
+        self.components: Dict[str, LazyComponent] = {}
+        # Components the readiness check waits for
+        self.required: List[str] = []
+
+    def register(self, name: str, factory: Callable[[], Any]) -> LazyComponent:
+        """Register a component factory and return its lazy proxy"""
+        component = LazyComponent(name, factory)
+        self.components[name] = component
+        return component
+
+    def parse_names(self, spec: Optional[str]) -> List[str]:
+        """Resolve a PRELOAD_MODELS-style spec ("all" or "a,b") to registered names"""
+        if not spec:
+            return []
+        if spec.strip().lower() == 'all':
+            return list(self.components)
+
+        names = [name.strip() for name in spec.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.components]
+        if unknown:
+            logger.warning(f"Ignoring unknown preload components: {', '.join(unknown)}")
+        return [name for name in names if name in self.components]
+
+    def preload(self, names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Build the named components now; failures are logged, not raised"""
+        for name in names:
+            try:
+                self.components[name].get()
+            except Exception:
+                pass  # Recorded in the component status
+        return self.status()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: component.status() for name, component in self.components.items()}
+
+    @property
+    def ready(self) -> bool:
+        """Whether every required component is warm"""
+        return all(self.components[name].loaded for name in self.required)
+
+
+# Global registry instance
+model_registry = ModelRegistry()
@@ -0,0 +1,329 @@
+"""
+Processing Jobs - background end-of-session processing with per-stage progress
+Lets the API return immediately and report progress by polling or SSE. Job status is
+written to the session store's backend, so any worker can answer for a job
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from .session_store import (
+    SESSION_STORE, SESSION_STORE_FILE, SESSION_STORE_PATH, SESSION_STORE_SQLITE, WORKER_ID,
+    FileSessionStore, MemorySessionStore, SessionStore, SQLiteSessionStore
+)
+
+logger = logging.getLogger(__name__)
+
+# How long finished jobs stay queryable
+JOB_RETENTION_SECONDS = float(os.getenv('PROCESSING_JOB_RETENTION_SECONDS', '3600'))
+# Least time between two writes of a job's in-stage progress to the store
+JOB_SAVE_INTERVAL_SECONDS = 1.0
+# How often an SSE stream for a job running on another worker re-reads the store
+JOB_POLL_SECONDS = 1.0
+JOB_STORE_NAME = "processing_jobs"
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+
+
+class ProcessingProgress:
+    """
+    Stage tracker for one processing run.
+
+    Records when each stage starts and ends (with its duration) and the latest
+    progress reported inside it. Every change is passed to an optional listener.
+    Stages may overlap, e.g. diarization and transcription in transcribe-once mode.
+    """
+
+    def __init__(self, listener: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.listener = listener
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._started: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage; marks it failed if the block raises"""
+        record = {
+            'name': name,
+            'status': JOB_RUNNING,
+            'started_at': datetime.now().isoformat(),
+            'ended_at': None,
+            'duration_seconds': None,
+            'progress': 0.0,
+            'detail': None
+        }
+        self.stages[name] = record
+        self._started[name] = time.perf_counter()
+        self._notify(record)
+        try:
+            yield self
+        except BaseException:
+            self._finish(name, JOB_FAILED)
+            raise
+        self._finish(name, JOB_COMPLETED)
+
+    def update(self, name: str, completed: float, total: float, detail: Optional[str] = None):
+        """Report progress inside a stage (completed out of total)"""
+        record = self.stages.get(name)
+        if record is None or record['status'] != JOB_RUNNING:
+            return
+        record['progress'] = round(min(1.0, completed / total), 3) if total else 0.0
+        record['detail'] = detail
+        self._notify(record)
+
+    def durations(self) -> Dict[str, float]:
+        """Duration in seconds of every finished stage"""
+        return {
+            name: record['duration_seconds']
+            for name, record in self.stages.items()
+            if record['duration_seconds'] is not None
+        }
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [dict(record) for record in self.stages.values()]
+
+    def _finish(self, name: str, status: str):
+        record = self.stages[name]
+        record['status'] = status
+        record['ended_at'] = datetime.now().isoformat()
+        record['duration_seconds'] = round(time.perf_counter() - self._started.pop(name), 3)
+        if status == JOB_COMPLETED:
+            record['progress'] = 1.0
+        self._notify(record)
+
+    def _notify(self, record: Dict[str, Any]):
+        if self.listener:
+            try:
+                self.listener(dict(record))
+            except Exception as e:
+                logger.debug(f"Progress listener failed: {e}")
+
+
+def create_job_store(storage_path: Union[str, Path], backend: Optional[str] = None) -> SessionStore:
+    """Job records in the SESSION_STORE backend, kept apart from the sessions themselves"""
+    backend = (backend or SESSION_STORE).lower()
+    if backend == SESSION_STORE_SQLITE:
+        return SQLiteSessionStore(
+            SESSION_STORE_PATH or Path(storage_path) / "sessions.db", key='job_id', table=JOB_STORE_NAME
+        )
+    if backend == SESSION_STORE_FILE:
+        return FileSessionStore(Path(storage_path) / f".{JOB_STORE_NAME}", key='job_id')
+    return MemorySessionStore(key='job_id')
+
+
+def _is_done(status: str) -> bool:
+    return status in (JOB_COMPLETED, JOB_FAILED)
+
+
+class ProcessingJob:
+    """One background processing run for a recording session"""
+
+    def __init__(self, session_id: str, store: Optional[SessionStore] = None):
+        self.job_id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.status = JOB_QUEUED
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.progress = ProcessingProgress(listener=self._publish_stage)
+
+        self._finished_monotonic: Optional[float] = None
+        self._subscribers: List[asyncio.Queue] = []
+        self._store = store
+        self._saved_monotonic = 0.0
+        self._stage_status: Dict[str, str] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return _is_done(self.status)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Job status for API responses"""
+        return {
+            'job_id': self.job_id,
+            'session_id': self.session_id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'stages': self.progress.to_list(),
+            'result': self.result,
+            'error': self.error,
+            'worker_id': WORKER_ID
+        }
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue of events for this job; ends with a 'done' event"""
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait({'event': 'status', 'data': self.to_dict()})
+        if self.done:
+            queue.put_nowait({'event': 'done', 'data': self.to_dict()})
+        else:
+            self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def _publish_stage(self, stage: Dict[str, Any]):
+        # Stage starts and ends are always saved; progress inside a stage at most once per interval
+        status_changed = self._stage_status.get(stage['name']) != stage['status']
+        self._stage_status[stage['name']] = stage['status']
+        self._publish({'event': 'stage', 'data': stage}, save=status_changed)
+
+    def _publish(self, event: Dict[str, Any], save: bool = True):
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+        self.save(force=save)
+
+    def save(self, force: bool = True):
+        """Write the job's status to the shared store (best effort; processing does not depend on it)"""
+        now = time.monotonic()
+        if self._store is None or (not force and now - self._saved_monotonic < JOB_SAVE_INTERVAL_SECONDS):
+            return
+        self._saved_monotonic = now
+        try:
+            self._store.create(self.to_dict())
+        except Exception as e:
+            logger.warning(f"Could not save processing job {self.job_id}: {e}")
+
+    def _finish(self, status: str):
+        self.status = status
+        self.finished_at = datetime.now().isoformat()
+        self._finished_monotonic = time.monotonic()
+        self._publish({'event': 'done', 'data': self.to_dict()})
+        self._subscribers.clear()
+
+
+class ProcessingJobManager:
+    """
+    Registry of background processing jobs.
+
+    Jobs run on the worker that accepted the end request and are kept in
+    `jobs` there. Their status is mirrored to a store every worker shares,
+    so status requests and event streams work on any worker.
+    """
+
+    def __init__(self, retention_seconds: float = JOB_RETENTION_SECONDS, store: Optional[SessionStore] = None):
+        self.retention_seconds = retention_seconds
+        self.jobs: Dict[str, ProcessingJob] = {}
+        self.store = store or MemorySessionStore(key='job_id')
+        self._watchers: Dict[asyncio.Queue, asyncio.Task] = {}
+
+    def submit(
+        self,
+        session_id: str,
+        run: Callable[[ProcessingProgress], Awaitable[Dict[str, Any]]]
+    ) -> ProcessingJob:
+        """Start `run(progress)` in the background and return its job"""
+        self._prune()
+
+        job = ProcessingJob(session_id, self.store)
+        self.jobs[job.job_id] = job
+        job.save()
+        job.task = asyncio.create_task(self._run(job, run))
+        return job
+
+    def get(self, job_id: str) -> Optional[ProcessingJob]:
+        """A job running (or run) by this worker"""
+        return self.jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job status for API responses, whichever worker runs the job"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self.store.get(job_id)
+
+    def subscribe(self, job_id: str) -> Optional[asyncio.Queue]:
+        """
+        Queue of a job's events, ending with 'done'; None if the job is unknown.
+        A job on another worker is followed through the store, as `status` events.
+        """
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.subscribe()
+        state = self.store.get(job_id)
+        if state is None:
+            return None
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait({'event': 'status', 'data': state})
+        if _is_done(state['status']):
+            queue.put_nowait({'event': 'done', 'data': state})
+        else:
+            self._watchers[queue] = asyncio.create_task(self._watch(job_id, state, queue))
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.unsubscribe(queue)
+        watcher = self._watchers.pop(queue, None)
+        if watcher is not None:
+            watcher.cancel()
+
+    async def _watch(self, job_id: str, state: Dict[str, Any], queue: asyncio.Queue):
+        """Poll the store for a job running on another worker"""
+        while not _is_done(state['status']):
+            await asyncio.sleep(JOB_POLL_SECONDS)
+            latest = await asyncio.to_thread(self.store.get, job_id)
+            if latest is None:
+                # Pruned by its worker; the last state seen is all there is
+                break
+            if latest != state:
+                state = latest
+                queue.put_nowait({'event': 'status', 'data': state})
+        queue.put_nowait({'event': 'done', 'data': state})
+
+    def find_for_session(self, session_id: str) -> Optional[ProcessingJob]:
+        """Most recent job for a session, if still retained"""
+        matches = [job for job in self.jobs.values() if job.session_id == session_id]
+        return matches[-1] if matches else None
+
+    async def _run(self, job: ProcessingJob, run: Callable[[ProcessingProgress], Awaitable[Dict[str, Any]]]):
+        job.status = JOB_RUNNING
+        job._publish({'event': 'status', 'data': job.to_dict()})
+        try:
+            result = await run(job.progress)
+            if isinstance(result, dict) and 'error' in result:
+                job.error = result['error']
+                job._finish(JOB_FAILED)
+            else:
+                job.result = result
+                job._finish(JOB_COMPLETED)
+        except Exception as e:
+            logger.error(f"Processing job {job.job_id} for session {job.session_id} failed: {e}")
+            job.error = str(e)
+            job._finish(JOB_FAILED)
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.done and job._finished_monotonic is not None and job._finished_monotonic < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+        oldest = (datetime.now() - timedelta(seconds=self.retention_seconds)).isoformat()
+        try:
+            for state in self.store.list_sessions():
+                if _is_done(state['status']) and (state.get('finished_at') or '') < oldest:
+                    self.store.delete(state['job_id'])
+        except Exception as e:
+            logger.warning(f"Could not prune processing jobs: {e}")
+
+
+# Global job manager instance
+processing_job_manager = ProcessingJobManager()
@@ -0,0 +1,240 @@
+"""
+Result Cache - content-addressed on-disk cache for diarization and transcription results
+Keys hash the audio bytes, the segment range, the model id and the pipeline parameters,
+so byte-identical audio is never diarized or uploaded to Whisper twice
+"""
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .speaker_alignment import Turn, turns_from_diarization
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE', 'true').lower() == 'true'
+# Defaults to <storage_path>/.result_cache when unset
+RESULT_CACHE_DIR = os.getenv('RESULT_CACHE_DIR')
+RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+RESULT_CACHE_DIR_NAME = ".result_cache"
+
+HASH_BLOCK_BYTES = 1024 * 1024
+HASH_MEMO_SIZE = 256
+RTTM_SUFFIX = ".rttm"
+JSON_SUFFIX = ".json"
+
+
+def result_cache_dir(storage_path: Union[str, Path]) -> Optional[Path]:
+    """Where results are cached for a storage path, or None when caching is off"""
+    if not RESULT_CACHE_ENABLED:
+        return None
+    return Path(RESULT_CACHE_DIR) if RESULT_CACHE_DIR else Path(storage_path) / RESULT_CACHE_DIR_NAME
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """sha256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(HASH_BLOCK_BYTES)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(kind: str, audio_hash: str, model: Any, params: Optional[Dict[str, Any]] = None,
+              segment: Optional[Tuple[float, float]] = None) -> str:
+    """Key for one result: what was computed, on which audio span, with which model and settings"""
+    payload = {
+        'kind': kind,
+        'audio': audio_hash,
+        # Millisecond resolution, so float noise in segment bounds still hits
+        'segment': [round(segment[0], 3), round(segment[1], 3)] if segment is not None else None,
+        'model': model,
+        'params': params or {},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def write_rttm(turns: List[Turn], uri: str = "audio") -> str:
+    """RTTM lines (one SPEAKER record per turn)"""
+    return "".join(
+        f"SPEAKER {uri} 1 {start:.3f} {end - start:.3f} <NA> <NA> {speaker} <NA> <NA>\n"
+        for start, end, speaker in turns
+    )
+
+
+def parse_rttm(text: str) -> List[Turn]:
+    """(start, end, speaker) turns from RTTM SPEAKER records"""
+    turns = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < 8 or fields[0] != 'SPEAKER':
+            continue
+        start, duration = float(fields[3]), float(fields[4])
+        turns.append((start, round(start + duration, 3), fields[7]))
+    return turns
+
+
+def transcript_to_json(transcript: Any) -> Dict[str, Any]:
+    """The parts of a Whisper verbose_json response the services read"""
+    return {
+        'text': getattr(transcript, 'text', ''),
+        'duration': getattr(transcript, 'duration', None),
+        'segments': [
+            {
+                'start': float(seg.start),
+                'end': float(seg.end),
+                'text': seg.text,
+                'avg_logprob': getattr(seg, 'avg_logprob', None)
+            }
+            for seg in getattr(transcript, 'segments', None) or []
+        ],
+        'words': [
+            {'word': word.word, 'start': float(word.start), 'end': float(word.end)}
+            for word in getattr(transcript, 'words', None) or []
+        ]
+    }
+
+
+def transcript_from_json(data: Dict[str, Any]) -> SimpleNamespace:
+    """Attribute access like the Whisper response it was stored from"""
+    transcript = SimpleNamespace(
+        text=data['text'],
+        segments=[SimpleNamespace(**seg) for seg in data['segments']],
+        words=[SimpleNamespace(**word) for word in data.get('words', [])]
+    )
+    if data.get('duration') is not None:
+        transcript.duration = data['duration']
+    return transcript
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of result files under one directory.
+
+    Entries are <dir>/<key[:2]>/<key>.rttm (diarization) or .json (transcription),
+    written to a temp file and renamed into place so concurrent processes never
+    see a partial entry. A hit refreshes the entry's mtime; when the directory
+    grows past max_bytes the least recently used entries are deleted.
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]], max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.directory = Path(directory) if directory is not None else None
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        # (path, size, mtime) -> sha256, so a file is hashed once while unchanged
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.max_bytes > 0
+
+    def audio_hash(self, path: Union[str, Path]) -> Optional[str]:
+        """Content hash of an audio file (None when caching is off)"""
+        if not self.enabled:
+            return None
+        stat = os.stat(path)
+        memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._hashes:
+            if len(self._hashes) >= HASH_MEMO_SIZE:
+                self._hashes.clear()
+            self._hashes[memo_key] = hash_file(path)
+        return self._hashes[memo_key]
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / key[:2] / f"{key}{suffix}"
+
+    def _read(self, key: Optional[str], suffix: str) -> Optional[str]:
+        if not self.enabled or key is None:
+            return None
+        path = self._path(key, suffix)
+        try:
+            text = path.read_text()
+            os.utime(path)  # Most recently used
+        except OSError:
+            return None
+        return text
+
+    def _write(self, key: Optional[str], suffix: str, text: str):
+        if not self.enabled or key is None:
+            return
+        path = self._path(key, suffix)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write result cache entry {path.name}: {e}")
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(text.encode())
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob('*/*'):
+            if path.suffix not in (RTTM_SUFFIX, JSON_SUFFIX):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is back under a 90% watermark"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._size = total
+        logger.info(f"Result cache evicted {removed} entries, {total} bytes remain")
+
+    def get_diarization(self, key: Optional[str]) -> Optional[List[Turn]]:
+        text = self._read(key, RTTM_SUFFIX)
+        return parse_rttm(text) if text is not None else None
+
+    def put_diarization(self, key: Optional[str], diarization: Any):
+        self._write(key, RTTM_SUFFIX, write_rttm(turns_from_diarization(diarization)))
+
+    def get_transcript(self, key: Optional[str]) -> Optional[SimpleNamespace]:
+        text = self._read(key, JSON_SUFFIX)
+        if text is None:
+            return None
+        try:
+            return transcript_from_json(json.loads(text))
+        except (ValueError, KeyError):
+            return None
+
+    def put_transcript(self, key: Optional[str], transcript: Any):
+        self._write(key, JSON_SUFFIX, json.dumps(transcript_to_json(transcript)))
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled or not self.directory.exists():
+            return {'entries': 0, 'bytes': 0, 'max_bytes': self.max_bytes}
+        entries = self._entries()
+        return {'entries': len(entries), 'bytes': sum(size for _, size, _ in entries), 'max_bytes': self.max_bytes}
@@ -0,0 +1,206 @@
+"""
+Segment Index - per-utterance frame offsets into a session recording
+Lets one utterance's audio be served by HTTP range without decoding or copying the whole file
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+
+import soundfile as sf
+
+from .audio_archive import WORKING_COPY_NAME, find_archive
+from .audio_slicing import PCMAudioReader
+from .audio_spool import build_wav_header
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_INDEX_NAME = "segment_index.json"
+# Bytes read per chunk when streaming an utterance
+SEGMENT_STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class SegmentIndex:
+    """
+    Utterance id -> [start_sample, end_sample) on the session recording.
+
+    Offsets are sample frames, not bytes, so they address the PCM working
+    copy (through its own header) and the compressed archive (by seeking)
+    alike, whichever of the two is still on disk.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        segments: Optional[Dict[str, Tuple[int, int]]] = None
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.segments: Dict[str, Tuple[int, int]] = dict(segments or {})
+
+    def add(self, utterance_id: str, start_time: float, end_time: float) -> Dict[str, int]:
+        """Index an utterance by its times (seconds) and return its offsets"""
+        start_sample = max(0, int(round(start_time * self.sample_rate)))
+        end_sample = max(start_sample, int(round(end_time * self.sample_rate)))
+        self.segments[utterance_id] = (start_sample, end_sample)
+        return self.offsets(utterance_id)
+
+    def offsets(self, utterance_id: str) -> Dict[str, int]:
+        start_sample, end_sample = self.segments[utterance_id]
+        return {'start_sample': start_sample, 'end_sample': end_sample}
+
+    def __contains__(self, utterance_id: str) -> bool:
+        return utterance_id in self.segments
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        with open(path, 'w') as f:
+            json.dump({
+                'sample_rate': self.sample_rate,
+                'channels': self.channels,
+                'segments': self.segments
+            }, f)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'SegmentIndex':
+        with open(path) as f:
+            data = json.load(f)
+        # Older indexes also carry the working copy's byte layout, which is read from the file now
+        return cls(
+            sample_rate=data['sample_rate'],
+            channels=data.get('channels', 1),
+            segments={uid: tuple(bounds) for uid, bounds in data['segments'].items()}
+        )
+
+
+class SegmentAudio:
+    """
+    A standalone WAV for one utterance, readable by byte range.
+
+    Only the synthesized 44-byte header lives in memory; PCM bytes come from
+    `read_pcm(start, end)` on demand, so a Range request touches only the
+    pages it asks for.
+    """
+
+    def __init__(
+        self,
+        read_pcm: Callable[[int, int], bytes],
+        pcm_size: int,
+        sample_rate: int,
+        channels: int = 1,
+        sample_width: int = 2,
+        on_close: Optional[Callable[[], None]] = None
+    ):
+        self.header = build_wav_header(pcm_size, sample_rate, channels, sample_width)
+        self.size = len(self.header) + pcm_size
+        self._read_pcm = read_pcm
+        self._on_close = on_close
+
+    def read(self, start: int, end: int) -> bytes:
+        """Bytes [start, end) of the virtual WAV file"""
+        start, end = max(0, start), min(end, self.size)
+        header_size = len(self.header)
+        parts = []
+        if start < header_size:
+            parts.append(self.header[start:min(end, header_size)])
+        if end > header_size:
+            parts.append(self._read_pcm(max(start, header_size) - header_size, end - header_size))
+        return b''.join(parts)
+
+    def iter_range(self, start: int, end: int, chunk_size: int = SEGMENT_STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+        """Bytes [start, end) in chunks, for a streamed response"""
+        for chunk_start in range(start, end, chunk_size):
+            yield self.read(chunk_start, min(chunk_start + chunk_size, end))
+
+    def close(self):
+        """Release the recording (idempotent)"""
+        on_close, self._on_close = self._on_close, None
+        if on_close:
+            on_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def open_segment_audio(session_dir: Union[str, Path], utterance_id: str) -> SegmentAudio:
+    """
+    Utterance audio for a finished session.
+
+    Sliced straight out of the PCM working copy (mmap) when it is still on
+    disk; otherwise read from the compressed archive, where every read seeks
+    to its own frames and decodes only those.
+    """
+    session_dir = Path(session_dir)
+    index_path = session_dir / SEGMENT_INDEX_NAME
+    if not index_path.exists():
+        raise FileNotFoundError(f"No segment index in {session_dir}")
+    index = SegmentIndex.load(index_path)
+    if utterance_id not in index:
+        raise KeyError(utterance_id)
+
+    start_sample, end_sample = index.segments[utterance_id]
+    working_copy = session_dir / WORKING_COPY_NAME
+    if working_copy.exists():
+        reader = PCMAudioReader(working_copy)
+        byte_start = reader.data_offset + start_sample * reader.frame_size
+        byte_end = min(reader.data_offset + end_sample * reader.frame_size, reader.data_offset + reader.data_size)
+        pcm_size = max(0, byte_end - byte_start)
+        return SegmentAudio(
+            lambda start, end: reader.read_bytes(byte_start + start, byte_start + min(end, pcm_size)),
+            pcm_size,
+            reader.sample_rate, reader.channels, reader.sample_width,
+            on_close=reader.close
+        )
+
+    archive_path = find_archive(session_dir)
+    if archive_path is None:
+        raise FileNotFoundError(f"No recording found in {session_dir}")
+    archive = sf.SoundFile(archive_path)
+    start_sample = min(start_sample, archive.frames)
+    end_sample = min(max(end_sample, start_sample), archive.frames)
+    frame_size = archive.channels * 2
+
+    def read_pcm(start: int, end: int) -> bytes:
+        first_frame, last_frame = start // frame_size, -(-end // frame_size)
+        archive.seek(start_sample + first_frame)
+        pcm = archive.read(last_frame - first_frame, dtype='int16').tobytes()
+        return pcm[start - first_frame * frame_size:end - first_frame * frame_size]
+
+    return SegmentAudio(
+        read_pcm,
+        (end_sample - start_sample) * frame_size,
+        archive.samplerate, archive.channels,
+        on_close=archive.close
+    )
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    [start, end) for a single-range "bytes=" header; None means serve everything.
+    Raises ValueError when the range cannot be satisfied (HTTP 416).
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    first, _, last = range_header[len('bytes='):].strip().partition('-')
+    try:
+        if first == '':
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError(range_header)
+            return max(0, size - length), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        raise ValueError(f"Invalid range {range_header}")
+    if start >= size or end <= start:
+        raise ValueError(f"Range {range_header} not satisfiable for {size} bytes")
+    return start, min(end, size)
@@ -0,0 +1,95 @@
+"""
+Session Limits - quotas, throttling and TTL expiry for live recording sessions
+Sessions that go idle or hit a quota are finalized by a background reaper instead of lingering
+"""
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stored audio is 16 kHz mono int16
+BYTES_PER_SECOND = 16000 * 2
+
+# A session with no chunk for this long is finalized
+RECORDING_IDLE_TTL_SECONDS = float(os.getenv('RECORDING_IDLE_TTL_SECONDS', '1800'))
+# Per-session quotas on the recorded audio
+RECORDING_MAX_DURATION_SECONDS = float(os.getenv('RECORDING_MAX_DURATION_SECONDS', str(4 * 3600)))
+RECORDING_MAX_SESSION_BYTES = int(os.getenv('RECORDING_MAX_SESSION_BYTES', str(1024 * 1024 * 1024)))
+# Global ceilings: sessions recording at once, and chunk bytes one worker holds in memory at once
+RECORDING_MAX_ACTIVE_SESSIONS = int(os.getenv('RECORDING_MAX_ACTIVE_SESSIONS', '50'))
+RECORDING_MAX_BUFFERED_BYTES = int(os.getenv('RECORDING_MAX_BUFFERED_BYTES', str(64 * 1024 * 1024)))
+RECORDING_REAPER_INTERVAL_SECONDS = float(os.getenv('RECORDING_REAPER_INTERVAL_SECONDS', '60'))
+
+EXPIRED_IDLE = 'idle'
+EXPIRED_QUOTA = 'quota'
+
+
+class RecordingLimitError(ValueError):
+    """A request refused by a limit; carries the HTTP status (429 to retry later, 413 over quota)"""
+
+    def __init__(self, message: str, status_code: int = 429, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Optional[Dict[str, str]]:
+        if self.retry_after is None:
+            return None
+        return {'Retry-After': str(max(1, int(round(self.retry_after))))}
+
+
+def quota_exceeded(data_bytes: int) -> Optional[str]:
+    """Which per-session quota the recorded audio has reached, if any"""
+    if data_bytes >= RECORDING_MAX_SESSION_BYTES:
+        return f"{RECORDING_MAX_SESSION_BYTES} byte quota"
+    if data_bytes / BYTES_PER_SECOND >= RECORDING_MAX_DURATION_SECONDS:
+        return f"{RECORDING_MAX_DURATION_SECONDS:.0f} second maximum duration"
+    return None
+
+
+def expiry_reason(state: Dict[str, Any], now: Optional[float] = None) -> Optional[str]:
+    """Why an active session should be finalized now (None while it is healthy)"""
+    now = time.time() if now is None else now
+    if quota_exceeded(state.get('data_bytes', 0)):
+        return EXPIRED_QUOTA
+    if now - (state.get('last_activity_at') or now) > RECORDING_IDLE_TTL_SECONDS:
+        return EXPIRED_IDLE
+    return None
+
+
+class SessionReaper:
+    """
+    Periodically finalizes expired sessions.
+
+    Every worker may run one; `claim_expired_sessions` flips a session to
+    processing under its lock, so exactly one worker finalizes each.
+    """
+
+    def __init__(
+        self,
+        recording_service: Any,
+        finalize: Callable[[str], Any],
+        interval: float = RECORDING_REAPER_INTERVAL_SECONDS
+    ):
+        self.recording_service = recording_service
+        self.finalize = finalize
+        self.interval = interval
+
+    def reap_once(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        claimed = self.recording_service.claim_expired_sessions(now)
+        for session_id, reason in claimed:
+            logger.warning(f"Auto-finalizing recording session {session_id} ({reason})")
+            self.finalize(session_id)
+        return claimed
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.reap_once()
+            except Exception as e:
+                logger.error(f"Session reaper failed: {e}")
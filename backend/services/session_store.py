@@ -0,0 +1,331 @@
+"""
+Session Store - durable state of active recording sessions
+Holds session metadata and spool offsets outside the process, so any API worker can
+accept chunks for any session and sessions survive a restart
+"""
+import os
+import json
+import uuid
+import socket
+import sqlite3
+import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: sessions are only shared between threads of one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SESSION_STORE_MEMORY = 'memory'
+SESSION_STORE_FILE = 'file'
+SESSION_STORE_SQLITE = 'sqlite'
+SESSION_STORES = (SESSION_STORE_MEMORY, SESSION_STORE_FILE, SESSION_STORE_SQLITE)
+SESSION_STORE = os.getenv('SESSION_STORE', SESSION_STORE_FILE).lower()
+# SQLite database file (default: <storage_path>/sessions.db)
+SESSION_STORE_PATH = os.getenv('SESSION_STORE_PATH')
+
+SESSION_STATE_NAME = "session_state.json"
+SESSION_LOCK_DIR_NAME = ".session_locks"
+
+SESSION_STATUS_ACTIVE = 'active'
+SESSION_STATUS_PROCESSING = 'processing'
+
+# Identifies this process in session state (e.g. which worker holds a live archive encoder)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class SessionStore(ABC):
+    """
+    Interface of a session-state backend.
+
+    State is a JSON-serializable dict per session. Writers that read, modify
+    and write back (chunk appends, ending a session) hold `lock(session_id)`,
+    which is exclusive across threads and processes on one host.
+
+    `key` names the state field records are stored under, so the same
+    backends can hold other shared records (processing jobs by job_id).
+    """
+
+    def __init__(self, lock_dir: Optional[Union[str, Path]] = None, key: str = 'session_id'):
+        self.lock_dir = Path(lock_dir) if lock_dir is not None else None
+        self.key = key
+        self._thread_locks: Dict[str, threading.Lock] = {}
+        self._thread_locks_guard = threading.Lock()
+
+    @abstractmethod
+    def create(self, state: Dict[str, Any]):
+        """Store a new state (replacing any with the same key)"""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The stored state, or None"""
+
+    @abstractmethod
+    def update(self, session_id: str, **fields: Any) -> Dict[str, Any]:
+        """Merge fields into the stored state and return it; KeyError if there is none"""
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        """Forget the state and drop its lock"""
+
+    @abstractmethod
+    def list_sessions(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Every stored state, optionally only those with the given status"""
+
+    @contextmanager
+    def lock(self, session_id: str) -> Iterator[None]:
+        """Exclusive access to one session's state and spool"""
+        if self.lock_dir is None or fcntl is None:
+            thread_lock = self._acquire_thread_lock(session_id)
+            try:
+                yield
+            finally:
+                thread_lock.release()
+            return
+
+        lock_file = self._acquire_file_lock(session_id)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _acquire_thread_lock(self, session_id: str, blocking: bool = True) -> Optional[threading.Lock]:
+        """The session's thread lock, held; None if not blocking and it is taken"""
+        while True:
+            with self._thread_locks_guard:
+                thread_lock = self._thread_locks.setdefault(session_id, threading.Lock())
+            if not thread_lock.acquire(blocking):
+                return None
+            with self._thread_locks_guard:
+                if self._thread_locks.get(session_id) is thread_lock:
+                    return thread_lock
+            # Dropped by _release_lock while this thread waited; take the current one instead
+            thread_lock.release()
+
+    def _acquire_file_lock(self, session_id: str, blocking: bool = True) -> Optional[Any]:
+        """The session's lock file, open and flocked; None if not blocking and it is taken"""
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        path = self.lock_dir / f"{session_id}.lock"
+        while True:
+            # flock is per open file, so threads of this process exclude each other too
+            lock_file = open(path, 'a')
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                lock_file.close()
+                return None
+            try:
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(path).st_ino:
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            # The file was unlinked (and maybe recreated) while this caller waited on it
+            lock_file.close()
+
+    def _release_lock(self, session_id: str):
+        """
+        Drop a deleted session's lock. Only done while holding it, so a caller
+        that was waiting on the old lock notices and retries on a fresh one;
+        a lock someone else holds right now is left in place.
+        """
+        thread_lock = self._acquire_thread_lock(session_id, blocking=False)
+        if thread_lock is not None:
+            with self._thread_locks_guard:
+                self._thread_locks.pop(session_id, None)
+            thread_lock.release()
+        if self.lock_dir is None or fcntl is None:
+            return
+
+        lock_file = self._acquire_file_lock(session_id, blocking=False)
+        if lock_file is not None:
+            with lock_file:
+                (self.lock_dir / f"{session_id}.lock").unlink(missing_ok=True)
+
+    def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """In-process stand-in (single worker, nothing survives a restart)"""
+
+    def __init__(self, key: str = 'session_id'):
+        super().__init__(key=key)
+        self._sessions: Dict[str, str] = {}
+
+    def create(self, state: Dict[str, Any]):
+        self._sessions[state[self.key]] = json.dumps(state)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        state = self._sessions.get(session_id)
+        return json.loads(state) if state is not None else None
+
+    def update(self, session_id: str, **fields: Any) -> Dict[str, Any]:
+        state = self.get(session_id)
+        if state is None:
+            raise KeyError(session_id)
+        state.update(fields)
+        self._sessions[session_id] = json.dumps(state)
+        return state
+
+    def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+        self._release_lock(session_id)
+
+    def list_sessions(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        states = [json.loads(state) for state in self._sessions.values()]
+        return [state for state in states if status is None or state.get('status') == status]
+
+
+class FileSessionStore(SessionStore):
+    """
+    One session_state.json per session directory.
+
+    Files are replaced atomically, so a reader never sees half a state and a
+    killed process leaves the last complete one behind.
+    """
+
+    def __init__(self, storage_path: Union[str, Path], key: str = 'session_id'):
+        self.storage_path = Path(storage_path)
+        super().__init__(self.storage_path / SESSION_LOCK_DIR_NAME, key)
+
+    def _path(self, session_id: str) -> Path:
+        return self.storage_path / session_id / SESSION_STATE_NAME
+
+    def _write(self, state: Dict[str, Any]):
+        path = self._path(state[self.key])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, path)
+
+    def create(self, state: Dict[str, Any]):
+        self._write(state)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(session_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def update(self, session_id: str, **fields: Any) -> Dict[str, Any]:
+        state = self.get(session_id)
+        if state is None:
+            raise KeyError(session_id)
+        state.update(fields)
+        self._write(state)
+        return state
+
+    def delete(self, session_id: str):
+        self._path(session_id).unlink(missing_ok=True)
+        self._release_lock(session_id)
+
+    def list_sessions(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        states = []
+        for path in sorted(self.storage_path.glob(f"*/{SESSION_STATE_NAME}")):
+            state = self.get(path.parent.name)
+            if state is not None and (status is None or state.get('status') == status):
+                states.append(state)
+        return states
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions table in a SQLite database shared by every worker on the host.
+
+    WAL mode lets readers run alongside the single writer; updates are
+    read-modify-write inside BEGIN IMMEDIATE, so they are atomic across processes.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        lock_dir: Optional[Union[str, Path]] = None,
+        key: str = 'session_id',
+        table: str = 'recording_sessions'
+    ):
+        self.db_path = Path(db_path)
+        super().__init__(lock_dir or self.db_path.parent / SESSION_LOCK_DIR_NAME, key)
+        self.table = table
+        self._db_lock = threading.Lock()
+        self._connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"{self.key} TEXT PRIMARY KEY, status TEXT NOT NULL, state TEXT NOT NULL)"
+        )
+
+    def create(self, state: Dict[str, Any]):
+        with self._db_lock:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} ({self.key}, status, state) VALUES (?, ?, ?)",
+                (state[self.key], state.get('status', SESSION_STATUS_ACTIVE), json.dumps(state))
+            )
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            row = self._connection.execute(
+                f"SELECT state FROM {self.table} WHERE {self.key} = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, session_id: str, **fields: Any) -> Dict[str, Any]:
+        with self._db_lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    f"SELECT state FROM {self.table} WHERE {self.key} = ?", (session_id,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(session_id)
+                state = {**json.loads(row[0]), **fields}
+                self._connection.execute(
+                    f"UPDATE {self.table} SET status = ?, state = ? WHERE {self.key} = ?",
+                    (state.get('status', SESSION_STATUS_ACTIVE), json.dumps(state), session_id)
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return state
+
+    def delete(self, session_id: str):
+        with self._db_lock:
+            self._connection.execute(f"DELETE FROM {self.table} WHERE {self.key} = ?", (session_id,))
+        self._release_lock(session_id)
+
+    def list_sessions(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._db_lock:
+            if status is None:
+                rows = self._connection.execute(f"SELECT state FROM {self.table} ORDER BY {self.key}").fetchall()
+            else:
+                rows = self._connection.execute(
+                    f"SELECT state FROM {self.table} WHERE status = ? ORDER BY {self.key}", (status,)
+                ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        with self._db_lock:
+            self._connection.close()
+
+
+def create_session_store(storage_path: Union[str, Path], backend: Optional[str] = None) -> SessionStore:
+    """Session store selected by SESSION_STORE (memory, file or sqlite)"""
+    backend = (backend or SESSION_STORE).lower()
+    if backend == SESSION_STORE_MEMORY:
+        return MemorySessionStore()
+    if backend == SESSION_STORE_FILE:
+        return FileSessionStore(storage_path)
+    if backend == SESSION_STORE_SQLITE:
+        return SQLiteSessionStore(SESSION_STORE_PATH or Path(storage_path) / "sessions.db")
+    raise ValueError(f"Unknown session store '{backend}' (expected one of {', '.join(SESSION_STORES)})")
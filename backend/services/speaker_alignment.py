@@ -0,0 +1,125 @@
+"""
+Speaker Alignment - assign transcript segments to diarized speakers by maximum overlap
+Shared by the recording service and the evaluation scripts
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Turn = Tuple[float, float, str]
+
+
+def turns_from_diarization(diarization: Any) -> List[Turn]:
+    """Flatten a pyannote-style annotation into (start, end, speaker) tuples"""
+    return [
+        (float(segment.start), float(segment.end), str(speaker))
+        for segment, _, speaker in diarization.itertracks(yield_label=True)
+    ]
+
+
+def _merge_intervals(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge overlapping intervals (sorted sweep) so coverage is never double counted"""
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+
+    # A new run begins wherever a start is past every end seen so far
+    running_end = np.maximum.accumulate(ends)
+    new_run = np.empty(len(starts), dtype=bool)
+    new_run[0] = True
+    new_run[1:] = starts[1:] > running_end[:-1]
+
+    run_ids = np.cumsum(new_run) - 1
+    merged_starts = starts[new_run]
+    merged_ends = np.zeros(len(merged_starts))
+    np.maximum.at(merged_ends, run_ids, ends)
+    return merged_starts, merged_ends
+
+
+class SpeakerCoverage:
+    """
+    Per-speaker coverage functions over a diarization timeline.
+
+    For each speaker the turns are merged into disjoint sorted intervals with a
+    prefix sum of their durations, so "seconds spoken by X up to time t" is a
+    single searchsorted. The overlap between any interval and a speaker is then
+    C(end) - C(start), which turns alignment into one vectorized
+    (segments x speakers) matrix instead of a segments x speakers x turns loop.
+    """
+
+    def __init__(self, turns: Iterable[Turn]):
+        by_speaker: Dict[str, List[Tuple[float, float]]] = {}
+        for start, end, speaker in turns:
+            if end > start:
+                by_speaker.setdefault(str(speaker), []).append((start, end))
+
+        # Sorted like pyannote's Annotation.labels() so ties resolve the same way
+        self.labels: List[str] = sorted(by_speaker)
+        self._starts: List[np.ndarray] = []
+        self._ends: List[np.ndarray] = []
+        self._prefix: List[np.ndarray] = []
+
+        for label in self.labels:
+            intervals = np.asarray(by_speaker[label], dtype=np.float64)
+            starts, ends = _merge_intervals(intervals[:, 0], intervals[:, 1])
+            self._starts.append(starts)
+            self._ends.append(ends)
+            self._prefix.append(np.concatenate(([0.0], np.cumsum(ends - starts))))
+
+    @classmethod
+    def from_diarization(cls, diarization: Any) -> 'SpeakerCoverage':
+        return cls(turns_from_diarization(diarization))
+
+    def _coverage(self, index: int, times: np.ndarray) -> np.ndarray:
+        """Seconds of speaker `index` inside [0, t] for every t"""
+        starts, ends, prefix = self._starts[index], self._ends[index], self._prefix[index]
+        # Number of intervals that started at or before t
+        count = np.searchsorted(starts, times, side='right')
+        last = np.maximum(count - 1, 0)
+        partial = np.clip(times - starts[last], 0.0, ends[last] - starts[last])
+        return np.where(count > 0, prefix[last] + partial, 0.0)
+
+    def overlap_matrix(self, starts: Sequence[float], ends: Sequence[float]) -> np.ndarray:
+        """Overlap in seconds between each interval and each speaker, shape (len(starts), len(labels))"""
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        matrix = np.zeros((len(starts), len(self.labels)))
+        for index in range(len(self.labels)):
+            matrix[:, index] = self._coverage(index, ends) - self._coverage(index, starts)
+        # Reversed intervals overlap nothing
+        matrix[ends <= starts] = 0.0
+        return matrix
+
+    def assign(self, starts: Sequence[float], ends: Sequence[float]) -> List[Tuple[Optional[str], float]]:
+        """Best speaker and its overlap for every interval; None when nothing overlaps"""
+        if len(starts) == 0:
+            return []
+        if not self.labels:
+            return [(None, 0.0)] * len(starts)
+
+        matrix = self.overlap_matrix(starts, ends)
+        best = np.argmax(matrix, axis=1)
+        best_overlap = matrix[np.arange(len(best)), best]
+        return [
+            (self.labels[index] if overlap > 1e-9 else None, float(overlap))
+            for index, overlap in zip(best, best_overlap)
+        ]
+
+
+def assign_speakers_by_overlap(
+    segments: Sequence[Dict[str, Any]],
+    diarization: Any = None,
+    turns: Optional[Iterable[Turn]] = None
+) -> List[Tuple[Optional[str], float]]:
+    """
+    Assign each {'start', 'end', ...} segment to the speaker it overlaps most.
+
+    Takes either a pyannote-style annotation or (start, end, speaker) turns.
+    Returns (speaker or None, overlap_seconds) per segment, in input order.
+    """
+    if turns is None:
+        turns = turns_from_diarization(diarization) if diarization is not None else []
+    coverage = SpeakerCoverage(turns)
+    return coverage.assign(
+        [seg['start'] for seg in segments],
+        [seg['end'] for seg in segments]
+    )
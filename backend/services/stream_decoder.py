@@ -0,0 +1,161 @@
+"""
+Stream Decoder - decode compressed browser audio (WebM/Opus, Ogg, MP4) while it arrives
+Pipes chunks through one long-lived ffmpeg process per session and emits 16-bit PCM
+"""
+import os
+import shutil
+import logging
+import threading
+import subprocess
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_BINARY = os.getenv('FFMPEG_BINARY', 'ffmpeg')
+# PCM read size from ffmpeg's stdout (~0.25s of 16 kHz mono)
+DECODER_READ_BYTES = 8192
+
+INPUT_FORMAT_PCM = 'pcm'
+# Session input format -> ffmpeg demuxer
+COMPRESSED_INPUT_FORMATS = {
+    'webm': 'matroska',
+    'ogg': 'ogg',
+    'mp4': 'mov',
+}
+
+
+def normalize_input_format(value: Optional[str]) -> str:
+    """Accept a format name or a MediaRecorder mime type ("audio/webm;codecs=opus")"""
+    if not value:
+        return INPUT_FORMAT_PCM
+    name = value.split(';', 1)[0].strip().lower()
+    name = name.split('/', 1)[-1]
+    if name in ('pcm', 's16le', 'l16', 'wav'):
+        return INPUT_FORMAT_PCM
+    if name not in COMPRESSED_INPUT_FORMATS:
+        supported = ', '.join((INPUT_FORMAT_PCM,) + tuple(COMPRESSED_INPUT_FORMATS))
+        raise ValueError(f"Unsupported audio input format '{value}' (expected one of {supported})")
+    return name
+
+
+class FFmpegStreamDecoder:
+    """
+    Long-lived ffmpeg process decoding one session's compressed stream.
+
+    `feed()` writes compressed bytes to ffmpeg's stdin; a reader thread drains
+    stdout and passes each block of s16le PCM to `on_pcm` as soon as ffmpeg
+    produces it. Reading and writing on separate threads keeps the pipes from
+    deadlocking when ffmpeg's output buffer fills up.
+    """
+
+    def __init__(
+        self,
+        on_pcm: Callable[[bytes], None],
+        input_format: str,
+        sample_rate: int = 16000,
+        channels: int = 1
+    ):
+        self.on_pcm = on_pcm
+        self.input_format = input_format
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+        self.chunks_fed = 0
+        self.bytes_fed = 0
+        self.pcm_bytes = 0
+        self.closed = False
+
+        self._process: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+        self._stderr_reader: Optional[threading.Thread] = None
+        self._stderr_tail: List[str] = []
+        self._reader_error: Optional[Exception] = None
+
+    def _build_command(self) -> List[str]:
+        return [
+            FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error',
+            '-f', COMPRESSED_INPUT_FORMATS[self.input_format],
+            '-i', 'pipe:0',
+            '-f', 's16le', '-acodec', 'pcm_s16le',
+            '-ac', str(self.channels), '-ar', str(self.sample_rate),
+            'pipe:1'
+        ]
+
+    def start(self):
+        """Launch ffmpeg and the reader threads"""
+        command = self._build_command()
+        if shutil.which(command[0]) is None:
+            raise RuntimeError(f"{command[0]} not found - required to decode {self.input_format} audio")
+
+        self._process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0
+        )
+        self._reader = threading.Thread(target=self._read_pcm, name="ffmpeg-pcm-reader", daemon=True)
+        self._stderr_reader = threading.Thread(target=self._read_stderr, name="ffmpeg-stderr-reader", daemon=True)
+        self._reader.start()
+        self._stderr_reader.start()
+
+    def feed(self, data: bytes):
+        """Write one compressed chunk (blocks while ffmpeg is behind)"""
+        if self.closed:
+            raise ValueError("Decoder is already closed")
+        if self._process is None:
+            self.start()
+        try:
+            self._process.stdin.write(data)
+        except (BrokenPipeError, OSError):
+            raise RuntimeError(f"Audio decoder exited: {self._error_detail()}")
+        self.chunks_fed += 1
+        self.bytes_fed += len(data)
+
+    def close(self, timeout: float = 30.0):
+        """Signal end of stream and wait until every decoded sample was delivered"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._process is None:
+            return
+
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        self._reader.join(timeout)
+        self._stderr_reader.join(timeout)
+        try:
+            returncode = self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            raise RuntimeError("Audio decoder did not finish in time")
+
+        if self._reader_error is not None:
+            raise RuntimeError(f"Storing decoded audio failed: {self._reader_error}")
+        if returncode != 0:
+            # Truncated final cluster etc.; whatever decoded so far is kept
+            logger.warning(f"ffmpeg exited with {returncode}: {self._error_detail()}")
+
+    def _read_pcm(self):
+        stdout = self._process.stdout
+        while True:
+            block = stdout.read(DECODER_READ_BYTES)
+            if not block:
+                break
+            if self._reader_error is not None:
+                continue  # Keep draining so ffmpeg never blocks on a full pipe
+            try:
+                self.on_pcm(block)
+                self.pcm_bytes += len(block)
+            except Exception as e:
+                self._reader_error = e
+                logger.error(f"Decoded audio callback failed: {e}")
+
+    def _read_stderr(self):
+        for line in self._process.stderr:
+            self._stderr_tail = (self._stderr_tail + [line.decode(errors='replace').strip()])[-5:]
+
+    def _error_detail(self) -> str:
+        return '; '.join(self._stderr_tail) or 'no error output'
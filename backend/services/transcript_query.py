@@ -0,0 +1,138 @@
+"""
+Transcript Query - keyset pagination and speaker/time filters over stored sessions and utterances
+Shared by the database queries and the transcription.json fallback, so both page the same way
+"""
+import os
+import json
+import base64
+from typing import Any, Dict, List, Optional, Tuple
+
+TRANSCRIPT_PAGE_SIZE = int(os.getenv('TRANSCRIPT_PAGE_SIZE', '200'))
+TRANSCRIPT_MAX_PAGE_SIZE = int(os.getenv('TRANSCRIPT_MAX_PAGE_SIZE', '1000'))
+SESSION_PAGE_SIZE = int(os.getenv('SESSION_PAGE_SIZE', '50'))
+
+# Transcripts older than start_ms/end_ms carry sample offsets of the 16 kHz recording
+SAMPLE_RATE = 16000
+
+
+def clamp_limit(limit: Optional[int], default: int = TRANSCRIPT_PAGE_SIZE) -> int:
+    """Page size within [1, TRANSCRIPT_MAX_PAGE_SIZE]"""
+    if limit is None:
+        return default
+    return max(1, min(int(limit), TRANSCRIPT_MAX_PAGE_SIZE))
+
+
+def encode_cursor(*key: Any) -> str:
+    """Opaque cursor for the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """Key a cursor was made from (raises ValueError if it is malformed)"""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def _clock_to_ms(clock: Optional[str]) -> int:
+    """Milliseconds of a "MM:SS" or "HH:MM:SS" time"""
+    seconds = 0.0
+    for part in (clock or '0').split(':'):
+        seconds = seconds * 60 + float(part)
+    return int(round(seconds * 1000))
+
+
+def utterance_span_ms(utterance: Dict[str, Any]) -> Tuple[int, int]:
+    """(start_ms, end_ms) of an utterance; older transcripts fall back to sample offsets or MM:SS times"""
+    if utterance.get('start_ms') is not None and utterance.get('end_ms') is not None:
+        return int(utterance['start_ms']), int(utterance['end_ms'])
+    if utterance.get('start_sample') is not None and utterance.get('end_sample') is not None:
+        return (utterance['start_sample'] * 1000 // SAMPLE_RATE,
+                utterance['end_sample'] * 1000 // SAMPLE_RATE)
+    start_ms = _clock_to_ms(utterance.get('start_time'))
+    return start_ms, start_ms + int(utterance.get('duration') or 0)
+
+
+def format_clock(ms: int) -> str:
+    """HH:MM:SS of a millisecond offset"""
+    seconds = ms // 1000
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def utterance_rows(utterances: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Utterances in recording order with their position and millisecond span.
+    `sequence` is the keyset pagination key; start_ms/end_ms back the time filters.
+    """
+    rows = []
+    for sequence, utterance in enumerate(utterances):
+        start_ms, end_ms = utterance_span_ms(utterance)
+        rows.append({**utterance, 'sequence': sequence, 'start_ms': start_ms, 'end_ms': end_ms})
+    return rows
+
+
+def page_utterances(
+    rows: List[Dict[str, Any]],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    speaker_id: Optional[str] = None,
+    from_ms: Optional[int] = None,
+    to_ms: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of rows from `utterance_rows`, and the cursor of the next page (None on the last).
+    The time filter keeps utterances overlapping [from_ms, to_ms).
+    """
+    limit = clamp_limit(limit)
+    after = decode_cursor(cursor, 1)
+    page = []
+    for row in rows:
+        if after is not None and row['sequence'] <= after[0]:
+            continue
+        if speaker_id is not None and row.get('speaker_id') != speaker_id:
+            continue
+        if from_ms is not None and row['end_ms'] <= from_ms:
+            continue
+        if to_ms is not None and row['start_ms'] >= to_ms:
+            continue
+        if len(page) == limit:
+            return page, encode_cursor(page[-1]['sequence'])
+        page.append(row)
+    return page, None
+
+
+def page_sessions(
+    sessions: List[Dict[str, Any]],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of sessions, newest first, keyed by (started_at, id)"""
+    limit = clamp_limit(limit, SESSION_PAGE_SIZE)
+    before = decode_cursor(cursor, 2)
+    ordered = sorted(sessions, key=lambda s: (s.get('started_at') or '', s['id']), reverse=True)
+    if before is not None:
+        ordered = [s for s in ordered if (s.get('started_at') or '', s['id']) < tuple(before)]
+    page = ordered[:limit]
+    next_cursor = encode_cursor(page[-1].get('started_at') or '', page[-1]['id']) if len(ordered) > limit else None
+    return page, next_cursor
+
+
+def transcript_entry(row: Dict[str, Any]) -> Dict[str, Any]:
+    """API shape of one utterance"""
+    return {
+        'id': row.get('id'),
+        'speaker': row.get('speaker_name') or row.get('speaker_id'),
+        'speaker_id': row.get('speaker_id'),
+        'text': row.get('text'),
+        'timestamp': format_clock(row['start_ms']),
+        'start_ms': row['start_ms'],
+        'end_ms': row['end_ms'],
+        'confidence': row.get('confidence'),
+        'audio_segment_path': row.get('audio_segment_path')
+    }
@@ -0,0 +1,96 @@
+"""
+Turn Index - millisecond timeline of a session's utterances with O(log n) lookups
+Answers "who was speaking at t", "what was said between t1 and t2" and per-speaker
+slices, for playback seeking and for the evaluation scripts
+"""
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional
+
+from .speaker_alignment import Turn
+
+
+def to_ms(seconds: float) -> int:
+    """Integer milliseconds of a time in seconds"""
+    return int(round(seconds * 1000))
+
+
+def format_offset(ms: int) -> str:
+    """MM:SS display form of a millisecond offset"""
+    seconds = ms // 1000
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def utterance_times(start_time: float, end_time: float) -> Dict[str, Any]:
+    """Timeline fields of an utterance: integer ms offsets, plus MM:SS strings for display"""
+    start_ms, end_ms = to_ms(start_time), to_ms(end_time)
+    return {
+        'start_ms': start_ms,
+        'end_ms': end_ms,
+        'duration': end_ms - start_ms,
+        'start_time': format_offset(start_ms),
+        'end_time': format_offset(end_ms)
+    }
+
+
+class TurnIndex:
+    """
+    Utterances sorted by start with bisect lookups.
+
+    Next to the sorted starts it keeps the running maximum of the ends. That
+    sequence never decreases, so the first utterance that can still be open at
+    t is found by bisection too, even when speakers overlap. A query costs
+    O(log n) plus the utterances it returns (and any overlapping neighbours).
+    """
+
+    def __init__(self, utterances: Iterable[Dict[str, Any]]):
+        self.utterances = sorted(
+            (u for u in utterances if u.get('start_ms') is not None and u.get('end_ms') is not None),
+            key=lambda u: (u['start_ms'], u['end_ms'])
+        )
+        self._starts = [u['start_ms'] for u in self.utterances]
+        self._max_ends = list(accumulate((u['end_ms'] for u in self.utterances), max))
+        self._by_speaker: Optional[Dict[str, 'TurnIndex']] = None
+
+    @classmethod
+    def from_turns(cls, turns: Iterable[Turn]) -> 'TurnIndex':
+        """Index of (start, end, speaker) turns in seconds, e.g. a diarization or a ground truth"""
+        return cls(
+            {'start_ms': to_ms(start), 'end_ms': to_ms(end), 'speaker_id': str(speaker)}
+            for start, end, speaker in turns
+        )
+
+    def __len__(self) -> int:
+        return len(self.utterances)
+
+    def between(self, from_ms: int, to_ms: int) -> List[Dict[str, Any]]:
+        """Utterances overlapping [from_ms, to_ms), in start order"""
+        first = bisect_right(self._max_ends, from_ms)
+        last = bisect_left(self._starts, to_ms)
+        return [u for u in self.utterances[first:last] if u['end_ms'] > from_ms]
+
+    def at(self, ms: int) -> Optional[Dict[str, Any]]:
+        """The utterance under the playhead at ms (the latest to start when several overlap)"""
+        covering = self.between(ms, ms + 1)
+        return covering[-1] if covering else None
+
+    def speaker_at(self, ms: int) -> Optional[str]:
+        """Who was speaking at ms, or None during silence"""
+        utterance = self.at(ms)
+        return utterance.get('speaker_id') if utterance else None
+
+    @property
+    def speakers(self) -> List[str]:
+        return sorted(self._speaker_indexes())
+
+    def for_speaker(self, speaker_id: str) -> 'TurnIndex':
+        """Index of one speaker's utterances (built once for all speakers, on first use)"""
+        return self._speaker_indexes().get(speaker_id) or TurnIndex([])
+
+    def _speaker_indexes(self) -> Dict[str, 'TurnIndex']:
+        if self._by_speaker is None:
+            grouped: Dict[str, List[Dict[str, Any]]] = {}
+            for u in self.utterances:
+                grouped.setdefault(u.get('speaker_id'), []).append(u)
+            self._by_speaker = {speaker: TurnIndex(items) for speaker, items in grouped.items()}
+        return self._by_speaker
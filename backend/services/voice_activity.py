@@ -0,0 +1,194 @@
+"""
+Voice Activity Detection - vectorized energy + zero-crossing VAD with hysteresis
+Trims silence before diarization and transcription and maps times back afterwards
+"""
+import os
+import logging
+from pathlib import Path
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from .audio_slicing import PCMAudioReader
+from .audio_spool import AudioSpool
+
+logger = logging.getLogger(__name__)
+
+Region = Tuple[float, float]
+
+VAD_FRAME_SECONDS = float(os.getenv('VAD_FRAME_SECONDS', '0.03'))
+# Frames this far above the noise floor start speech; hysteresis keeps it going down to the low margin
+VAD_HIGH_MARGIN_DB = float(os.getenv('VAD_HIGH_MARGIN_DB', '12'))
+VAD_LOW_MARGIN_DB = float(os.getenv('VAD_LOW_MARGIN_DB', '6'))
+# Nothing quieter than this counts as speech, however quiet the room (dBFS)
+VAD_MIN_ENERGY_DB = float(os.getenv('VAD_MIN_ENERGY_DB', '-50'))
+# Fricatives (s, f, sh) are quiet but cross zero often
+VAD_ZCR_THRESHOLD = float(os.getenv('VAD_ZCR_THRESHOLD', '0.25'))
+VAD_MIN_SPEECH_SECONDS = float(os.getenv('VAD_MIN_SPEECH_SECONDS', '0.25'))
+VAD_MIN_SILENCE_SECONDS = float(os.getenv('VAD_MIN_SILENCE_SECONDS', '0.5'))
+VAD_PADDING_SECONDS = float(os.getenv('VAD_PADDING_SECONDS', '0.2'))
+# Frames analysed per read when scanning a file (bounded memory for long recordings)
+VAD_BLOCK_FRAMES = 2000
+
+_SAMPLE_DTYPES = {2: np.int16, 4: np.int32}
+
+
+def frame_features(samples: np.ndarray, frame_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-frame energy (dBFS) and zero-crossing rate for float samples in [-1, 1]"""
+    frame_count = len(samples) // frame_length
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    return energy_db, zcr
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indices of every run of True"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def regions_from_features(
+    energy_db: np.ndarray,
+    zcr: np.ndarray,
+    frame_seconds: float,
+    duration: float
+) -> List[Region]:
+    """
+    Speech regions in seconds from per-frame features.
+
+    Thresholds adapt to the recording's noise floor. A region is a run of
+    frames above the low threshold that reaches the high threshold somewhere
+    (hysteresis), so quiet word endings stay attached to the speech around them
+    while isolated clicks and breaths never start a region.
+    """
+    if len(energy_db) == 0:
+        return []
+
+    noise_floor = np.percentile(energy_db, 10)
+    high = max(noise_floor + VAD_HIGH_MARGIN_DB, VAD_MIN_ENERGY_DB)
+    low = high - VAD_LOW_MARGIN_DB
+
+    strong = energy_db > high
+    # Noise crosses zero often too, so fricatives still have to clear the floor a little
+    fricative = (zcr > VAD_ZCR_THRESHOLD) & (energy_db > noise_floor + VAD_LOW_MARGIN_DB / 2)
+    weak = (energy_db > low) | fricative
+
+    run_starts, run_ends = _runs(weak)
+    strong_count = np.concatenate(([0], np.cumsum(strong)))
+    keep = strong_count[run_ends] - strong_count[run_starts] > 0
+
+    starts = run_starts[keep] * frame_seconds
+    ends = run_ends[keep] * frame_seconds
+    long_enough = ends - starts >= VAD_MIN_SPEECH_SECONDS
+    starts, ends = starts[long_enough], ends[long_enough]
+    if len(starts) == 0:
+        return []
+
+    # Pad, then close gaps too short to be a real pause
+    starts = np.maximum(starts - VAD_PADDING_SECONDS, 0.0)
+    ends = np.minimum(ends + VAD_PADDING_SECONDS, duration)
+    new_region = np.concatenate(([True], starts[1:] - ends[:-1] > VAD_MIN_SILENCE_SECONDS))
+    group_starts = np.flatnonzero(new_region)
+    merged_ends = np.maximum.reduceat(ends, group_starts)
+    return [(float(start), float(end)) for start, end in zip(starts[group_starts], merged_ends)]
+
+
+def detect_speech_regions(samples: np.ndarray, sample_rate: int) -> List[Region]:
+    """Speech regions (seconds) in a mono float or int16 signal"""
+    samples = np.asarray(samples)
+    if samples.dtype == np.int16:
+        samples = samples.astype(np.float32) / 32768.0
+    frame_length = max(1, int(round(VAD_FRAME_SECONDS * sample_rate)))
+    energy_db, zcr = frame_features(samples.astype(np.float32, copy=False), frame_length)
+    return regions_from_features(energy_db, zcr, frame_length / sample_rate, len(samples) / sample_rate)
+
+
+def detect_speech_in_file(audio_file_path: Union[str, Path]) -> Tuple[List[Region], float]:
+    """Speech regions of a PCM WAV file, scanned block by block; returns (regions, duration)"""
+    with PCMAudioReader(audio_file_path) as reader:
+        dtype = _SAMPLE_DTYPES.get(reader.sample_width)
+        if dtype is None:
+            raise ValueError(f"Unsupported sample width {reader.sample_width} for VAD")
+        scale = float(2 ** (8 * reader.sample_width - 1))
+
+        frame_length = max(1, int(round(VAD_FRAME_SECONDS * reader.sample_rate)))
+        block_samples = frame_length * VAD_BLOCK_FRAMES
+        energy_blocks, zcr_blocks = [], []
+        for block_start in range(0, reader.frame_count, block_samples):
+            pcm = reader.read_frames(block_start, block_start + block_samples)
+            samples = np.frombuffer(pcm, dtype=dtype).reshape(-1, reader.channels)
+            mono = samples.mean(axis=1, dtype=np.float32) / scale
+            energy_db, zcr = frame_features(mono, frame_length)
+            energy_blocks.append(energy_db)
+            zcr_blocks.append(zcr)
+
+        duration = reader.duration_seconds
+        if not energy_blocks:
+            return [], duration
+        regions = regions_from_features(
+            np.concatenate(energy_blocks),
+            np.concatenate(zcr_blocks),
+            frame_length / reader.sample_rate,
+            duration
+        )
+    return regions, duration
+
+
+class SpeechTimeline:
+    """
+    Map between the original recording and its speech-only ("compact") version.
+
+    The compact file is the speech regions laid end to end. Times produced by
+    diarization or ASR on the compact file are converted back with
+    `to_original`, which needs only a searchsorted over the region offsets.
+    """
+
+    def __init__(self, regions: Sequence[Region]):
+        self.regions = [(float(start), float(end)) for start, end in regions]
+        bounds = np.asarray(self.regions, dtype=np.float64).reshape(-1, 2)
+        self.starts = bounds[:, 0]
+        self.lengths = bounds[:, 1] - bounds[:, 0]
+        # Where each region begins in the compact timeline
+        self.offsets = np.concatenate(([0.0], np.cumsum(self.lengths)))
+
+    @property
+    def speech_seconds(self) -> float:
+        return float(self.offsets[-1])
+
+    def to_original(self, times: Union[float, Sequence[float]], is_end: bool = False) -> np.ndarray:
+        """
+        Original-recording times for compact times.
+
+        A time on a region boundary belongs to the next region when it is a
+        start, and to the previous one when it is an end (`is_end=True`).
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if len(self.regions) == 0:
+            return times
+        side = 'left' if is_end else 'right'
+        index = np.searchsorted(self.offsets[1:-1], times, side=side)
+        within = np.clip(times - self.offsets[index], 0.0, self.lengths[index])
+        return self.starts[index] + within
+
+    def to_original_span(self, start: float, end: float) -> Region:
+        """Original start and end of a compact interval (spanning any silence it crosses)"""
+        return float(self.to_original(start)), float(self.to_original(end, is_end=True))
+
+
+def write_speech_audio(
+    audio_file_path: Union[str, Path],
+    regions: Sequence[Region],
+    output_path: Union[str, Path]
+) -> Path:
+    """Write the speech regions of a PCM WAV file back to back into a new WAV"""
+    with PCMAudioReader(audio_file_path) as reader:
+        spool = AudioSpool(output_path, reader.sample_rate, reader.channels, reader.sample_width)
+        try:
+            for start, end in regions:
+                spool.append(reader.read_pcm(start, end))
+        finally:
+            spool.finalize()
+    return Path(output_path)
@@ -0,0 +1,229 @@
+"""
+Word Index - word-level timestamps of a session stored as arrays over a token table, and an
+inverted index across a project's sessions so a phrase can be found and played back by offset
+"""
+import os
+import re
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+WORD_TIMELINE_NAME = "words.npz"
+
+WORD_SEARCH_LIMIT = int(os.getenv('WORD_SEARCH_LIMIT', '20'))
+# How far apart (in words) the query's words may be for a hit that is not the exact phrase
+WORD_SEARCH_PROXIMITY = int(os.getenv('WORD_SEARCH_PROXIMITY', '12'))
+# Words shown on each side of a hit
+WORD_SEARCH_CONTEXT = 8
+
+MATCH_PHRASE = 'phrase'
+MATCH_NEAR = 'near'
+
+# (word, start, end) in seconds, as Whisper reports it
+Word = Tuple[str, float, float]
+
+
+def normalize_word(word: str) -> str:
+    """Lowercase form without punctuation, as compared and indexed"""
+    return re.sub(r"[^\w']", '', word).lower()
+
+
+def transcript_words(transcript: Any, offset: float = 0.0) -> List[Word]:
+    """Words of a Whisper verbose_json response, moved by `offset` seconds onto the recording"""
+    words = []
+    for word in getattr(transcript, 'words', None) or []:
+        text = word.word.strip()
+        if text:
+            words.append((text, offset + float(word.start), offset + float(word.end)))
+    return words
+
+
+def split_words(words: Sequence[Word], spans: Sequence[Tuple[float, float]]) -> List[List[Word]]:
+    """The words of each [start, end) span, a word going to the span holding its midpoint"""
+    midpoints = [(start + end) / 2 for _, start, end in words]
+    return [
+        list(words[bisect_left(midpoints, start):bisect_left(midpoints, end)])
+        for start, end in spans
+    ]
+
+
+class WordTimeline:
+    """
+    Word-level timestamps of one session as parallel arrays.
+
+    Each distinct word form is stored once in `tokens`; word i of the session
+    is `tokens[token_ids[i]]`, spoken over [starts[i], ends[i]) milliseconds.
+    Utterance u owns words `utterance_offsets[u]:utterance_offsets[u + 1]`.
+    That is 12 bytes per word, where a JSON object per word costs ~80.
+    """
+
+    def __init__(
+        self,
+        tokens: Sequence[str],
+        token_ids: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        utterance_ids: Sequence[str],
+        utterance_offsets: np.ndarray,
+        project_id: Optional[str] = None
+    ):
+        self.tokens = list(tokens)
+        self.token_ids = np.asarray(token_ids, dtype=np.uint32)
+        self.starts = np.asarray(starts, dtype=np.uint32)
+        self.ends = np.asarray(ends, dtype=np.uint32)
+        self.utterance_ids = list(utterance_ids)
+        self.utterance_offsets = np.asarray(utterance_offsets, dtype=np.uint32)
+        self.project_id = project_id
+
+    @classmethod
+    def from_utterances(cls, utterances: Iterable[Tuple[str, Sequence[Word]]], project_id: Optional[str] = None) -> 'WordTimeline':
+        """Timeline of (utterance_id, words) pairs, kept in the given order"""
+        token_table: Dict[str, int] = {}
+        token_ids, starts, ends, utterance_ids, offsets = [], [], [], [], [0]
+        for utterance_id, words in utterances:
+            for text, start, end in words:
+                token_ids.append(token_table.setdefault(text, len(token_table)))
+                starts.append(max(0, int(round(start * 1000))))
+                ends.append(max(0, int(round(end * 1000))))
+            utterance_ids.append(utterance_id)
+            offsets.append(len(token_ids))
+        return cls(list(token_table), token_ids, starts, ends, utterance_ids, offsets, project_id)
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    def utterance_of(self, position: int) -> str:
+        """Id of the utterance word `position` belongs to"""
+        return self.utterance_ids[int(np.searchsorted(self.utterance_offsets, position, side='right')) - 1]
+
+    def text(self, first: int, last: int) -> str:
+        """Words first..last (inclusive) joined"""
+        return ' '.join(self.tokens[token_id] for token_id in self.token_ids[max(0, first):last + 1])
+
+    def words(self, utterance_id: str) -> List[Tuple[str, int, int]]:
+        """(word, start_ms, end_ms) of one utterance"""
+        u = self.utterance_ids.index(utterance_id)
+        first, last = self.utterance_offsets[u], self.utterance_offsets[u + 1]
+        return [
+            (self.tokens[token_id], int(start), int(end))
+            for token_id, start, end in zip(self.token_ids[first:last], self.starts[first:last], self.ends[first:last])
+        ]
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                project_id=np.array(self.project_id or ''),
+                tokens=np.array(self.tokens, dtype=str),
+                token_ids=self.token_ids,
+                starts=self.starts,
+                ends=self.ends,
+                utterance_ids=np.array(self.utterance_ids, dtype=str),
+                utterance_offsets=self.utterance_offsets
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'WordTimeline':
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data['tokens'].tolist(),
+                data['token_ids'],
+                data['starts'],
+                data['ends'],
+                data['utterance_ids'].tolist(),
+                data['utterance_offsets'],
+                str(data['project_id']) or None
+            )
+
+
+def read_project_id(path: Union[str, Path]) -> Optional[str]:
+    """Project a saved timeline belongs to, without loading its arrays"""
+    with np.load(path, allow_pickle=False) as data:
+        return str(data['project_id']) or None
+
+
+class WordIndex:
+    """
+    Inverted index over the word timelines of a project's sessions.
+
+    Each normalized term maps to the sorted word positions it occurs at, per
+    session. A phrase is found by intersecting the positions of its terms,
+    each shifted back by its place in the phrase; when the exact phrase is
+    not there, every term within WORD_SEARCH_PROXIMITY words still counts.
+    """
+
+    def __init__(self, timelines: Dict[str, WordTimeline]):
+        self.timelines = timelines
+        self.postings: Dict[str, Dict[str, np.ndarray]] = {}
+        for session_id, timeline in timelines.items():
+            # Group positions by token id once, then fold the forms of a term together
+            order = np.argsort(timeline.token_ids, kind='stable')
+            bounds = np.searchsorted(timeline.token_ids[order], np.arange(len(timeline.tokens) + 1))
+            for token_id, token in enumerate(timeline.tokens):
+                term = normalize_word(token)
+                if not term or bounds[token_id] == bounds[token_id + 1]:
+                    continue
+                positions = order[bounds[token_id]:bounds[token_id + 1]]
+                sessions = self.postings.setdefault(term, {})
+                if session_id in sessions:
+                    positions = np.sort(np.concatenate((sessions[session_id], positions)))
+                sessions[session_id] = positions
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def search(self, query: str, limit: int = WORD_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Exact phrase hits first, then hits with all the words close together; each with its ms span"""
+        terms = [term for term in (normalize_word(word) for word in query.split()) if term]
+        if not terms or any(term not in self.postings for term in terms):
+            return []
+        sessions = set.intersection(*(set(self.postings[term]) for term in terms))
+        ordered = [session_id for session_id in self.timelines if session_id in sessions]
+
+        phrases, near = [], []
+        for session_id in ordered:
+            lists = [self.postings[term][session_id] for term in terms]
+            starts = lists[0]
+            for place, positions in enumerate(lists[1:], 1):
+                starts = np.intersect1d(starts, positions - place)
+            phrases.extend(self._hit(session_id, int(p), int(p) + len(terms) - 1, MATCH_PHRASE) for p in starts)
+            if len(terms) > 1 and len(phrases) < limit:
+                near.extend(self._near_hits(session_id, lists, set(starts.tolist()), len(terms)))
+        return (phrases + near)[:limit]
+
+    def _near_hits(self, session_id: str, lists: List[np.ndarray], phrase_starts: set, length: int) -> List[Dict[str, Any]]:
+        """Spans around the rarest term that contain every other term, not overlapping each other"""
+        anchors = min(lists, key=len)
+        hits, covered_until = [], -1
+        for anchor in anchors.tolist():
+            if anchor <= covered_until:
+                continue
+            first = last = anchor
+            for positions in lists:
+                lo = np.searchsorted(positions, anchor - WORD_SEARCH_PROXIMITY)
+                hi = np.searchsorted(positions, anchor + WORD_SEARCH_PROXIMITY, side='right')
+                if lo == hi:
+                    break
+                # The occurrence closest to the anchor
+                nearest = min(positions[lo:hi].tolist(), key=lambda p: abs(p - anchor))
+                first, last = min(first, nearest), max(last, nearest)
+            else:
+                if not any(start in phrase_starts for start in range(first, last - length + 2)):
+                    hits.append(self._hit(session_id, first, last, MATCH_NEAR))
+                covered_until = last
+        return hits
+
+    def _hit(self, session_id: str, first: int, last: int, match: str) -> Dict[str, Any]:
+        timeline = self.timelines[session_id]
+        return {
+            'session_id': session_id,
+            'utterance_id': timeline.utterance_of(first),
+            'start_ms': int(timeline.starts[first]),
+            'end_ms': int(timeline.ends[last]),
+            'match': match,
+            'text': timeline.text(first - WORD_SEARCH_CONTEXT, last + WORD_SEARCH_CONTEXT)
+        }
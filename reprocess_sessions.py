@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Batch Reprocessing CLI
+Re-run diarization and transcription over stored recordings/<session_id>/ folders
+after a model or configuration change, without replaying audio through the API.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add the backend directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from services.batch_reprocessing import REPROCESS_WORKERS, run_batch
+from services.conversation_recording_service import PROCESSING_MODES
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+def main():
+    """Command line interface for batch reprocessing."""
+    parser = argparse.ArgumentParser(
+        description="Reprocess stored recording sessions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python reprocess_sessions.py recordings
+  python reprocess_sessions.py recordings --workers 4 --mode transcribe_once
+  python reprocess_sessions.py recordings --session 3f2b... --force
+        """
+    )
+
+    parser.add_argument('storage_path', nargs='?', default='recordings', help='Directory holding session folders')
+    parser.add_argument('--workers', '-w', type=int, default=REPROCESS_WORKERS, help='Sessions processed in parallel')
+    parser.add_argument('--mode', choices=PROCESSING_MODES, help="Processing mode (default: each session's own)")
+    parser.add_argument('--session', action='append', dest='sessions', help='Only this session id (repeatable)')
+    parser.add_argument('--force', action='store_true', help='Reprocess even if the output is already current')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <storage_path>/.reprocess_checkpoint.jsonl)')
+    parser.add_argument('--report', help='Throughput report (default: <storage_path>/reprocess_report.json)')
+
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.storage_path):
+        print(f"Error: {args.storage_path} is not a directory")
+        sys.exit(1)
+
+    report = run_batch(
+        args.storage_path,
+        workers=args.workers,
+        processing_mode=args.mode,
+        session_ids=args.sessions,
+        force=args.force,
+        checkpoint_path=args.checkpoint,
+        report_path=args.report
+    )
+
+    print(f"Completed: {report['sessions_completed']}  Failed: {report['sessions_failed']}  Skipped: {report['sessions_skipped']}")
+    print(f"Audio: {report['audio_seconds']:.0f}s in {report['wall_seconds']:.1f}s (x{report['realtime_factor'] or 0} real time)")
+
+    if report['sessions_failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
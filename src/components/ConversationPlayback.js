@@ -20,6 +20,7 @@ const ConversationPlayback = ({ sessionId, projectId }) => {
 
   const audioRef = useRef(null);
   const intervalRef = useRef(null);
+  const segmentAudioRef = useRef(null);
 
   // Load conversation transcript
   useEffect(() => {
@@ -125,6 +126,21 @@ const ConversationPlayback = ({ sessionId, projectId }) => {
     }
   };
 
+  // Play one utterance on its own; the server range-serves just its samples
+  const playUtterance = (utterance) => {
+    if (!utterance.audio_segment_path) {
+      seekToTime(parseTimeToSeconds(utterance.timestamp));
+      return;
+    }
+    
+    pauseAudio();
+    if (segmentAudioRef.current) {
+      segmentAudioRef.current.pause();
+    }
+    segmentAudioRef.current = new Audio(utterance.audio_segment_path);
+    segmentAudioRef.current.play();
+  };
+
   // Get current utterance based on time
   const getCurrentUtterance = () => {
     if (!transcript) return null;
@@ -301,10 +317,7 @@ const ConversationPlayback = ({ sessionId, projectId }) => {
                       ? 'bg-blue-100 border border-blue-200' 
                       : 'hover:bg-gray-100'
                   }`}
-                  onClick={() => {
-                    const startTime = parseTimeToSeconds(utterance.timestamp);
-                    seekToTime(startTime);
-                  }}
+                  onClick={() => playUtterance(utterance)}
                 >
                   <div className="flex-shrink-0">
                     <div className={`w-8 h-8 rounded-full flex items-center justify-center text-xs font-medium ${
@@ -343,6 +356,8 @@ const ConversationPlayback = ({ sessionId, projectId }) => {
       {/* Hidden audio element for playback */}
       <audio
         ref={audioRef}
+        src={`/conversation/session/${sessionId}/audio`}
+        preload="metadata"
         onEnded={() => {
           setIsPlaying(false);
           if (intervalRef.current) {
@@ -21,6 +21,9 @@ const ConversationRecorder = ({ projectId, onRecordingComplete }) => {
   ]);
 
   const mediaRecorderRef = useRef(null);
+  const socketRef = useRef(null);
+  const liveEventsRef = useRef(null);
+  const pendingChunksRef = useRef([]);
   const audioChunksRef = useRef([]);
   const streamRef = useRef(null);
   const intervalRef = useRef(null);
@@ -71,10 +74,14 @@ const ConversationRecorder = ({ projectId, onRecordingComplete }) => {
       mediaRecorder.ondataavailable = (event) => {
         if (event.data.size > 0) {
           audioChunksRef.current.push(event.data);
-          processAudioChunk(event.data);
+          sendAudioChunk(event.data);
         }
       };
 
+      // Create the session and wait for the audio stream before recording: the first
+      // chunk carries the WebM container header, and the server cannot decode without it
+      await startConversationSession();
+
       // Start recording
       mediaRecorder.start(1000); // Collect data every 1 second
       setIsRecording(true);
@@ -84,16 +91,16 @@ const ConversationRecorder = ({ projectId, onRecordingComplete }) => {
         setRecordingTime(prev => prev + 1);
       }, 1000);
 
-      // Start conversation session
-      await startConversationSession();
-
     } catch (error) {
       console.error('Error starting recording:', error);
+      if (streamRef.current) {
+        streamRef.current.getTracks().forEach(track => track.stop());
+      }
       alert('Failed to start recording. Please check microphone permissions.');
     }
   };
 
-  // Start conversation session on backend
+  // Start conversation session on backend; resolves once the audio stream is open
   const startConversationSession = async () => {
     try {
       const response = await fetch('/conversation/start', {
@@ -104,99 +111,137 @@ const ConversationRecorder = ({ projectId, onRecordingComplete }) => {
         body: JSON.stringify({
           project_id: projectId,
           session_name: `Interview Session ${new Date().toLocaleString()}`,
-          participants: participants
+          participants: participants,
+          // Chunks are sent as recorded (compressed); the server decodes them
+          input_format: mediaRecorderRef.current ? mediaRecorderRef.current.mimeType : 'audio/webm'
         }),
       });
 
       if (response.ok) {
         const data = await response.json();
         setSessionId(data.session_id);
+        await openAudioStream(data.session_id);
+        if (data.live_events_url) {
+          openLiveTranscript(data.live_events_url);
+        }
       } else {
         throw new Error('Failed to start conversation session');
       }
     } catch (error) {
       console.error('Error starting conversation session:', error);
+      throw error;
     }
   };
 
-  // Process audio chunk for speaker separation
-  const processAudioChunk = async (audioBlob) => {
-    if (!sessionId) return;
+  // Live segments have no speaker until the session is processed
+  const formatOffset = (ms) => {
+    const seconds = Math.floor(ms / 1000);
+    return `${String(Math.floor(seconds / 60)).padStart(2, '0')}:${String(seconds % 60).padStart(2, '0')}`;
+  };
 
-    try {
-      // Convert blob to base64
-      const arrayBuffer = await audioBlob.arrayBuffer();
-      const base64Audio = btoa(String.fromCharCode(...new Uint8Array(arrayBuffer)));
+  const liveUtterance = (segment) => ({
+    ...segment,
+    start_time: formatOffset(segment.start_ms),
+    end_time: formatOffset(segment.end_ms),
+    confidence: null
+  });
 
-      // Send to backend for processing
-      const response = await fetch('/conversation/audio-chunk', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          session_id: sessionId,
-          audio_data: base64Audio,
-          sample_rate: 16000
-        }),
-      });
+  // Follow the live transcript (server-sent events) while recording
+  const openLiveTranscript = (url) => {
+    const events = new EventSource(url);
+    events.addEventListener('snapshot', (event) => {
+      const data = JSON.parse(event.data);
+      setUtterances(data.utterances.map(liveUtterance));
+      setCurrentTranscript(data.partial.map(segment => segment.text).join(' '));
+    });
+    events.addEventListener('final', (event) => {
+      const utterance = liveUtterance(JSON.parse(event.data));
+      setUtterances(prev => [...prev, utterance]);
+    });
+    events.addEventListener('partial', (event) => {
+      const data = JSON.parse(event.data);
+      setCurrentTranscript(data.segments.map(segment => segment.text).join(' '));
+    });
+    events.addEventListener('done', () => {
+      events.close();
+      setCurrentTranscript('');
+    });
+    liveEventsRef.current = events;
+  };
 
-      if (response.ok) {
-        const data = await response.json();
-        
-        // Update utterances with new speaker-separated data
-        if (data.utterances && data.utterances.length > 0) {
-          setUtterances(prev => [...prev, ...data.utterances]);
-          
-          // Auto-transcribe new utterances
-          for (const utterance of data.utterances) {
-            await transcribeUtterance(utterance.id);
-          }
-        }
+  // Open binary audio stream to the backend; resolves when the socket is open
+  const openAudioStream = (newSessionId) => new Promise((resolve, reject) => {
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const socket = new WebSocket(
+      `${protocol}://${window.location.host}/conversation/${newSessionId}/stream?sample_rate=16000`
+    );
+
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'error') {
+        console.error('Audio stream error:', message.message);
       }
-    } catch (error) {
-      console.error('Error processing audio chunk:', error);
-    }
-  };
+    };
 
-  // Transcribe utterance
-  const transcribeUtterance = async (utteranceId) => {
-    if (!sessionId) return;
+    socket.onopen = () => {
+      // Anything recorded before the socket opened goes first, in order
+      pendingChunksRef.current.forEach(chunk => socket.send(chunk));
+      pendingChunksRef.current = [];
+      resolve();
+    };
 
-    try {
-      const response = await fetch('/conversation/transcribe', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          session_id: sessionId,
-          utterance_id: utteranceId,
-          transcription_service: 'openai'
-        }),
-      });
+    socket.onerror = (error) => {
+      console.error('Audio stream connection error:', error);
+      reject(new Error('Audio stream connection failed'));
+    };
 
-      if (response.ok) {
-        const data = await response.json();
-        
-        // Update utterance with transcription
-        setUtterances(prev => 
-          prev.map(utterance => 
-            utterance.id === utteranceId 
-              ? { ...utterance, text: data.text, confidence: data.confidence }
-              : utterance
-          )
-        );
-      }
-    } catch (error) {
-      console.error('Error transcribing utterance:', error);
+    socketRef.current = socket;
+  });
+
+  // Send recorded audio chunk as a raw binary frame
+  const sendAudioChunk = (audioBlob) => {
+    const socket = socketRef.current;
+    if (socket && socket.readyState === WebSocket.CONNECTING) {
+      // Never drop a chunk: a missing container header makes the rest undecodable
+      pendingChunksRef.current.push(audioBlob);
+      return;
     }
+    if (!socket || socket.readyState !== WebSocket.OPEN) return;
+
+    // The server stops reading when it falls behind; bufferedAmount grows
+    // here instead of the server's memory
+    socket.send(audioBlob);
   };
 
+  // Flush remaining audio and wait for the server to confirm the stream is closed
+  const closeAudioStream = () => new Promise((resolve) => {
+    const socket = socketRef.current;
+    socketRef.current = null;
+    if (!socket || socket.readyState !== WebSocket.OPEN) {
+      resolve();
+      return;
+    }
+
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'closed') {
+        resolve(message);
+      }
+    };
+    socket.onclose = () => resolve();
+    socket.send('end');
+  });
+
   // Stop recording
   const stopRecording = async () => {
     if (mediaRecorderRef.current && isRecording) {
+      // Wait for the final dataavailable event so the last chunk is sent
+      const recorderStopped = new Promise((resolve) => {
+        mediaRecorderRef.current.addEventListener('stop', resolve, { once: true });
+      });
       mediaRecorderRef.current.stop();
+      await recorderStopped;
+      await closeAudioStream();
       
       // Stop all tracks
       if (streamRef.current) {
@@ -218,6 +263,28 @@ const ConversationRecorder = ({ projectId, onRecordingComplete }) => {
     }
   };
 
+  // Poll a background processing job until it finishes
+  const waitForProcessingJob = async (statusUrl) => {
+    while (true) {
+      const response = await fetch(statusUrl);
+      if (!response.ok) {
+        throw new Error(`Job status request failed: ${response.status}`);
+      }
+
+      const job = await response.json();
+      if (job.status === 'completed') {
+        return job.result;
+      }
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Processing failed');
+      }
+
+      const running = (job.stages || []).filter(stage => stage.status === 'running');
+      console.log('Processing:', running.map(stage => `${stage.name} ${Math.round(stage.progress * 100)}%`).join(', '));
+      await new Promise(resolve => setTimeout(resolve, 2000));
+    }
+  };
+
   // End conversation session
   const endConversationSession = async () => {
     try {
@@ -226,13 +293,17 @@ const ConversationRecorder = ({ projectId, onRecordingComplete }) => {
       });
 
       if (response.ok) {
-        const data = await response.json();
-        console.log('Conversation session ended:', data);
+        const job = await response.json();
+        console.log('Conversation session ended, processing job:', job.job_id);
+
+        const data = await waitForProcessingJob(job.status_url);
+        // Processed utterances replace the live ones, now with speakers
+        setUtterances(data.utterances || []);
         
         if (onRecordingComplete) {
           onRecordingComplete({
             sessionId,
-            utterances,
+            utterances: data.utterances || utterances,
             audioFile: data.audio_file_path,
             transcriptionFile: data.transcription_file_path
           });
@@ -356,7 +427,7 @@ const ConversationRecorder = ({ projectId, onRecordingComplete }) => {
         </div>
         
         <div className="bg-gray-50 rounded-lg p-4 max-h-64 overflow-y-auto">
-          {utterances.length === 0 ? (
+          {utterances.length === 0 && !currentTranscript ? (
             <p className="text-gray-500 italic">No speech detected yet...</p>
           ) : (
             <div className="space-y-3">
@@ -391,6 +462,9 @@ const ConversationRecorder = ({ projectId, onRecordingComplete }) => {
                   </div>
                 </div>
               ))}
+              {currentTranscript && (
+                <p className="text-gray-500 italic">{currentTranscript}</p>
+              )}
             </div>
           )}
         </div>
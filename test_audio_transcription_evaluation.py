@@ -5,6 +5,7 @@ Implements proper workflow: diarize → transcribe once → align by overlap →
 """
 
 import os
+import sys
 import json
 import asyncio
 import logging
@@ -17,6 +18,12 @@ import uuid
 from dotenv import load_dotenv
 load_dotenv('.env.development')
 
+# Add the backend directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from services.speaker_alignment import SpeakerCoverage
+from services.result_cache import ResultCache, cache_key, result_cache_dir
+
 # PyAnnote-Audio for speaker diarization
 try:
     from pyannote.audio import Pipeline
@@ -51,6 +58,8 @@ class AudioEvaluationService:
     def __init__(self):
         self.diarization_pipeline = None
         self.openai_client = None
+        # Shared with the recording service, so re-running an evaluation skips pyannote and Whisper
+        self.result_cache = ResultCache(result_cache_dir('recordings'))
         
         # Initialize PyAnnote pipeline
         if PYANNOTE_AVAILABLE:
@@ -82,17 +91,23 @@ class AudioEvaluationService:
         Transcribe audio once and return time-stamped segments
         Returns: [{'start': float, 'end': float, 'text': str}, ...]
         """
-        if not self.openai_client:
-            raise ValueError("OpenAI client not available")
-        
         print(f"🎙️ Transcribing audio: {audio_path}")
         
-        with open(audio_path, 'rb') as f:
-            transcript = self.openai_client.audio.transcriptions.create(
-                model="whisper-1",
-                file=f,
-                response_format="verbose_json"
-            )
+        audio_hash = self.result_cache.audio_hash(audio_path)
+        key = cache_key('transcription', audio_hash, "whisper-1", {'response_format': 'verbose_json'}) if audio_hash else None
+        transcript = self.result_cache.get_transcript(key)
+        if transcript is not None:
+            print("♻️ Using cached transcription")
+        else:
+            if not self.openai_client:
+                raise ValueError("OpenAI client not available")
+            with open(audio_path, 'rb') as f:
+                transcript = self.openai_client.audio.transcriptions.create(
+                    model="whisper-1",
+                    file=f,
+                    response_format="verbose_json"
+                )
+            self.result_cache.put_transcript(key, transcript)
         
         # Extract segments with timestamps
         segments = []
@@ -117,11 +132,20 @@ class AudioEvaluationService:
     
     def run_diarization(self, audio_path: str) -> Annotation:
         """Run speaker diarization and return Annotation object"""
-        if not self.diarization_pipeline:
-            raise ValueError("PyAnnote pipeline not available")
-        
         print(f"🎯 Running speaker diarization: {audio_path}")
-        diarization = self.diarization_pipeline(audio_path)
+        audio_hash = self.result_cache.audio_hash(audio_path)
+        key = cache_key('diarization', audio_hash, "pyannote/speaker-diarization-3.1") if audio_hash else None
+        cached = self.result_cache.get_diarization(key)
+        if cached is not None:
+            print("♻️ Using cached diarization")
+            diarization = Annotation()
+            for start, end, speaker in cached:
+                diarization[Segment(start, end)] = speaker
+        else:
+            if not self.diarization_pipeline:
+                raise ValueError("PyAnnote pipeline not available")
+            diarization = self.diarization_pipeline(audio_path)
+            self.result_cache.put_diarization(key, diarization)
         print(f"👥 Detected {len(diarization.labels())} speakers")
         return diarization
     
@@ -131,27 +155,15 @@ class AudioEvaluationService:
         """
         print(f"🔗 Assigning speakers to {len(asr_segments)} ASR segments")
         
+        # Vectorized overlap of every segment against every speaker's timeline
+        coverage = SpeakerCoverage.from_diarization(diarization)
+        assignments = coverage.assign(
+            [seg["start"] for seg in asr_segments],
+            [seg["end"] for seg in asr_segments]
+        )
+        
         utterances = []
-        for i, seg in enumerate(asr_segments):
-            asr_segment = Segment(seg["start"], seg["end"])
-            
-            # Find speaker with maximum overlap
-            best_speaker = None
-            best_overlap = 0.0
-            
-            # Get all speakers and their segments
-            for speaker in diarization.labels():
-                timeline = diarization.label_timeline(speaker)
-                overlap_duration = 0.0
-                for speaker_segment in timeline:
-                    intersection = speaker_segment & asr_segment
-                    if intersection:
-                        overlap_duration += intersection.duration
-                
-                if overlap_duration > best_overlap:
-                    best_speaker = speaker
-                    best_overlap = overlap_duration
-            
+        for i, (seg, (best_speaker, best_overlap)) in enumerate(zip(asr_segments, assignments)):
             # Create utterance record
             utterance = {
                 'id': str(uuid.uuid4()),
@@ -11,6 +11,7 @@ import asyncio
 import logging
 from pathlib import Path
 from typing import Dict, List, Any, Tuple
+from collections import Counter
 from datetime import datetime
 import argparse
 
@@ -18,6 +19,7 @@ import argparse
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
 from services.conversation_recording_service import conversation_recording_service
+from services.turn_index import TurnIndex, to_ms
 
 # Configure logging
 logging.basicConfig(
@@ -82,18 +84,18 @@ class SpeakerDiarizationTester:
             
             # Step 3: Load and process audio file
             audio_processing_start = time.time()
-            audio_data = self._load_audio_file(audio_path)
+            audio_data, sample_rate, channels = self._load_audio_file(audio_path)
             
-            # Simulate audio chunk processing
-            chunk_size = 16000 * 2  # 1 second of 16kHz audio
+            # Simulate audio chunk processing; the service resamples and downmixes on ingest
+            chunk_size = sample_rate * channels * 4  # 1 second of float32 audio
             for i in range(0, len(audio_data), chunk_size):
-                chunk = audio_data[i:i + chunk_size]
-                if len(chunk) == chunk_size:
-                    await conversation_recording_service.process_audio_chunk(
-                        session_id=session_id,
-                        audio_data=chunk,
-                        sample_rate=16000
-                    )
+                await conversation_recording_service.process_audio_chunk(
+                    session_id=session_id,
+                    audio_data=audio_data[i:i + chunk_size],
+                    sample_rate=sample_rate,
+                    channels=channels,
+                    sample_format='f32le'
+                )
             
             # Step 4: Process complete audio with speaker diarization
             diarization_start = time.time()
@@ -174,14 +176,12 @@ class SpeakerDiarizationTester:
             logger.warning(f"Could not load ground truth: {e}")
             return []
     
-    def _load_audio_file(self, audio_path: Path) -> bytes:
-        """Load audio file as bytes for processing"""
+    def _load_audio_file(self, audio_path: Path) -> Tuple[bytes, int, int]:
+        """Load audio file as interleaved float32 bytes at its native rate and channel count"""
         try:
             import soundfile as sf
-            audio_data, sample_rate = sf.read(audio_path)
-            # Convert to 16-bit PCM
-            audio_bytes = (audio_data * 32767).astype('int16').tobytes()
-            return audio_bytes
+            audio_data, sample_rate = sf.read(audio_path, dtype='float32', always_2d=True)
+            return audio_data.tobytes(), sample_rate, audio_data.shape[1]
         except Exception as e:
             logger.error(f"Error loading audio file: {e}")
             raise
@@ -219,8 +219,26 @@ class SpeakerDiarizationTester:
         
         analysis['speaker_distribution'] = speaker_counts
         
-        # Calculate speaker accuracy by comparing speaker assignments
-        if expected_speakers and utterances:
+        timed_truth = [gt for gt in ground_truth if 'start' in gt and 'end' in gt]
+        if timed_truth and utterances:
+            # Who the system heard at the middle of each ground-truth segment
+            index = TurnIndex(utterances)
+            heard = [index.speaker_at(to_ms((gt['start'] + gt['end']) / 2)) for gt in timed_truth]
+            
+            # Each detected label stands for the ground-truth speaker it coincides with most
+            votes = {}
+            for detected, gt in zip(heard, timed_truth):
+                if detected is not None:
+                    votes.setdefault(detected, Counter())[gt.get('speaker')] += 1
+            mapping = {detected: counts.most_common(1)[0][0] for detected, counts in votes.items()}
+            
+            for detected, gt in zip(heard, timed_truth):
+                if detected is not None and mapping[detected] == gt.get('speaker'):
+                    analysis['speaker_matches'].append({'start': gt['start'], 'speaker': gt.get('speaker'), 'detected': detected})
+            analysis['speaker_accuracy'] = len(analysis['speaker_matches']) / len(timed_truth)
+        
+        # Without timed ground truth, only compare speaker counts
+        elif expected_speakers and utterances:
             # Map detected speakers to expected speakers
             detected_speakers = list(speaker_counts.keys())
             expected_speaker_set = set(expected_speakers)
@@ -284,25 +302,9 @@ class SpeakerDiarizationTester:
         
         return len(intersection) / len(union) if union else 0.0
     
-    def _parse_time_to_seconds(self, time_str: str) -> float:
-        """Parse time string (MM:SS) to seconds"""
-        try:
-            parts = time_str.split(':')
-            if len(parts) == 2:
-                minutes, seconds = map(float, parts)
-                return minutes * 60 + seconds
-            return 0.0
-        except:
-            return 0.0
-    
     def _calculate_total_duration(self, utterances: List[Dict[str, Any]]) -> float:
         """Calculate total duration of all utterances"""
-        total = 0.0
-        for utterance in utterances:
-            start = self._parse_time_to_seconds(utterance.get('start_time', '00:00'))
-            end = self._parse_time_to_seconds(utterance.get('end_time', '00:00'))
-            total += end - start
-        return total
+        return sum(utterance['end_ms'] - utterance['start_ms'] for utterance in utterances) / 1000
     
     def _update_recording_with_speakers(
         self, 
@@ -0,0 +1,81 @@
+"""
+Tests for the audio archive - streaming FLAC/Opus encode and on-demand decode
+"""
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.audio_archive import (
+    ArchiveEncoder,
+    decode_to_wav,
+    ensure_working_copy,
+    find_archive,
+    resolve_archive_format,
+    stream_wav
+)
+
+requires_opus = pytest.mark.skipif('OPUS' not in sf.available_subtypes('OGG'), reason="libsndfile built without Opus")
+
+
+def _speech_like_pcm(seconds: float) -> bytes:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * 16000)) / 16000
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t)) + 0.01 * rng.standard_normal(len(t))
+    return (signal * 32767).astype('<i2').tobytes()
+
+
+class TestAudioArchive:
+    """Test suite for archive encode/decode"""
+
+    @pytest.mark.unit
+    def test_flac_round_trip_is_lossless(self, tmp_path):
+        """Chunks split mid-sample encode to FLAC and decode back bit for bit"""
+        pcm = _speech_like_pcm(5.0)
+        encoder = ArchiveEncoder(tmp_path / "complete_audio", 'flac')
+        for offset in range(0, len(pcm), 3001):
+            encoder.write(pcm[offset:offset + 3001])
+        archive_path = encoder.close()
+
+        assert archive_path.suffix == ".flac"
+        assert archive_path.stat().st_size < len(pcm)
+
+        wav_path = decode_to_wav(archive_path, tmp_path / "restored.wav")
+        assert wav_path.read_bytes()[44:] == pcm
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["complete_audio.flac", "restored.wav"]
+
+        streamed = b''.join(stream_wav(archive_path))
+        assert streamed == wav_path.read_bytes()
+
+    @pytest.mark.unit
+    @requires_opus
+    def test_opus_archive_keeps_duration(self, tmp_path):
+        pcm = _speech_like_pcm(5.0)
+        encoder = ArchiveEncoder(tmp_path / "complete_audio", resolve_archive_format('opus'))
+        encoder.write(pcm)
+        archive_path = encoder.close()
+
+        assert archive_path.stat().st_size < len(pcm) / 5
+        assert sf.info(archive_path).duration == pytest.approx(5.0, abs=0.05)
+
+    @pytest.mark.unit
+    def test_working_copy_restored_on_demand(self, tmp_path):
+        """A released working copy is decoded again from the archive when needed"""
+        pcm = _speech_like_pcm(1.0)
+        encoder = ArchiveEncoder(tmp_path / "complete_audio", 'flac')
+        encoder.write(pcm)
+        encoder.close()
+
+        assert find_archive(tmp_path).name == "complete_audio.flac"
+        working_copy = ensure_working_copy(tmp_path)
+        assert working_copy.name == "complete_audio.wav"
+        assert working_copy.read_bytes()[44:] == pcm
+
+        with pytest.raises(FileNotFoundError):
+            ensure_working_copy(tmp_path / "missing")
@@ -0,0 +1,96 @@
+"""
+Tests for audio cuts - cut lists and single-pass multi-clip writing
+"""
+import json
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.audio_cuts import (
+    clip_paths, ffmpeg_clip_command, load_cuts, parse_ranges, read_cut_list, validate_cuts, write_wav_clips
+)
+from services.result_cache import write_rttm
+
+# The trimmer scripts live at the repository root
+sys.path.insert(0, str(backend_path.parent))
+from audio_trimmer_ffmpeg import FFmpegAudioTrimmer
+
+
+@pytest.fixture
+def ramp_wav(tmp_path):
+    """Ten seconds of 16 kHz mono where every sample holds its own index (mod 2^15)"""
+    path = tmp_path / "interview.wav"
+    samples = (np.arange(16000 * 10) % 32768).astype(np.int16)
+    sf.write(path, samples, 16000, subtype='PCM_16')
+    return path, samples
+
+
+class TestAudioCuts:
+    """Test suite for multi-clip cutting"""
+
+    @pytest.mark.unit
+    def test_overlapping_clips_written_in_one_pass(self, ramp_wav, tmp_path):
+        path, samples = ramp_wav
+        # Out of order, overlapping, and one touching the end of the file
+        cuts = [(6.0, 10.0, 'SPEAKER_01'), (0.5, 2.0, 'SPEAKER_00'), (1.5, 3.25, 'SPEAKER_01')]
+        outputs = clip_paths(path, cuts, tmp_path / "clips")
+
+        written = write_wav_clips(path, cuts, outputs)
+
+        assert [Path(p).name for p in written] == [
+            "interview_000_SPEAKER_01.wav", "interview_001_SPEAKER_00.wav", "interview_002_SPEAKER_01.wav"
+        ]
+        for (start, end, _), output in zip(cuts, written):
+            clip, rate = sf.read(output, dtype='int16')
+            assert rate == 16000
+            assert np.array_equal(clip, samples[int(start * 16000):int(end * 16000)])
+
+    @pytest.mark.unit
+    def test_cut_lists_from_rttm_and_transcription(self, tmp_path):
+        rttm = tmp_path / "session.rttm"
+        rttm.write_text(write_rttm([(0.0, 1.5, 'SPEAKER_00'), (1.5, 4.0, 'SPEAKER_01')]))
+        transcription = tmp_path / "transcription.json"
+        transcription.write_text(json.dumps({'utterances': [
+            {'id': 'a1', 'speaker_id': 'SPEAKER_00', 'start_ms': 250, 'end_ms': 1750},
+        ]}))
+
+        assert load_cuts(rttm) == [(0.0, 1.5, 'SPEAKER_00'), (1.5, 4.0, 'SPEAKER_01')]
+        assert load_cuts(transcription) == [(0.25, 1.75, 'a1')]
+        assert read_cut_list("10-30, 45.5-60", str(rttm))[:3] == [(10.0, 30.0, ''), (45.5, 60.0, ''), (0.0, 1.5, 'SPEAKER_00')]
+        with pytest.raises(ValueError):
+            parse_ranges("10:30")
+        with pytest.raises(ValueError):
+            validate_cuts([(0.0, 1.0, ''), (5.0, 12.0, '')], 10.0)
+
+    @pytest.mark.unit
+    def test_ffmpeg_decodes_input_once_for_all_clips(self, tmp_path):
+        cuts = [(1.0, 2.5, ''), (30.0, 31.0, 'x')]
+        outputs = [tmp_path / "a.mp3", tmp_path / "b.mp3"]
+
+        command = ffmpeg_clip_command("talk.mp3", cuts, outputs)
+
+        assert command.count('-i') == 1
+        assert command[-1] == str(outputs[1])
+        assert command[command.index(str(outputs[0])) - 6:command.index(str(outputs[0]))] == [
+            '-ss', '1.000', '-t', '1.500', '-c', 'copy'
+        ]
+
+    @pytest.mark.unit
+    def test_empty_cut_list_writes_nothing(self, tmp_path, monkeypatch):
+        """A cut list without turns must not reach ffmpeg, which rejects a run with no outputs"""
+        path = tmp_path / "talk.flac"
+        sf.write(path, np.zeros(16000, dtype=np.int16), 16000)
+
+        def no_ffmpeg(*args, **kwargs):
+            raise AssertionError("ffmpeg should not run")
+
+        monkeypatch.setattr("services.audio_cuts.subprocess.run", no_ffmpeg)
+
+        assert FFmpegAudioTrimmer(path).trim_many([]) == []
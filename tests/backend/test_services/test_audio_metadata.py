@@ -0,0 +1,79 @@
+"""
+Tests for the audio metadata reader - header-only duration and layout
+"""
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.audio_archive import ArchiveEncoder
+from services.audio_metadata import get_audio_duration, read_audio_metadata
+from services.audio_spool import AudioSpool
+
+
+class TestAudioMetadata:
+    """Test suite for read_audio_metadata"""
+
+    @pytest.mark.unit
+    def test_wav_header(self, tmp_path):
+        path = tmp_path / "stereo.wav"
+        sf.write(path, np.zeros((44100 * 2, 2), dtype=np.int16), 44100, subtype='PCM_16')
+
+        metadata = read_audio_metadata(path)
+
+        assert metadata['format'] == 'wav'
+        assert (metadata['sample_rate'], metadata['channels'], metadata['sample_width']) == (44100, 2, 2)
+        assert metadata['frames'] == 88200
+        assert metadata['duration'] == pytest.approx(2.0)
+        assert metadata['size'] == path.stat().st_size
+
+    @pytest.mark.unit
+    def test_float_wav_and_extra_chunks(self, tmp_path):
+        """Float WAVs written by libsndfile carry a fact chunk before the data"""
+        path = tmp_path / "float.wav"
+        sf.write(path, np.zeros(8000, dtype=np.float32), 8000, subtype='FLOAT')
+
+        metadata = read_audio_metadata(path)
+
+        assert metadata['codec'] == 'pcm_float'
+        assert metadata['sample_width'] == 4
+        assert metadata['duration'] == pytest.approx(1.0)
+
+    @pytest.mark.unit
+    def test_spool_still_being_written(self, tmp_path):
+        """A growing spool has a placeholder size; the duration comes from the bytes on disk"""
+        spool = AudioSpool(tmp_path / "complete_audio.wav", sample_rate=16000)
+        spool.append(b'\x00\x00' * 24000)
+        spool.flush()
+
+        assert get_audio_duration(spool.path) == pytest.approx(1.5)
+        spool.finalize()
+
+    @pytest.mark.unit
+    def test_flac_streaminfo(self, tmp_path):
+        encoder = ArchiveEncoder(tmp_path / "complete_audio", 'flac')
+        encoder.write(np.zeros(40000, dtype='<i2').tobytes())
+        path = encoder.close()
+
+        metadata = read_audio_metadata(path)
+
+        assert metadata['format'] == 'flac'
+        assert (metadata['sample_rate'], metadata['channels'], metadata['sample_width']) == (16000, 1, 2)
+        assert metadata['frames'] == 40000
+        assert metadata['duration'] == pytest.approx(2.5)
+
+    @pytest.mark.unit
+    def test_unreadable_file(self, tmp_path, monkeypatch):
+        import services.audio_metadata as audio_metadata
+        monkeypatch.setattr(audio_metadata, 'FFPROBE_BINARY', 'ffprobe-not-installed')
+        path = tmp_path / "notes.txt"
+        path.write_text("not audio")
+
+        with pytest.raises(ValueError):
+            read_audio_metadata(path)
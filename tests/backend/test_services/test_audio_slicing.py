@@ -0,0 +1,76 @@
+"""
+Tests for PCMAudioReader - per-segment slicing of PCM WAV recordings
+"""
+import pytest
+import io
+import wave
+import sys
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.audio_slicing import PCMAudioReader
+from services.audio_spool import AudioSpool
+
+
+@pytest.fixture
+def ramp_wav(tmp_path):
+    """Ten seconds of 16 kHz audio where every sample encodes its own index"""
+    samples = (np.arange(16000 * 10) % 32000).astype(np.int16)
+    path = tmp_path / "ramp.wav"
+    sf.write(path, samples, 16000, subtype='PCM_16')
+    return path, samples
+
+
+class TestPCMAudioReader:
+    """Test suite for mmap-based segment extraction"""
+
+    @pytest.mark.unit
+    def test_reads_header(self, ramp_wav):
+        """Format and duration come from the WAV header"""
+        path, _ = ramp_wav
+        with PCMAudioReader(path) as reader:
+            assert reader.sample_rate == 16000
+            assert reader.channels == 1
+            assert reader.sample_width == 2
+            assert reader.duration_seconds == pytest.approx(10.0)
+
+    @pytest.mark.unit
+    def test_read_pcm_matches_source(self, ramp_wav):
+        """A time range maps to exactly the matching samples"""
+        path, samples = ramp_wav
+        with PCMAudioReader(path) as reader:
+            pcm = reader.read_pcm(2.5, 4.0)
+
+        assert np.array_equal(np.frombuffer(pcm, dtype=np.int16), samples[40000:64000])
+
+    @pytest.mark.unit
+    def test_segment_wav_is_standalone_and_clamped(self, ramp_wav):
+        """Segment WAVs are small, padded, and clamped to the recording"""
+        path, samples = ramp_wav
+        with PCMAudioReader(path) as reader:
+            segment = reader.segment_wav(9.5, 12.0, padding=0.1)
+
+        with wave.open(io.BytesIO(segment), 'rb') as wav_file:
+            assert wav_file.getframerate() == 16000
+            data = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+
+        assert np.array_equal(data, samples[int(9.4 * 16000):])
+
+    @pytest.mark.unit
+    def test_reads_spool_still_being_written(self, tmp_path):
+        """Placeholder header sizes fall back to what is on disk"""
+        spool = AudioSpool(tmp_path / "live.wav")
+        spool.append(np.ones(16000, dtype=np.int16).tobytes())
+        spool.flush()
+
+        with PCMAudioReader(spool.path) as reader:
+            assert reader.duration_seconds == pytest.approx(1.0)
+            assert len(reader.read_pcm(0.0, 5.0)) == 32000
+
+        spool.finalize()
@@ -0,0 +1,81 @@
+"""
+Tests for AudioSpool - append-only WAV storage for recording sessions
+"""
+import pytest
+import wave
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.audio_spool import AudioSpool, WAV_HEADER_SIZE
+
+
+class TestAudioSpool:
+    """Test suite for the session audio spool"""
+
+    @pytest.mark.unit
+    def test_finalized_spool_is_valid_wav(self, tmp_path):
+        """Chunks round-trip through the spool into a readable WAV file"""
+        samples = (np.arange(16000 * 2) % 3000 - 1500).astype(np.int16)
+        raw = samples.tobytes()
+
+        spool = AudioSpool(tmp_path / "audio.wav", sample_rate=16000)
+        # Odd chunk sizes split samples across chunk boundaries
+        for i in range(0, len(raw), 3333):
+            spool.append(raw[i:i + 3333])
+        path = spool.finalize()
+
+        with wave.open(str(path), 'rb') as wav_file:
+            assert wav_file.getframerate() == 16000
+            assert wav_file.getnchannels() == 1
+            assert wav_file.getsampwidth() == 2
+            assert wav_file.getnframes() == len(samples)
+            data = wav_file.readframes(wav_file.getnframes())
+
+        assert np.array_equal(np.frombuffer(data, dtype=np.int16), samples)
+        assert spool.duration_seconds == pytest.approx(2.0)
+        assert path.stat().st_size == WAV_HEADER_SIZE + len(raw)
+
+    @pytest.mark.unit
+    def test_append_returns_data_offsets(self, tmp_path):
+        """Each append reports where its audio starts in the data section"""
+        spool = AudioSpool(tmp_path / "audio.wav")
+        assert spool.append(b"\x00" * 100) == 0
+        assert spool.append(b"\x00" * 50) == 100
+        assert spool.chunk_count == 2
+        spool.finalize()
+
+    @pytest.mark.unit
+    def test_finalize_is_idempotent_and_closes(self, tmp_path):
+        """Finalizing twice is safe and further appends are rejected"""
+        spool = AudioSpool(tmp_path / "audio.wav")
+        spool.append(b"\x01\x00" * 10)
+        first = spool.finalize()
+        assert spool.finalize() == first
+
+        with pytest.raises(ValueError):
+            spool.append(b"\x01\x00")
+
+    @pytest.mark.unit
+    def test_resume_continues_after_recorded_bytes(self, tmp_path):
+        """A reopened spool drops a torn tail and appends after the recorded data"""
+        spool = AudioSpool(tmp_path / "audio.wav")
+        spool.append(b"\x01\x00" * 100)
+        spool.flush()
+        # Crash halfway through the next write
+        spool._file.write(b"\x02\x00" * 7)
+        spool.detach()
+
+        resumed = AudioSpool(tmp_path / "audio.wav", resume_bytes=200, chunk_count=1)
+        assert resumed.append(b"\x03\x00" * 50) == 200
+        path = resumed.finalize()
+
+        with wave.open(str(path), 'rb') as wav_file:
+            samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+        assert samples.tolist() == [1] * 100 + [3] * 50
+        assert resumed.chunk_count == 2
@@ -0,0 +1,137 @@
+"""
+Tests for AudioStreamIngest - WebSocket audio frame ingest with backpressure
+"""
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.audio_stream_ingest import AudioStreamIngest
+from services.session_limits import RecordingLimitError
+
+
+class FakeRecordingService:
+    """Recording service stand-in that records chunks and can be slowed down"""
+
+    def __init__(self, delay: float = 0.0, fail_after: int = None):
+        self.chunks = []
+        self.delay = delay
+        self.fail_after = fail_after
+
+    async def process_audio_chunk(self, session_id, audio_data, sample_rate=16000, channels=1, sample_format='s16le'):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail_after is not None and len(self.chunks) >= self.fail_after:
+            return {'error': 'disk full'}
+        self.chunks.append(audio_data)
+        return {'session_id': session_id, 'status': 'stored', 'chunk_count': len(self.chunks)}
+
+
+class TestAudioStreamIngest:
+    """Test suite for the stream ingest pipeline"""
+
+    @pytest.mark.unit
+    def test_frames_written_in_order_with_acks(self):
+        """All frames reach the service in order and acks report progress"""
+        service = FakeRecordingService()
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def run():
+            ingest = AudioStreamIngest(service, "session-1", send, ack_every_chunks=3, ack_interval=60)
+            ingest.start()
+            for i in range(7):
+                await ingest.feed(bytes([i]) * 4)
+            return await ingest.close()
+
+        stats = asyncio.run(run())
+
+        assert service.chunks == [bytes([i]) * 4 for i in range(7)]
+        assert stats['chunks_written'] == 7
+        assert stats['bytes_written'] == 28
+        acks = [m for m in messages if m['type'] == 'ack']
+        assert [a['chunks_written'] for a in acks] == [3, 6]
+
+    @pytest.mark.unit
+    def test_queue_is_bounded(self):
+        """A slow writer never lets more than the queue limit pile up"""
+        service = FakeRecordingService(delay=0.01)
+        max_depth = []
+
+        async def send(message):
+            pass
+
+        async def run():
+            ingest = AudioStreamIngest(service, "session-1", send, max_queued_chunks=2)
+            ingest.start()
+            for _ in range(10):
+                await ingest.feed(b"\x00\x01")
+                max_depth.append(ingest.queue.qsize())
+            await ingest.close()
+
+        asyncio.run(run())
+
+        assert max(max_depth) <= 2
+        assert len(service.chunks) == 10
+
+    @pytest.mark.unit
+    def test_writer_error_stops_feed(self):
+        """Errors from the service are reported and reject further frames"""
+        service = FakeRecordingService(fail_after=1)
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def run():
+            ingest = AudioStreamIngest(service, "session-1", send, max_queued_chunks=1)
+            ingest.start()
+            with pytest.raises(RuntimeError):
+                for _ in range(10):
+                    await ingest.feed(b"\x00\x01")
+            return await ingest.close()
+
+        stats = asyncio.run(run())
+
+        assert stats['chunks_written'] == 1
+        assert any(m['type'] == 'error' and m['message'] == 'disk full' for m in messages)
+
+    @pytest.mark.unit
+    def test_throttled_frames_are_retried(self):
+        """429 from the service delays the frame instead of failing the stream; 413 ends it"""
+        service = FakeRecordingService()
+        refusals = [RecordingLimitError("busy", 429, retry_after=0.01)] * 2 + [None, RecordingLimitError("quota", 413)]
+        store = service.process_audio_chunk
+
+        async def limited(session_id, audio_data, **kwargs):
+            refusal = refusals.pop(0) if refusals else None
+            if refusal is not None:
+                raise refusal
+            return await store(session_id, audio_data, **kwargs)
+
+        service.process_audio_chunk = limited
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def run():
+            ingest = AudioStreamIngest(service, "session-1", send, ack_every_chunks=10, ack_interval=60)
+            ingest.start()
+            for i in range(3):
+                await ingest.feed(bytes([i]) * 4)
+            return await ingest.close()
+
+        stats = asyncio.run(run())
+
+        # The first frame waits out two refusals; the second hits the quota and stops the stream
+        assert service.chunks == [bytes([0]) * 4]
+        assert stats['chunks_written'] == 1
+        assert [m['type'] for m in messages] == ['throttled', 'throttled', 'error']
+        assert messages[-1]['code'] == 413
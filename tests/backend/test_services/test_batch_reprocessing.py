@@ -0,0 +1,182 @@
+"""
+Tests for batch reprocessing - session discovery, fingerprints, checkpoints and the worker pool
+"""
+import json
+import uuid
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+import services.batch_reprocessing as batch_module
+from services.audio_archive import ArchiveEncoder
+from services.audio_spool import AudioSpool
+from services.batch_reprocessing import (
+    BatchCheckpoint,
+    discover_sessions,
+    is_current,
+    processing_settings,
+    run_batch,
+    session_fingerprint
+)
+from services.session_store import FileSessionStore
+
+
+def _stored_session(storage_path: Path, seconds: float = 2.0) -> Path:
+    """A finished session as the recording service leaves it: FLAC archive plus transcription.json"""
+    session_id = str(uuid.uuid4())
+    session_dir = storage_path / session_id
+    session_dir.mkdir(parents=True)
+    encoder = ArchiveEncoder(session_dir / "complete_audio", 'flac')
+    encoder.write(np.zeros(int(seconds * 16000), dtype='<i2').tobytes())
+    encoder.close()
+    with open(session_dir / "transcription.json", 'w') as f:
+        json.dump({
+            'session_id': session_id,
+            'project_id': 'project-1',
+            'session_name': 'Stored',
+            'started_at': '2024-01-01T10:00:00',
+            'ended_at': '2024-01-01T10:30:00',
+            'participants': [{'id': 'SPEAKER_00', 'name': 'Ana'}, {'id': 'SPEAKER_01', 'name': 'Luis'}],
+            'utterances': [],
+            'processing_mode': 'per_segment'
+        }, f)
+    return session_dir
+
+
+class TestBatchReprocessing:
+    """Test suite for batch reprocessing"""
+
+    @pytest.mark.unit
+    def test_discovers_only_sessions_with_recordings(self, tmp_path):
+        first, second = _stored_session(tmp_path), _stored_session(tmp_path)
+        (tmp_path / "empty").mkdir()
+
+        assert discover_sessions(tmp_path) == sorted([first, second])
+        assert discover_sessions(tmp_path, [second.name, "missing"]) == [second]
+
+    @pytest.mark.unit
+    def test_skips_live_and_unfinalized_sessions(self, tmp_path):
+        """A session still in the session store is recording; its spool must not be touched"""
+        finished = _stored_session(tmp_path)
+        live = tmp_path / "live"
+        live.mkdir()
+        spool = AudioSpool(live / "complete_audio.wav", sample_rate=16000)
+        spool.append(np.zeros(16000, dtype='<i2').tobytes())
+        spool.finalize()
+        FileSessionStore(tmp_path).create({'session_id': live.name, 'status': 'active'})
+        unfinished = _stored_session(tmp_path)
+        (unfinished / "transcription.json").unlink()
+
+        assert discover_sessions(tmp_path) == [finished]
+
+        report = run_batch(tmp_path, workers=1, force=True)
+        assert report['sessions_total'] == 1
+        assert (live / "complete_audio.wav").exists()
+
+    @pytest.mark.unit
+    def test_keeps_a_working_copy_it_did_not_create(self, tmp_path):
+        session_dir = _stored_session(tmp_path)
+        working_copy = session_dir / "complete_audio.wav"
+        spool = AudioSpool(working_copy, sample_rate=16000)
+        spool.append(np.zeros(32000, dtype='<i2').tobytes())
+        spool.finalize()
+
+        assert run_batch(tmp_path, workers=1)['sessions_completed'] == 1
+        assert working_copy.exists()
+
+    @pytest.mark.unit
+    def test_fingerprint_tracks_settings_and_recording(self, tmp_path):
+        session_dir = _stored_session(tmp_path)
+        settings = processing_settings()
+
+        fingerprint = session_fingerprint(session_dir, settings)
+        assert fingerprint == session_fingerprint(session_dir, processing_settings())
+        assert fingerprint != session_fingerprint(session_dir, processing_settings('transcribe_once'))
+
+        with open(session_dir / "complete_audio.flac", 'ab') as f:
+            f.write(b'\x00')
+        assert fingerprint != session_fingerprint(session_dir, settings)
+
+    @pytest.mark.unit
+    def test_reprocesses_then_skips_current_sessions(self, tmp_path):
+        """Outputs are rewritten with the fingerprint, so an unchanged second run does nothing"""
+        session_dir = _stored_session(tmp_path)
+
+        report = run_batch(tmp_path, workers=1)
+
+        assert report['sessions_completed'] == 1
+        assert report['audio_seconds'] == pytest.approx(2.0)
+        assert report['realtime_factor'] > 0
+        transcription = json.loads((session_dir / "transcription.json").read_text())
+        assert is_current(session_dir, transcription['processing_fingerprint'])
+        assert transcription['participants'][0]['name'] == 'Ana'
+        assert transcription['started_at'] == '2024-01-01T10:00:00'
+        # The decoded working copy is released again
+        assert not (session_dir / "complete_audio.wav").exists()
+        assert json.loads((tmp_path / "reprocess_report.json").read_text())['sessions_completed'] == 1
+
+        second = run_batch(tmp_path, workers=1)
+        assert (second['sessions_completed'], second['sessions_skipped']) == (0, 1)
+
+        forced = run_batch(tmp_path, workers=1, force=True)
+        assert forced['sessions_completed'] == 1
+
+    @pytest.mark.unit
+    def test_resumes_from_checkpoint(self, tmp_path, monkeypatch):
+        """Sessions checkpointed as completed by an interrupted run are not processed again"""
+        done, pending = _stored_session(tmp_path), _stored_session(tmp_path)
+        checkpoint = BatchCheckpoint(tmp_path / batch_module.CHECKPOINT_NAME)
+        checkpoint.record({
+            'session_id': done.name,
+            'status': 'completed',
+            'fingerprint': session_fingerprint(done, processing_settings())
+        })
+        # Torn line from a crash mid-write
+        with open(checkpoint.path, 'a') as f:
+            f.write('{"session_id": "')
+
+        processed = []
+
+        def fake_reprocess_one(session_dir, processing_mode, fingerprint):
+            processed.append(Path(session_dir).name)
+            return {
+                'session_id': Path(session_dir).name, 'fingerprint': fingerprint, 'status': 'completed',
+                'audio_seconds': 2.0, 'elapsed_seconds': 0.1
+            }
+
+        monkeypatch.setattr(batch_module, 'reprocess_one', fake_reprocess_one)
+
+        report = run_batch(tmp_path, workers=1)
+
+        assert processed == [pending.name]
+        assert (report['sessions_completed'], report['sessions_skipped']) == (1, 1)
+        assert BatchCheckpoint(checkpoint.path).is_done(pending.name, session_fingerprint(pending, processing_settings()))
+
+    @pytest.mark.unit
+    def test_failed_session_does_not_stop_the_batch(self, tmp_path):
+        good = _stored_session(tmp_path)
+        broken = _stored_session(tmp_path)
+        (broken / "complete_audio.flac").write_bytes(b'not flac')
+
+        report = run_batch(tmp_path, workers=1)
+
+        statuses = {entry['session_id']: entry['status'] for entry in report['sessions']}
+        assert statuses == {good.name: 'completed', broken.name: 'failed'}
+        # Failures are retried on the next run
+        assert not BatchCheckpoint(tmp_path / batch_module.CHECKPOINT_NAME).is_done(broken.name, session_fingerprint(broken, processing_settings()))
+
+    @pytest.mark.integration
+    def test_process_pool(self, tmp_path):
+        sessions = [_stored_session(tmp_path) for _ in range(3)]
+
+        report = run_batch(tmp_path, workers=2)
+
+        assert report['sessions_completed'] == 3
+        for session_dir in sessions:
+            assert 'processing_fingerprint' in json.loads((session_dir / "transcription.json").read_text())
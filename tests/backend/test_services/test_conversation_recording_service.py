@@ -0,0 +1,538 @@
+"""
+Tests for ConversationRecordingService - session lifecycle and processing modes
+"""
+import json
+import time
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import openai
+import soundfile as sf
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+import services.conversation_recording_service as recording_module
+import services.session_limits as limits_module
+from services.conversation_recording_service import (
+    ConversationRecordingService,
+    PROCESSING_MODE_TRANSCRIBE_ONCE
+)
+from services.processing_jobs import ProcessingProgress
+from services.session_limits import RecordingLimitError, SessionReaper
+
+
+class FakeDiarization:
+    """Minimal pyannote-style annotation exposing itertracks()"""
+
+    def __init__(self, turns):
+        self.turns = turns
+
+    def itertracks(self, yield_label=False):
+        for start, end, speaker in self.turns:
+            yield SimpleNamespace(start=start, end=end), None, speaker
+
+
+class FakeWhisperClient:
+    """Async Whisper stand-in tracking concurrency, with optional rate limiting and fixed words"""
+
+    def __init__(self, rate_limited_calls: int = 0, words: str = ""):
+        self.words = words.split()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.rate_limited_calls = rate_limited_calls
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, file, response_format, timestamp_granularities=None):
+        self.calls += 1
+        if self.calls <= self.rate_limited_calls:
+            response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com"))
+            raise openai.RateLimitError("rate limited", response=response, body=None)
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        filename, audio = file
+        # Longer clips take longer, so completion order differs from request order
+        await asyncio.sleep(0.05 if len(audio) < 40000 else 0.01)
+        self.in_flight -= 1
+        if self.words:
+            # One word every 0.2s from the start of the upload
+            words = [SimpleNamespace(word=word, start=i * 0.2, end=i * 0.2 + 0.15) for i, word in enumerate(self.words)]
+            return SimpleNamespace(text=' '.join(self.words), segments=[], words=words)
+        return SimpleNamespace(text=f"{len(audio)} bytes", segments=[])
+
+
+class FakeDatabase:
+    """Records the sessions the service persists"""
+
+    def __init__(self):
+        self.saved = []
+
+    def save_conversation_session(self, session, utterances):
+        self.saved.append((session['session_id'], list(utterances)))
+        return True
+
+
+@pytest.fixture
+def recording_service(tmp_path):
+    """Recording service writing into a temporary directory"""
+    return ConversationRecordingService(storage_path=str(tmp_path / "recordings"))
+
+
+def _one_second_of_audio() -> bytes:
+    return np.zeros(16000, dtype=np.int16).tobytes()
+
+
+class TestConversationRecordingService:
+    """Test suite for the recording service"""
+
+    @pytest.mark.unit
+    def test_unknown_processing_mode_rejected(self, recording_service):
+        """Sessions only accept known processing modes"""
+        with pytest.raises(ValueError):
+            asyncio.run(recording_service.start_recording_session(
+                project_id="project-1", session_name="Test", processing_mode="bogus"
+            ))
+
+    @pytest.mark.unit
+    def test_transcribe_once_runs_stages_concurrently(self, recording_service):
+        """Diarization and ASR overlap in time and meet at alignment"""
+        both_started = asyncio.Event()
+        started = []
+
+        async def fake_diarization(audio_file_path, progress=None, num_speakers=None):
+            started.append('diarization')
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return FakeDiarization([(0.0, 4.0, 'SPEAKER_00'), (4.0, 10.0, 'SPEAKER_01')])
+
+        async def fake_transcription(audio_file_path, progress=None):
+            started.append('asr')
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return [
+                {'start': 0.5, 'end': 3.5, 'text': 'Where were you born?'},
+                {'start': 3.8, 'end': 9.0, 'text': 'In a small village in Jalisco.'},
+            ]
+
+        recording_service._process_speaker_diarization = fake_diarization
+        recording_service._transcribe_full_audio = fake_transcription
+
+        progress = ProcessingProgress()
+
+        async def run():
+            session_id = await recording_service.start_recording_session(
+                project_id="project-1",
+                session_name="Test",
+                processing_mode=PROCESSING_MODE_TRANSCRIBE_ONCE
+            )
+            for _ in range(10):
+                await recording_service.process_audio_chunk(session_id, _one_second_of_audio())
+            return await recording_service.process_complete_audio(session_id, progress)
+
+        result = asyncio.run(run())
+
+        assert sorted(started) == ['asr', 'diarization']
+        assert sorted(progress.durations()) == ['alignment', 'diarization', 'save_audio', 'transcription', 'vad']
+        speakers = [u['speaker_id'] for u in result['utterances']]
+        assert speakers == ['SPEAKER_00', 'SPEAKER_01']
+        assert result['utterances'][1]['text'] == 'In a small village in Jalisco.'
+
+    @pytest.mark.unit
+    def test_segments_transcribed_concurrently_in_order(self, recording_service, tmp_path):
+        """Segments share one client, respect the limit and keep diarization order"""
+        client = FakeWhisperClient()
+        limit = asyncio.Semaphore(2)
+        recording_service._get_transcription_client = lambda: (client, limit)
+
+        audio_path = tmp_path / "audio.wav"
+        sf.write(audio_path, np.zeros(16000 * 10, dtype=np.int16), 16000, subtype='PCM_16')
+        turns = [(0.0, 0.5, 'SPEAKER_00'), (1.0, 4.0, 'SPEAKER_01'), (4.0, 4.5, 'SPEAKER_00'), (5.0, 9.0, 'SPEAKER_01')]
+        session = {'participants': []}
+
+        utterances = asyncio.run(recording_service._transcribe_speaker_segments(
+            str(audio_path), FakeDiarization(turns), session
+        ))
+
+        assert [u['speaker_id'] for u in utterances] == [t[2] for t in turns]
+        # 0.1s padding on each side of every segment
+        expected = [int(round((end - start + 0.2) * 16000)) * 2 + 44 for start, end, _ in turns]
+        expected[0] = int(round(0.6 * 16000)) * 2 + 44  # clamped at the start of the file
+        assert [u['text'] for u in utterances] == [f"{n} bytes" for n in expected]
+        assert client.max_in_flight == 2
+
+    @pytest.mark.unit
+    def test_rate_limited_requests_are_retried(self, recording_service, tmp_path, monkeypatch):
+        """429 responses back off and retry instead of failing the segment"""
+        monkeypatch.setattr(recording_module, 'TRANSCRIPTION_BACKOFF_BASE', 0.001)
+        client = FakeWhisperClient(rate_limited_calls=2)
+        limit = asyncio.Semaphore(1)
+        recording_service._get_transcription_client = lambda: (client, limit)
+
+        audio_path = tmp_path / "audio.wav"
+        sf.write(audio_path, np.zeros(16000, dtype=np.int16), 16000, subtype='PCM_16')
+
+        utterances = asyncio.run(recording_service._transcribe_speaker_segments(
+            str(audio_path), FakeDiarization([(0.0, 0.5, 'SPEAKER_00')]), {'participants': []}
+        ))
+
+        assert client.calls == 3
+        assert utterances[0]['text'].endswith("bytes")
+
+    @pytest.mark.unit
+    def test_identical_audio_served_from_result_cache(self, recording_service, tmp_path):
+        """A rerun over byte-identical audio uploads nothing to Whisper"""
+        client = FakeWhisperClient()
+        recording_service._get_transcription_client = lambda: (client, asyncio.Semaphore(2))
+
+        audio_path = tmp_path / "audio.wav"
+        sf.write(audio_path, np.zeros(16000 * 4, dtype=np.int16), 16000, subtype='PCM_16')
+        diarization = FakeDiarization([(0.0, 1.5, 'SPEAKER_00'), (2.0, 3.5, 'SPEAKER_01')])
+
+        first = asyncio.run(recording_service._transcribe_speaker_segments(str(audio_path), diarization, {'participants': []}))
+        copy_path = tmp_path / "copy.wav"
+        copy_path.write_bytes(audio_path.read_bytes())
+        second = asyncio.run(recording_service._transcribe_speaker_segments(str(copy_path), diarization, {'participants': []}))
+
+        assert client.calls == 2
+        assert [u['text'] for u in second] == [u['text'] for u in first]
+
+    @pytest.mark.unit
+    def test_silence_trimmed_and_times_mapped_back(self, recording_service):
+        """Diarization sees only speech; utterance times are on the original recording"""
+        t = np.arange(5 * 16000) / 16000
+        speech = (3000 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))).astype(np.int16)
+        silence = lambda seconds: np.zeros(int(seconds * 16000), dtype=np.int16)
+        audio = np.concatenate([silence(30), speech, silence(40), speech, silence(5)])
+        seen = {}
+
+        async def fake_diarization(audio_file_path, progress=None, num_speakers=None):
+            seen['path'] = audio_file_path
+            seen['duration'] = sf.info(audio_file_path).duration
+            # Turns on the speech-only timeline: regions are 29.8-35.2s and 74.8-80.2s
+            return FakeDiarization([(0.2, 5.2, 'SPEAKER_00'), (5.7, 10.7, 'SPEAKER_01')])
+
+        recording_service._process_speaker_diarization = fake_diarization
+        recording_service._get_transcription_client = lambda: (FakeWhisperClient(), asyncio.Semaphore(2))
+
+        async def run():
+            session_id = await recording_service.start_recording_session(project_id="project-1", session_name="Test")
+            await recording_service.process_audio_chunk(session_id, audio.tobytes())
+            result = await recording_service.process_complete_audio(session_id)
+            return result, recording_service.active_sessions[session_id]
+
+        result, session = asyncio.run(run())
+
+        assert Path(seen['path']).name == "speech_only.wav"
+        assert not Path(seen['path']).exists()
+        assert seen['duration'] == pytest.approx(10.8, abs=0.05)
+        np.testing.assert_allclose(session['speech_regions'], [(29.8, 35.2), (74.8, 80.2)], atol=0.05)
+
+        first, second = result['utterances']
+        assert (first['start_time'], first['end_time']) == ("00:30", "00:35")
+        assert (second['start_time'], second['end_time']) == ("01:15", "01:20")
+        assert second['duration'] == pytest.approx(5000, abs=50)
+        assert second['start_ms'] == pytest.approx(75000, abs=150)
+        assert second['duration'] == second['end_ms'] - second['start_ms']
+        # Segment offsets are on the original recording too
+        assert first['start_sample'] == pytest.approx(30.0 * 16000, abs=800)
+        assert 'byte_start' not in first
+        assert session['segment_index'].segments[second['id']] == (second['start_sample'], second['end_sample'])
+        assert second['audio_segment_path'].endswith(f"/utterances/{second['id']}/audio")
+
+    @pytest.mark.unit
+    def test_raw_pcm_normalized_on_ingest(self, recording_service):
+        """44.1 kHz stereo chunks land in the spool as 16 kHz mono; format changes are rejected"""
+        stereo = np.zeros((44100, 2), dtype=np.int16).tobytes()
+
+        async def run():
+            session_id = await recording_service.start_recording_session(project_id="project-1", session_name="Test")
+            for _ in range(3):
+                await recording_service.process_audio_chunk(session_id, stereo, sample_rate=44100, channels=2)
+            changed = await recording_service.process_audio_chunk(session_id, stereo, sample_rate=48000, channels=2)
+            session = recording_service.active_sessions[session_id]
+            path = await recording_service._save_complete_audio(session)
+            return changed, path
+
+        changed, path = asyncio.run(run())
+
+        assert 'error' in changed
+        info = sf.info(path)
+        assert (info.samplerate, info.channels, info.frames) == (16000, 1, 48000)
+
+    @pytest.mark.unit
+    def test_archive_kept_and_working_copy_released(self, recording_service):
+        """Ending a session leaves only the FLAC archive next to the transcription"""
+        async def fake_diarization(audio_file_path, progress=None, num_speakers=None):
+            return FakeDiarization([])
+
+        recording_service._process_speaker_diarization = fake_diarization
+
+        async def run():
+            session_id = await recording_service.start_recording_session(project_id="project-1", session_name="Test")
+            for _ in range(3):
+                await recording_service.process_audio_chunk(session_id, _one_second_of_audio())
+            return await recording_service.end_recording_session(session_id)
+
+        result = asyncio.run(run())
+
+        session_dir = Path(result['transcription_file_path']).parent
+        assert sorted(p.name for p in session_dir.iterdir()) == ['complete_audio.flac', 'segment_index.json', 'transcription.json']
+        assert result['audio_file_path'].endswith("complete_audio.flac")
+        assert sf.info(result['audio_file_path']).frames == 48000
+
+    @pytest.mark.unit
+    def test_processed_session_persisted_and_listed(self, recording_service, monkeypatch):
+        """Ending a session bulk-saves its utterances; transcription.json backs the listing without a database"""
+        monkeypatch.setattr(recording_module, 'VAD_ENABLED', False)
+        database = FakeDatabase()
+        recording_service.database = database
+        recording_service._get_transcription_client = lambda: (FakeWhisperClient(), asyncio.Semaphore(2))
+
+        async def fake_diarization(audio_file_path, progress=None, num_speakers=None):
+            return FakeDiarization([(0.0, 1.0, 'SPEAKER_00'), (1.5, 2.75, 'SPEAKER_01')])
+
+        recording_service._process_speaker_diarization = fake_diarization
+
+        async def run():
+            session_id = await recording_service.start_recording_session(project_id="project-1", session_name="Test")
+            for _ in range(3):
+                await recording_service.process_audio_chunk(session_id, _one_second_of_audio())
+            return await recording_service.end_recording_session(session_id)
+
+        result = asyncio.run(run())
+
+        assert [(session_id, len(utterances)) for session_id, utterances in database.saved] == [(result['session_id'], 2)]
+        sessions = recording_service.list_saved_sessions("project-1")
+        assert [(s['id'], s['utterance_count'], s['duration']) for s in sessions] == [(result['session_id'], 2, 2750)]
+        assert recording_service.list_saved_sessions("project-2") == []
+        assert recording_service.load_saved_transcription(result['session_id'])['utterances'][1]['speaker_id'] == 'SPEAKER_01'
+        index = recording_service.turn_index(result['session_id'])
+        assert (index.speaker_at(500), index.speaker_at(1200), index.speaker_at(2000)) == ('SPEAKER_00', None, 'SPEAKER_01')
+        assert recording_service.turn_index(result['session_id']) is index
+
+    @pytest.mark.unit
+    def test_word_timestamps_saved_and_searchable(self, recording_service, monkeypatch):
+        """Whisper word times land on the recording timeline and a project search finds them"""
+        monkeypatch.setattr(recording_module, 'VAD_ENABLED', False)
+        client = FakeWhisperClient(words="The day we arrived in California,")
+        recording_service._get_transcription_client = lambda: (client, asyncio.Semaphore(2))
+
+        async def fake_diarization(audio_file_path, progress=None, num_speakers=None):
+            return FakeDiarization([(0.0, 1.2, 'SPEAKER_00'), (1.5, 2.75, 'SPEAKER_01')])
+
+        recording_service._process_speaker_diarization = fake_diarization
+
+        async def run():
+            session_id = await recording_service.start_recording_session(project_id="project-1", session_name="Test")
+            for _ in range(3):
+                await recording_service.process_audio_chunk(session_id, _one_second_of_audio())
+            return await recording_service.end_recording_session(session_id)
+
+        result = asyncio.run(run())
+
+        hits = recording_service.search_words("project-1", "arrived in california")
+        # "arrived" is the fourth word; the second upload starts 0.1s before its turn
+        assert [(h['match'], h['start_ms'], h['end_ms'], h['speaker_id']) for h in hits] == [
+            ('phrase', 600, 1150, 'SPEAKER_00'), ('phrase', 2000, 2550, 'SPEAKER_01')
+        ]
+        assert hits[1]['utterance_id'] == result['utterances'][1]['id']
+        assert "we arrived in California," in hits[0]['text']
+        assert recording_service.search_words("project-2", "arrived in california") == []
+        assert recording_service.word_index("project-1") is recording_service.word_index("project-1")
+        assert 'utterance_words' not in recording_service.load_saved_transcription(result['session_id'])['utterances'][0]
+
+    @pytest.mark.unit
+    def test_live_transcript_merged_at_end(self, recording_service, monkeypatch):
+        """A live session finalizes by aligning its live segments with diarization; nothing is re-uploaded"""
+        monkeypatch.setattr(recording_module, 'VAD_ENABLED', False)
+        client = FakeWhisperClient()
+        recording_service._get_transcription_client = lambda: (client, asyncio.Semaphore(2))
+        windows = []
+
+        async def fake_live_window(audio_file_path, start, end):
+            windows.append((start, end))
+            lines = [(0.2, 0.9, "Where were you born?"), (1.4, 2.8, "In a small town near Guadalajara.")]
+            return [
+                {'start': a, 'end': b, 'text': text, 'confidence': '-0.1'}
+                for a, b, text in lines if start <= a and b <= end
+            ]
+
+        async def fake_diarization(audio_file_path, progress=None, num_speakers=None):
+            return FakeDiarization([(0.0, 1.2, 'SPEAKER_00'), (1.2, 3.0, 'SPEAKER_01')])
+
+        recording_service._transcribe_live_window = fake_live_window
+        recording_service._process_speaker_diarization = fake_diarization
+
+        async def run():
+            session_id = await recording_service.start_recording_session(
+                project_id="project-1", session_name="Test", live_transcription=True
+            )
+            live = recording_service.live_transcriber(session_id)
+            events = live.subscribe()
+            for _ in range(3):
+                await recording_service.process_audio_chunk(session_id, _one_second_of_audio())
+            await live.tick()
+            result = await recording_service.end_recording_session(session_id)
+            received = []
+            while not events.empty():
+                received.append(events.get_nowait()['event'])
+            return session_id, result, received
+
+        session_id, result, received = asyncio.run(run())
+
+        assert [(u['speaker_id'], u['text']) for u in result['utterances']] == [
+            ('SPEAKER_00', "Where were you born?"), ('SPEAKER_01', "In a small town near Guadalajara.")
+        ]
+        assert client.calls == 0
+        assert windows[0] == (0.0, 3.0)
+        assert received[0] == 'snapshot' and 'final' in received and received[-1] == 'done'
+        assert recording_service.live_transcriber(session_id) is None
+
+    @pytest.mark.unit
+    def test_any_worker_accepts_chunks(self, tmp_path):
+        """Two services on one storage path (two workers) build a single recording and archive"""
+        storage_path = str(tmp_path / "recordings")
+        first = ConversationRecordingService(storage_path=storage_path)
+        second = ConversationRecordingService(storage_path=storage_path)
+
+        async def run():
+            session_id = await first.start_recording_session(project_id="project-1", session_name="Test")
+            for service in (first, second, first, second):
+                result = await service.process_audio_chunk(session_id, _one_second_of_audio())
+                assert 'error' not in result
+            return await second.end_recording_session(session_id)
+
+        result = asyncio.run(run())
+
+        assert result['status'] == 'completed'
+        assert sf.info(result['audio_file_path']).frames == 64000
+        assert not second.has_session(result['session_id'])
+        assert not first.has_session(result['session_id'])
+        # The first worker lets go of its stale handles on its next session
+        asyncio.run(first.start_recording_session(project_id="project-1", session_name="Next"))
+        assert result['session_id'] not in first.active_sessions
+
+    @pytest.mark.unit
+    def test_session_resumed_after_restart(self, tmp_path):
+        """A new process picks up an interrupted session where the store says it stopped"""
+        storage_path = str(tmp_path / "recordings")
+        crashed = ConversationRecordingService(storage_path=storage_path)
+
+        async def record():
+            session_id = await crashed.start_recording_session(project_id="project-1", session_name="Test")
+            for _ in range(2):
+                await crashed.process_audio_chunk(session_id, _one_second_of_audio())
+            return session_id
+
+        session_id = asyncio.run(record())
+        # Handles die with the process; only the store and the spool on disk remain
+        crashed.active_sessions[session_id]['audio_spool'].detach()
+
+        restarted = ConversationRecordingService(storage_path=storage_path)
+        assert restarted.has_session(session_id)
+
+        async def resume():
+            result = await restarted.process_audio_chunk(session_id, _one_second_of_audio())
+            assert result['chunk_count'] == 3
+            return await restarted.end_recording_session(session_id)
+
+        result = asyncio.run(resume())
+
+        assert sf.info(result['audio_file_path']).frames == 48000
+        session_dir = Path(result['transcription_file_path']).parent
+        assert sorted(p.name for p in session_dir.iterdir()) == ['complete_audio.flac', 'segment_index.json', 'transcription.json']
+
+    @pytest.mark.unit
+    def test_session_quota_refuses_chunks(self, recording_service, monkeypatch):
+        """Once a session holds its byte quota, further chunks get a 413"""
+        monkeypatch.setattr(limits_module, 'RECORDING_MAX_SESSION_BYTES', 32000)
+
+        async def run():
+            session_id = await recording_service.start_recording_session(project_id="project-1", session_name="Test")
+            await recording_service.process_audio_chunk(session_id, _one_second_of_audio())
+            await recording_service.process_audio_chunk(session_id, _one_second_of_audio())
+
+        with pytest.raises(RecordingLimitError) as refused:
+            asyncio.run(run())
+        assert refused.value.status_code == 413
+
+    @pytest.mark.unit
+    def test_global_ceilings_throttle(self, recording_service, monkeypatch):
+        """Too many sessions or too much buffered audio answer 429 with a retry delay"""
+        monkeypatch.setattr(recording_module, 'RECORDING_MAX_ACTIVE_SESSIONS', 1)
+        monkeypatch.setattr(recording_module, 'RECORDING_MAX_BUFFERED_BYTES', 16000)
+
+        session_id = asyncio.run(recording_service.start_recording_session(project_id="project-1", session_name="Test"))
+
+        with pytest.raises(RecordingLimitError) as too_many:
+            asyncio.run(recording_service.start_recording_session(project_id="project-1", session_name="Second"))
+        with pytest.raises(RecordingLimitError) as too_large:
+            asyncio.run(recording_service.process_audio_chunk(session_id, _one_second_of_audio()))
+
+        assert (too_many.value.status_code, too_large.value.status_code) == (429, 429)
+        assert too_large.value.headers == {'Retry-After': '1'}
+
+    @pytest.mark.unit
+    def test_idle_session_finalized_by_reaper(self, recording_service):
+        """An abandoned session is processed and saved, not dropped"""
+        finalized = []
+        reaper = SessionReaper(recording_service, finalized.append)
+
+        async def record():
+            session_id = await recording_service.start_recording_session(project_id="project-1", session_name="Test")
+            await recording_service.process_audio_chunk(session_id, _one_second_of_audio())
+            return session_id
+
+        session_id = asyncio.run(record())
+
+        assert reaper.reap_once() == []
+        later = time.time() + limits_module.RECORDING_IDLE_TTL_SECONDS + 1
+        assert reaper.reap_once(later) == [(session_id, 'idle')]
+        assert reaper.reap_once(later) == []
+        assert finalized == [session_id]
+
+        with pytest.raises(RecordingLimitError) as gone:
+            asyncio.run(recording_service.process_audio_chunk(session_id, _one_second_of_audio()))
+        assert gone.value.status_code == 410
+
+        result = asyncio.run(recording_service.end_recording_session(session_id))
+        transcription = json.loads(Path(result['transcription_file_path']).read_text())
+        assert transcription['expired_reason'] == 'idle'
+        assert sf.info(result['audio_file_path']).frames == 16000
+
+    @pytest.mark.unit
+    def test_fallback_diarization_uses_participant_count(self, recording_service, monkeypatch):
+        """Without pyannote the CPU diarizer runs with the participant count as its hint"""
+        calls = []
+
+        def fake_diarize_file(audio_file_path, num_speakers=None):
+            calls.append(num_speakers)
+            return recording_module.FallbackDiarization([(0.0, 1.5, 'SPEAKER_00'), (1.5, 3.0, 'SPEAKER_01')])
+
+        monkeypatch.setattr(recording_module, 'diarize_file', fake_diarize_file)
+        recording_service.diarization_pool = SimpleNamespace(available=False)
+
+        async def run():
+            session_id = await recording_service.start_recording_session(
+                project_id="project-1",
+                session_name="Test",
+                participants=[{'id': 'SPEAKER_00', 'name': 'Ana'}, {'id': 'SPEAKER_01', 'name': 'Luis'}, {'id': 'SPEAKER_02', 'name': 'Eva'}]
+            )
+            for _ in range(3):
+                await recording_service.process_audio_chunk(session_id, _one_second_of_audio())
+            return await recording_service.process_complete_audio(session_id)
+
+        result = asyncio.run(run())
+
+        assert calls == [3]
+        assert [u['speaker_name'] for u in result['utterances']] == ['Ana', 'Luis']
@@ -0,0 +1,77 @@
+"""
+Tests for DiarizationPool - process-pool offload of speaker diarization
+"""
+import pytest
+import time
+import asyncio
+import contextlib
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+import services.diarization_pool as pool_module
+from services.diarization_pool import DiarizationPool
+
+
+class SlowFakePipeline:
+    """Blocking stand-in for the PyAnnote pipeline"""
+
+    def __call__(self, audio_file_path, hook=None):
+        time.sleep(0.3)
+        return [(0.0, 1.0, f"SPEAKER_00:{audio_file_path}")]
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    """Install a warm fake pipeline that forked workers inherit"""
+    monkeypatch.setattr(pool_module, '_pipeline', SlowFakePipeline())
+    monkeypatch.setattr(pool_module, 'ProgressHook', contextlib.nullcontext, raising=False)
+    monkeypatch.setattr(pool_module, 'DIARIZATION_START_METHOD', 'fork')
+
+
+class TestDiarizationPool:
+    """Test suite for diarization offload"""
+
+    @pytest.mark.unit
+    def test_torch_threads_split_across_workers(self):
+        """By default each worker gets an even share of the cores"""
+        pool = DiarizationPool(workers=2, torch_threads=0)
+        assert pool.torch_threads >= 1
+        assert DiarizationPool(workers=2, torch_threads=3).torch_threads == 3
+
+    @pytest.mark.unit
+    def test_event_loop_stays_responsive(self, fake_pipeline):
+        """Diarization runs in workers in parallel while the loop keeps ticking"""
+        pool = DiarizationPool(workers=2, torch_threads=1)
+        ticks = []
+
+        async def ticker(stop):
+            while not stop.is_set():
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            # Warm the workers so process start-up is not timed
+            await asyncio.gather(pool.diarize("warm-a"), pool.diarize("warm-b"))
+
+            stop = asyncio.Event()
+            tick_task = asyncio.create_task(ticker(stop))
+            start = time.perf_counter()
+            results = await asyncio.gather(pool.diarize("a.wav"), pool.diarize("b.wav"))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await tick_task
+            return results, elapsed
+
+        try:
+            results, elapsed = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        assert results == [[(0.0, 1.0, "SPEAKER_00:a.wav")], [(0.0, 1.0, "SPEAKER_00:b.wav")]]
+        # Two 0.3s jobs on two workers overlap instead of taking 0.6s
+        assert elapsed < 0.55
+        assert len(ticks) >= 10
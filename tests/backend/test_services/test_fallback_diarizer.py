@@ -0,0 +1,166 @@
+"""
+Tests for the fallback diarizer - NumPy MFCC features and k-means speaker clustering
+"""
+import pytest
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+import services.fallback_diarizer as fallback_diarizer
+from services.fallback_diarizer import (
+    N_MFCC,
+    diarize_file,
+    file_mfcc,
+    mfcc,
+    silhouette,
+    smooth_labels,
+    squared_distances,
+    turns_from_windows,
+    window_spans
+)
+
+
+def _voice(seconds: float, f0: float, formants, seed: int) -> np.ndarray:
+    """Harmonic "voice" with a speaker-specific pitch and formant shape"""
+    t = np.arange(int(seconds * 16000)) / 16000
+    phase = 2 * np.pi * np.cumsum(f0 * (1 + 0.03 * np.sin(2 * np.pi * 5 * t))) / 16000
+    signal = np.zeros_like(t)
+    for harmonic in range(1, int(3800 // f0)):
+        gain = sum(np.exp(-((harmonic * f0 - formant) / 120.0) ** 2) for formant in formants) + 0.02
+        signal += gain * np.sin(harmonic * phase)
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 3 * t + seed)
+    noise = 0.002 * np.random.default_rng(seed).standard_normal(len(t))
+    return signal * envelope / np.abs(signal).max() * 0.3 + noise
+
+
+def _conversation(tmp_path: Path):
+    """Alternating speakers, some turns separated by a pause and some back to back"""
+    parts, truth, position = [np.zeros(2 * 16000)], [], 2.0
+    for index in range(8):
+        speaker = index % 2
+        seconds = 3.0 + index % 3
+        if speaker == 0:
+            parts.append(_voice(seconds, 110, (700, 1200, 2600), index))
+        else:
+            parts.append(_voice(seconds, 210, (400, 2000, 2900), index))
+        truth.append((position, position + seconds, speaker))
+        position += seconds
+        pause = 1.0 if index % 3 else 0.0
+        parts.append(np.zeros(int(pause * 16000)))
+        position += pause
+
+    parts.append(np.zeros(2 * 16000))
+
+    path = tmp_path / "conversation.wav"
+    sf.write(path, (np.concatenate(parts) * 32767).astype(np.int16), 16000, subtype='PCM_16')
+    return path, truth
+
+
+def _frame_accuracy(diarization, truth) -> float:
+    """Share of reference speech frames whose speaker matches (best label permutation of two)"""
+    grid = np.arange(0, truth[-1][1], 0.01)
+    reference = np.full(len(grid), -1)
+    for start, end, speaker in truth:
+        reference[(grid >= start) & (grid < end)] = speaker
+    hypothesis = np.full(len(grid), -1)
+    for segment, _, label in diarization.itertracks(yield_label=True):
+        hypothesis[(grid >= segment.start) & (grid < segment.end)] = int(label[-2:])
+
+    speech = reference >= 0
+    matches = hypothesis[speech] == reference[speech]
+    swapped = hypothesis[speech] == 1 - reference[speech]
+    return max(matches.mean(), swapped.mean())
+
+
+class TestFallbackDiarizer:
+    """Test suite for the CPU fallback diarizer"""
+
+    @pytest.mark.unit
+    def test_mfcc_frames(self):
+        """25 ms frames every 10 ms"""
+        features = mfcc(np.random.default_rng(0).standard_normal(16000).astype(np.float32), 16000)
+        assert features.shape == (98, N_MFCC)
+        assert np.all(np.isfinite(features))
+
+    @pytest.mark.unit
+    def test_blockwise_features_match_whole_file(self, tmp_path, monkeypatch):
+        """Reading in blocks gives the same frames as one pass over the whole signal"""
+        samples = (np.random.default_rng(1).standard_normal(16000 * 5) * 3000).astype(np.int16)
+        sf.write(tmp_path / "noise.wav", samples, 16000, subtype='PCM_16')
+        monkeypatch.setattr(fallback_diarizer, 'FEATURE_BLOCK_SECONDS', 2)
+
+        blocked, _ = file_mfcc(tmp_path / "noise.wav")
+        whole = mfcc(samples.astype(np.float32) / 32768.0, 16000)
+
+        assert blocked.shape == whole.shape
+        np.testing.assert_allclose(blocked, whole, rtol=1e-4, atol=1e-3)
+
+    @pytest.mark.unit
+    def test_silhouette_matches_direct_distances(self):
+        """The Gram-matrix distances give the same scores as pairwise differences"""
+        rng = np.random.default_rng(0)
+        points = np.vstack([rng.normal(0, 1, (30, N_MFCC)), rng.normal(4, 1, (20, N_MFCC))])
+        labels = np.repeat([0, 1], [30, 20])
+        direct = ((points[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+
+        assert np.allclose(squared_distances(points, points), direct)
+        assert 0.5 < silhouette(points, labels) <= 1.0
+
+    @pytest.mark.unit
+    def test_turns_cut_between_windows(self):
+        """Turns stay inside their region and split halfway between window centres"""
+        regions = [(0.0, 3.0), (5.0, 5.5)]
+        starts, ends, owners = window_spans(regions)
+        labels = np.array([0, 0, 1, 0])
+
+        turns = turns_from_windows(regions, starts, ends, owners, labels)
+
+        assert turns[0][0] == 0.0 and turns[0][2] == 'SPEAKER_00'
+        assert turns[-1] == (5.0, 5.5, 'SPEAKER_00')
+        assert all(end <= 3.0 for _, end, _ in turns[:-1])
+
+    @pytest.mark.unit
+    def test_isolated_window_smoothed(self):
+        labels = np.array([0, 0, 1, 0, 0, 1, 1])
+        owners = np.array([0, 0, 0, 0, 1, 1, 1])
+        assert smooth_labels(labels, owners).tolist() == [0, 0, 0, 0, 0, 1, 1]
+
+    @pytest.mark.unit
+    def test_two_speakers_separated(self, tmp_path):
+        path, truth = _conversation(tmp_path)
+
+        diarization = diarize_file(path, num_speakers=2)
+
+        assert diarization.labels() == ['SPEAKER_00', 'SPEAKER_01']
+        assert _frame_accuracy(diarization, truth) > 0.85
+
+    @pytest.mark.unit
+    def test_speaker_count_estimated_without_hint(self, tmp_path):
+        path, truth = _conversation(tmp_path)
+
+        diarization = diarize_file(path)
+
+        assert len(diarization.labels()) == 2
+        assert _frame_accuracy(diarization, truth) > 0.85
+
+    @pytest.mark.unit
+    def test_silence_has_no_turns(self, tmp_path):
+        sf.write(tmp_path / "silence.wav", np.zeros(16000 * 3, dtype=np.int16), 16000, subtype='PCM_16')
+        assert len(diarize_file(tmp_path / "silence.wav", num_speakers=2)) == 0
+
+    @pytest.mark.performance
+    def test_faster_than_real_time(self, tmp_path):
+        path, truth = _conversation(tmp_path)
+
+        started = time.perf_counter()
+        diarize_file(path, num_speakers=2)
+        elapsed = time.perf_counter() - started
+
+        assert truth[-1][1] / elapsed > 10
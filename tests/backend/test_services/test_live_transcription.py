@@ -0,0 +1,96 @@
+"""
+Tests for live transcription - rolling windows, seam de-duplication and subscriber events
+"""
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.live_transcription import LiveTranscriber, RollingTranscript, drop_repeated_prefix
+
+# (time, word): three sentences separated by pauses
+SCRIPT = (
+    [(0.5 + 0.4 * i, w) for i, w in enumerate("we arrived in California in 1962".split())]
+    + [(5.0 + 0.4 * i, w) for i, w in enumerate("my father found work in the orchards near San Jose".split())]
+    + [(11.0 + 0.4 * i, w) for i, w in enumerate("and we never went back".split())]
+)
+
+
+async def fake_window(start: float, end: float):
+    """Whisper stand-in: one segment per sentence, holding the words spoken inside the window"""
+    segments, current = [], []
+    for time, word in SCRIPT:
+        if not start <= time < end:
+            continue
+        if current and time - current[-1][0] > 1.0:
+            segments.append(current)
+            current = []
+        current.append((time, word))
+    if current:
+        segments.append(current)
+    return [
+        {'start': words[0][0], 'end': min(end, words[-1][0] + 0.3), 'text': ' '.join(w for _, w in words), 'confidence': '-0.2'}
+        for words in segments
+    ]
+
+
+class TestLiveTranscription:
+    """Test suite for rolling-window live transcription"""
+
+    @pytest.mark.unit
+    def test_repeated_words_dropped_at_seam(self):
+        assert drop_repeated_prefix("we arrived in California", "California, in 1962") == "in 1962"
+        assert drop_repeated_prefix("we arrived", "in California") == "in California"
+        assert drop_repeated_prefix("the end.", "The end") == ""
+
+    @pytest.mark.unit
+    def test_segment_near_window_edge_stays_partial(self):
+        transcript = RollingTranscript(overlap=1.5)
+        window = transcript.next_window(audio_end=7.0)
+
+        finalized, partial = transcript.merge(window[1], asyncio.run(fake_window(*window)))
+
+        assert [s['text'] for s in finalized] == ["we arrived in California in 1962"]
+        assert [s['text'] for s in partial] == ["my father found work in"]
+        # The next window re-hears the cut sentence from just before it
+        assert transcript.next_window(audio_end=14.0)[0] == pytest.approx(3.5)
+
+    @pytest.mark.unit
+    def test_silence_advances_the_window(self):
+        transcript = RollingTranscript(overlap=1.5)
+
+        transcript.merge(30.0, [])
+
+        assert transcript.committed_until == 28.5
+        assert transcript.next_window(audio_end=29.0) is None
+
+    @pytest.mark.unit
+    def test_ticks_reassemble_the_script_once(self):
+        audio = {'end': 0.0}
+        live = LiveTranscriber("session", fake_window, lambda: audio['end'], overlap=1.5, max_window=6.0)
+        events = live.subscribe()
+
+        async def run():
+            for end in (3.0, 6.2, 9.1, 12.0):
+                audio['end'] = end
+                await live.tick()
+            audio['end'] = 14.0
+            return await live.finish()
+
+        segments = asyncio.run(run())
+
+        words = ' '.join(s['text'] for s in segments).split()
+        assert words == [w for _, w in SCRIPT]
+        assert all(a['end'] <= b['start'] for a, b in zip(segments, segments[1:]))
+        received = []
+        while not events.empty():
+            received.append(events.get_nowait())
+        assert received[0]['event'] == 'snapshot'
+        assert received[-1]['event'] == 'done'
+        assert [e['data']['text'] for e in received if e['event'] == 'final'] == [s['text'] for s in segments]
+        assert any(e['event'] == 'partial' and e['data']['segments'] for e in received)
+        assert live.subscribe().get_nowait()['data']['done'] is True
@@ -0,0 +1,104 @@
+"""
+Tests for ModelRegistry - lazy component loading, preload and readiness
+"""
+import pytest
+import time
+import threading
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.model_registry import (
+    ModelRegistry,
+    COMPONENT_COLD,
+    COMPONENT_FAILED,
+    COMPONENT_WARM
+)
+
+
+class FakeAgent:
+    """Stand-in for an expensive Agno agent"""
+
+    instances = 0
+
+    def __init__(self):
+        time.sleep(0.05)
+        FakeAgent.instances += 1
+
+    def generate(self, topic):
+        return f"questions about {topic}"
+
+
+class TestModelRegistry:
+    """Test suite for lazy components"""
+
+    @pytest.mark.unit
+    def test_component_builds_on_first_use(self):
+        """Registering is free; the first attribute access builds the component"""
+        FakeAgent.instances = 0
+        registry = ModelRegistry()
+        agent = registry.register("planner_agent", FakeAgent)
+
+        assert FakeAgent.instances == 0
+        assert registry.status()["planner_agent"]["status"] == COMPONENT_COLD
+
+        assert agent.generate("childhood") == "questions about childhood"
+        assert agent.generate("work") == "questions about work"
+        assert FakeAgent.instances == 1
+        assert registry.status()["planner_agent"]["status"] == COMPONENT_WARM
+
+    @pytest.mark.unit
+    def test_concurrent_first_use_builds_once(self):
+        """Threads racing on a cold component share one instance"""
+        FakeAgent.instances = 0
+        registry = ModelRegistry()
+        agent = registry.register("prober_agent", FakeAgent)
+
+        threads = [threading.Thread(target=agent.get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert FakeAgent.instances == 1
+
+    @pytest.mark.unit
+    def test_failed_load_reported_and_retried(self):
+        """Failures show up in status; the next use tries again"""
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("HF_TOKEN missing")
+            return "pipeline"
+
+        registry = ModelRegistry()
+        registry.register("diarization_pipeline", flaky)
+
+        status = registry.preload(["diarization_pipeline"])
+        assert status["diarization_pipeline"]["status"] == COMPONENT_FAILED
+        assert status["diarization_pipeline"]["error"] == "HF_TOKEN missing"
+
+        assert registry.components["diarization_pipeline"].get() == "pipeline"
+        assert len(attempts) == 2
+
+    @pytest.mark.unit
+    def test_ready_waits_for_required_components(self):
+        """Readiness covers only the components asked to preload"""
+        registry = ModelRegistry()
+        registry.register("planner_agent", FakeAgent)
+        registry.register("summarizer_agent", FakeAgent)
+
+        assert registry.parse_names("all") == ["planner_agent", "summarizer_agent"]
+        assert registry.parse_names("summarizer_agent, unknown") == ["summarizer_agent"]
+        assert registry.parse_names("") == []
+
+        registry.required = ["summarizer_agent"]
+        assert not registry.ready
+        registry.preload(registry.required)
+        assert registry.ready
+        assert registry.status()["planner_agent"]["status"] == COMPONENT_COLD
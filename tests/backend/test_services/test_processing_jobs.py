@@ -0,0 +1,144 @@
+"""
+Tests for processing jobs - background end-of-session processing with progress
+"""
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+import services.processing_jobs as processing_jobs
+from services.processing_jobs import (
+    ProcessingJobManager,
+    ProcessingProgress,
+    create_job_store,
+    JOB_COMPLETED,
+    JOB_FAILED
+)
+
+
+class TestProcessingProgress:
+    """Test suite for stage tracking"""
+
+    @pytest.mark.unit
+    def test_stages_record_durations_and_progress(self):
+        """Finished stages have a duration; updates are forwarded to the listener"""
+        events = []
+        progress = ProcessingProgress(listener=events.append)
+
+        with progress.stage('diarization'):
+            progress.update('diarization', 1, 4, detail='segmentation')
+            assert progress.stages['diarization']['progress'] == 0.25
+
+        assert progress.stages['diarization']['status'] == JOB_COMPLETED
+        assert progress.stages['diarization']['progress'] == 1.0
+        assert list(progress.durations()) == ['diarization']
+        assert [e['detail'] for e in events] == [None, 'segmentation', 'segmentation']
+
+    @pytest.mark.unit
+    def test_failed_stage_is_marked(self):
+        """A raising block marks its stage failed and re-raises"""
+        progress = ProcessingProgress()
+        with pytest.raises(RuntimeError):
+            with progress.stage('transcription'):
+                raise RuntimeError("boom")
+        assert progress.stages['transcription']['status'] == JOB_FAILED
+
+
+class TestProcessingJobManager:
+    """Test suite for background jobs"""
+
+    @pytest.mark.unit
+    def test_job_runs_in_background_and_streams_events(self):
+        """Submit returns at once; subscribers see stage events then 'done'"""
+        manager = ProcessingJobManager()
+
+        async def work(progress):
+            with progress.stage('transcription'):
+                await asyncio.sleep(0.01)
+                progress.update('transcription', 1, 2)
+            return {'status': 'completed', 'utterance_count': 2}
+
+        async def run():
+            job = manager.submit("session-1", work)
+            assert not job.done
+            events = job.subscribe()
+            seen = []
+            while True:
+                event = await asyncio.wait_for(events.get(), timeout=1)
+                seen.append(event['event'])
+                if event['event'] == 'done':
+                    return job, seen
+
+        job, seen = asyncio.run(run())
+
+        assert job.status == JOB_COMPLETED
+        assert job.result['utterance_count'] == 2
+        assert seen[0] == 'status' and seen[-1] == 'done'
+        assert 'stage' in seen
+        assert manager.find_for_session("session-1") is job
+
+    @pytest.mark.unit
+    def test_error_result_fails_job(self):
+        """Service-style {'error': ...} results and exceptions both fail the job"""
+        manager = ProcessingJobManager()
+
+        async def error_result(progress):
+            return {'error': 'no audio'}
+
+        async def raises(progress):
+            raise ValueError("Session missing not found")
+
+        async def run():
+            first = manager.submit("a", error_result)
+            second = manager.submit("b", raises)
+            await asyncio.gather(first.task, second.task)
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert (first.status, first.error) == (JOB_FAILED, 'no audio')
+        assert (second.status, second.error) == (JOB_FAILED, 'Session missing not found')
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("backend", ["file", "sqlite"])
+    def test_other_workers_see_the_job(self, tmp_path, monkeypatch, backend):
+        """A second manager on the same store reports and streams a job it is not running"""
+        monkeypatch.setattr(processing_jobs, 'JOB_POLL_SECONDS', 0.01)
+        monkeypatch.setattr(processing_jobs, 'SESSION_STORE_PATH', None)
+        running = ProcessingJobManager(store=create_job_store(tmp_path, backend))
+        other = ProcessingJobManager(store=create_job_store(tmp_path, backend))
+        release = None
+
+        async def work(progress):
+            with progress.stage('transcription'):
+                await release.wait()
+            return {'status': 'completed', 'utterance_count': 1}
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            job = running.submit("session-1", work)
+            await asyncio.sleep(0.01)
+            assert other.get(job.job_id) is None
+            assert other.status(job.job_id)['stages'][0]['name'] == 'transcription'
+
+            events = other.subscribe(job.job_id)
+            release.set()
+            seen = []
+            while True:
+                event = await asyncio.wait_for(events.get(), timeout=1)
+                seen.append(event)
+                if event['event'] == 'done':
+                    other.unsubscribe(job.job_id, events)
+                    return job, seen
+
+        job, seen = asyncio.run(run())
+
+        assert seen[-1]['data']['status'] == JOB_COMPLETED
+        assert seen[-1]['data']['result']['utterance_count'] == 1
+        assert other.status(job.job_id) == job.to_dict()
+        assert other.status("missing") is None and other.subscribe("missing") is None
@@ -0,0 +1,104 @@
+"""
+Tests for the result cache - content keys, RTTM/JSON entries and LRU eviction
+"""
+import os
+import pytest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.fallback_diarizer import FallbackDiarization
+from services.result_cache import ResultCache, cache_key, parse_rttm, write_rttm
+
+
+def _transcript(text: str):
+    return SimpleNamespace(
+        text=text,
+        duration=3.0,
+        segments=[SimpleNamespace(start=0.0, end=3.0, text=text, avg_logprob=-0.2)],
+        words=[SimpleNamespace(word=text, start=0.4, end=0.9)]
+    )
+
+
+class TestResultCache:
+    """Test suite for the content-addressed result cache"""
+
+    @pytest.mark.unit
+    def test_key_covers_audio_segment_model_and_params(self):
+        key = cache_key('transcription', 'abc', 'whisper-1', {'padding': 0.1}, (1.0, 2.0))
+
+        assert key == cache_key('transcription', 'abc', 'whisper-1', {'padding': 0.1}, (1.0000001, 2.0))
+        assert key != cache_key('transcription', 'abd', 'whisper-1', {'padding': 0.1}, (1.0, 2.0))
+        assert key != cache_key('transcription', 'abc', 'whisper-2', {'padding': 0.1}, (1.0, 2.0))
+        assert key != cache_key('transcription', 'abc', 'whisper-1', {'padding': 0.0}, (1.0, 2.0))
+        assert key != cache_key('transcription', 'abc', 'whisper-1', {'padding': 0.1}, (1.0, 2.5))
+        assert key != cache_key('diarization', 'abc', 'whisper-1', {'padding': 0.1}, (1.0, 2.0))
+
+    @pytest.mark.unit
+    def test_audio_hash_follows_content(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache")
+        (tmp_path / "a.wav").write_bytes(b'RIFF' + b'\x00' * 100)
+        (tmp_path / "b.wav").write_bytes(b'RIFF' + b'\x00' * 100)
+        (tmp_path / "c.wav").write_bytes(b'RIFF' + b'\x01' * 100)
+
+        assert cache.audio_hash(tmp_path / "a.wav") == cache.audio_hash(tmp_path / "b.wav")
+        assert cache.audio_hash(tmp_path / "a.wav") != cache.audio_hash(tmp_path / "c.wav")
+
+    @pytest.mark.unit
+    def test_diarization_round_trips_as_rttm(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache")
+        turns = [(0.0, 1.25, 'SPEAKER_00'), (1.5, 4.0, 'SPEAKER_01')]
+
+        assert cache.get_diarization('k' * 64) is None
+        cache.put_diarization('k' * 64, FallbackDiarization(turns))
+
+        assert cache.get_diarization('k' * 64) == turns
+        assert parse_rttm(write_rttm(turns)) == turns
+        rttm = next((tmp_path / "cache").glob('*/*.rttm')).read_text()
+        assert rttm.startswith("SPEAKER audio 1 0.000 1.250 <NA> <NA> SPEAKER_00")
+
+    @pytest.mark.unit
+    def test_transcript_round_trips_as_json(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache")
+        cache.put_transcript('t' * 64, _transcript("Hola"))
+
+        cached = cache.get_transcript('t' * 64)
+
+        assert cached.text == "Hola"
+        assert cached.duration == 3.0
+        assert (cached.segments[0].start, cached.segments[0].avg_logprob) == (0.0, -0.2)
+        assert (cached.words[0].word, cached.words[0].start, cached.words[0].end) == ("Hola", 0.4, 0.9)
+
+    @pytest.mark.unit
+    def test_least_recently_used_entries_evicted(self, tmp_path):
+        cache = ResultCache(tmp_path / "cache")
+        keys = [f"{index:02d}" * 32 for index in range(4)]
+        for age, key in enumerate(keys):
+            cache.put_transcript(key, _transcript("x" * 150))
+            # Distinct, increasing access times
+            path = next((tmp_path / "cache").glob(f'*/{key}.json'))
+            os.utime(path, (1000 + age, 1000 + age))
+        # Room for four entries, not five
+        entry_bytes = cache.stats()['bytes'] // 4
+        cache.max_bytes = int(entry_bytes * 4.5)
+        # Reading the oldest entry makes it the most recently used
+        assert cache.get_transcript(keys[0]) is not None
+
+        cache.put_transcript("ff" * 32, _transcript("x" * 150))
+
+        assert cache.stats()['bytes'] <= cache.max_bytes
+        assert cache.get_transcript(keys[0]) is not None
+        assert cache.get_transcript(keys[1]) is None
+        assert cache.get_transcript("ff" * 32) is not None
+
+    @pytest.mark.unit
+    def test_disabled_cache_stores_nothing(self, tmp_path):
+        cache = ResultCache(None)
+        cache.put_transcript('t' * 64, _transcript("Hola"))
+
+        assert cache.audio_hash(__file__) is None
+        assert cache.get_transcript('t' * 64) is None
@@ -0,0 +1,139 @@
+"""
+Tests for the segment index - per-utterance offsets and range-served utterance audio
+"""
+import json
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.audio_archive import ArchiveEncoder
+from services.audio_spool import AudioSpool, WAV_HEADER_SIZE
+from services.segment_index import (
+    SEGMENT_INDEX_NAME,
+    SegmentIndex,
+    open_segment_audio,
+    parse_range
+)
+
+
+def _ramp_pcm(seconds: float) -> np.ndarray:
+    """Distinct sample values so slices can be checked exactly"""
+    return (np.arange(int(seconds * 16000)) % 30000).astype('<i2')
+
+
+def _write_session(session_dir: Path, samples: np.ndarray, archive: bool = False) -> SegmentIndex:
+    spool = AudioSpool(session_dir / "complete_audio.wav", sample_rate=16000)
+    spool.append(samples.tobytes())
+    spool.finalize()
+    if archive:
+        encoder = ArchiveEncoder(session_dir / "complete_audio", 'flac')
+        encoder.write(samples.tobytes())
+        encoder.close()
+
+    index = SegmentIndex()
+    index.add("first", 0.5, 1.5)
+    index.add("second", 2.0, 2.25)
+    index.save(session_dir / SEGMENT_INDEX_NAME)
+    return index
+
+
+class TestSegmentIndex:
+    """Test suite for the segment index"""
+
+    @pytest.mark.unit
+    def test_offsets_are_frames(self):
+        """Offsets are 16 kHz frames, independent of how the recording is stored"""
+        index = SegmentIndex()
+        offsets = index.add("utt", 1.0, 2.5)
+
+        assert offsets == {'start_sample': 16000, 'end_sample': 40000}
+
+    @pytest.mark.unit
+    def test_save_and_load_round_trip(self, tmp_path):
+        index = SegmentIndex()
+        index.add("utt", 0.25, 0.75)
+        index.save(tmp_path / SEGMENT_INDEX_NAME)
+
+        loaded = SegmentIndex.load(tmp_path / SEGMENT_INDEX_NAME)
+        assert loaded.segments == {"utt": (4000, 12000)}
+        assert loaded.sample_rate == index.sample_rate
+
+    @pytest.mark.unit
+    def test_parse_range(self):
+        assert parse_range(None, 1000) is None
+        assert parse_range("bytes=0-99", 1000) == (0, 100)
+        assert parse_range("bytes=900-", 1000) == (900, 1000)
+        assert parse_range("bytes=-100", 1000) == (900, 1000)
+        assert parse_range("bytes=500-5000", 1000) == (500, 1000)
+        # Multiple ranges are answered with the whole body
+        assert parse_range("bytes=0-1,5-6", 1000) is None
+
+        with pytest.raises(ValueError):
+            parse_range("bytes=1000-", 1000)
+        with pytest.raises(ValueError):
+            parse_range("bytes=abc-", 1000)
+
+    @pytest.mark.unit
+    def test_utterance_audio_from_working_copy(self, tmp_path):
+        """The utterance is a standalone WAV sliced from the recording, readable in pieces"""
+        samples = _ramp_pcm(3.0)
+        _write_session(tmp_path, samples)
+
+        with open_segment_audio(tmp_path, "first") as segment:
+            assert segment.size == WAV_HEADER_SIZE + 16000 * 2
+            whole = segment.read(0, segment.size)
+            pieces = b''.join(segment.read(start, start + 1000) for start in range(0, segment.size, 1000))
+
+        assert whole == pieces
+        assert whole[:4] == b'RIFF'
+        assert np.array_equal(np.frombuffer(whole[WAV_HEADER_SIZE:], dtype='<i2'), samples[8000:24000])
+
+    @pytest.mark.unit
+    def test_utterance_audio_from_archive(self, tmp_path):
+        """Without a working copy, only the utterance is decoded out of the FLAC archive"""
+        samples = _ramp_pcm(3.0)
+        _write_session(tmp_path, samples, archive=True)
+        (tmp_path / "complete_audio.wav").unlink()
+
+        with open_segment_audio(tmp_path, "second") as segment:
+            pcm = segment.read(WAV_HEADER_SIZE, segment.size)
+
+        assert np.array_equal(np.frombuffer(pcm, dtype='<i2'), samples[32000:36000])
+
+    @pytest.mark.unit
+    def test_archive_ranges_are_read_on_demand(self, tmp_path):
+        """Unaligned ranges out of the archive match the same slice of the working copy"""
+        samples = _ramp_pcm(3.0)
+        _write_session(tmp_path, samples, archive=True)
+        with open_segment_audio(tmp_path, "first") as segment:
+            expected = segment.read(0, segment.size)
+        (tmp_path / "complete_audio.wav").unlink()
+
+        with open_segment_audio(tmp_path, "first") as segment:
+            assert segment.size == len(expected)
+            assert segment.read(101, 4097) == expected[101:4097]
+            assert b''.join(segment.iter_range(0, segment.size, chunk_size=999)) == expected
+
+    @pytest.mark.unit
+    def test_loads_index_with_byte_layout(self, tmp_path):
+        """Indexes written with the old byte fields still load"""
+        path = tmp_path / SEGMENT_INDEX_NAME
+        path.write_text(json.dumps({
+            'sample_rate': 16000, 'channels': 1, 'sample_width': 2, 'data_offset': 44,
+            'segments': {'utt': [16000, 32000]}
+        }))
+
+        assert SegmentIndex.load(path).segments == {'utt': (16000, 32000)}
+
+    @pytest.mark.unit
+    def test_unknown_utterance(self, tmp_path):
+        _write_session(tmp_path, _ramp_pcm(3.0))
+
+        with pytest.raises(KeyError):
+            open_segment_audio(tmp_path, "missing")
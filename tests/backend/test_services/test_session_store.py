@@ -0,0 +1,152 @@
+"""
+Tests for the session store - durable recording session state for every backend
+"""
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.session_store import SESSION_STORES, SessionStore, create_session_store
+
+
+@pytest.fixture(params=SESSION_STORES)
+def store(request, tmp_path):
+    store = create_session_store(tmp_path, request.param)
+    yield store
+    store.close()
+
+
+def _lock_taken(store, session_id: str) -> bool:
+    """Whether another caller would have to wait for the session's lock"""
+    if store.lock_dir is None:
+        thread_lock = store._acquire_thread_lock(session_id, blocking=False)
+        if thread_lock is not None:
+            thread_lock.release()
+        return thread_lock is None
+    lock_file = store._acquire_file_lock(session_id, blocking=False)
+    if lock_file is not None:
+        lock_file.close()
+    return lock_file is None
+
+
+class TestSessionStore:
+    """Test suite for the session store backends"""
+
+    @pytest.mark.unit
+    def test_state_round_trip(self, store):
+        store.create({'session_id': 's1', 'status': 'active', 'participants': [{'id': 'a', 'name': 'Ana'}], 'data_bytes': 0})
+
+        store.update('s1', data_bytes=3200, chunk_count=1)
+
+        state = store.get('s1')
+        assert state['data_bytes'] == 3200
+        assert state['participants'] == [{'id': 'a', 'name': 'Ana'}]
+        assert store.get('missing') is None
+        with pytest.raises(KeyError):
+            store.update('missing', data_bytes=1)
+
+    @pytest.mark.unit
+    def test_list_by_status_and_delete(self, store):
+        store.create({'session_id': 's1', 'status': 'active'})
+        store.create({'session_id': 's2', 'status': 'processing'})
+
+        assert [state['session_id'] for state in store.list_sessions('active')] == ['s1']
+        assert len(store.list_sessions()) == 2
+
+        store.delete('s1')
+        assert store.get('s1') is None
+        assert [state['session_id'] for state in store.list_sessions()] == ['s2']
+
+    @pytest.mark.unit
+    def test_file_backends_survive_reopening(self, tmp_path):
+        """A restarted process sees the sessions the previous one was recording"""
+        for backend in ('file', 'sqlite'):
+            (tmp_path / backend).mkdir()
+            first = create_session_store(tmp_path / backend, backend)
+            first.create({'session_id': 's1', 'status': 'active', 'data_bytes': 640})
+            first.close()
+
+            second = create_session_store(tmp_path / backend, backend)
+            assert second.get('s1')['data_bytes'] == 640
+            second.close()
+
+    @pytest.mark.unit
+    def test_lock_is_exclusive(self, store):
+        """Read-modify-write under the lock never loses an update"""
+        store.create({'session_id': 's1', 'status': 'active', 'chunk_count': 0})
+
+        def append():
+            for _ in range(20):
+                with store.lock('s1'):
+                    count = store.get('s1')['chunk_count']
+                    time.sleep(0.0005)
+                    store.update('s1', chunk_count=count + 1)
+
+        threads = [threading.Thread(target=append) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert store.get('s1')['chunk_count'] == 80
+
+    @pytest.mark.unit
+    def test_waiter_on_a_dropped_lock_takes_the_current_one(self, store):
+        """A caller that waited on a lock dropped meanwhile never shares the session with a newcomer"""
+        exclusive = []
+
+        def waiter():
+            with store.lock('s1'):
+                exclusive.append(_lock_taken(store, 's1'))
+
+        with store.lock('s1'):
+            thread = threading.Thread(target=waiter)
+            thread.start()
+            time.sleep(0.05)
+            # What _release_lock does once it holds the lock
+            if store.lock_dir is None:
+                store._thread_locks.pop('s1')
+            else:
+                (store.lock_dir / "s1.lock").unlink()
+        thread.join()
+
+        assert exclusive == [True]
+
+    @pytest.mark.unit
+    def test_delete_keeps_a_held_lock(self, store):
+        store.create({'session_id': 's1', 'status': 'active'})
+        store.create({'session_id': 's2', 'status': 'active'})
+
+        with store.lock('s1'):
+            store.delete('s1')
+            assert _lock_taken(store, 's1')
+        with store.lock('s2'):
+            pass
+        store.delete('s2')
+
+        if store.lock_dir is not None:
+            assert not (store.lock_dir / "s2.lock").exists()
+        assert not _lock_taken(store, 's1')
+
+    @pytest.mark.unit
+    def test_incomplete_backend_fails_on_creation(self):
+        class NoListing(SessionStore):
+            def create(self, state):
+                pass
+
+            def get(self, session_id):
+                return None
+
+            def update(self, session_id, **fields):
+                return {}
+
+            def delete(self, session_id):
+                pass
+
+        with pytest.raises(TypeError):
+            NoListing()
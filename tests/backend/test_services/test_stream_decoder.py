@@ -0,0 +1,79 @@
+"""
+Tests for FFmpegStreamDecoder - streaming decode of compressed browser audio
+"""
+import pytest
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.audio_spool import AudioSpool
+from services.stream_decoder import FFmpegStreamDecoder, INPUT_FORMAT_PCM, normalize_input_format
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg not installed")
+
+
+class PassthroughDecoder(FFmpegStreamDecoder):
+    """Decoder whose "ffmpeg" copies stdin to stdout, to exercise the pipe plumbing"""
+
+    def _build_command(self):
+        return ['cat']
+
+
+class TestStreamDecoder:
+    """Test suite for streaming decode"""
+
+    @pytest.mark.unit
+    def test_input_format_normalization(self):
+        """Mime types from MediaRecorder map to decoder formats"""
+        assert normalize_input_format('audio/webm;codecs=opus') == 'webm'
+        assert normalize_input_format('audio/ogg; codecs=opus') == 'ogg'
+        assert normalize_input_format('audio/mp4') == 'mp4'
+        assert normalize_input_format(None) == INPUT_FORMAT_PCM
+        assert normalize_input_format('pcm') == INPUT_FORMAT_PCM
+        with pytest.raises(ValueError):
+            normalize_input_format('audio/flac')
+
+    @pytest.mark.unit
+    def test_output_streams_into_spool(self, tmp_path):
+        """Everything the subprocess emits reaches the callback before close() returns"""
+        spool = AudioSpool(tmp_path / "audio.wav")
+        decoder = PassthroughDecoder(on_pcm=spool.append, input_format='webm')
+        decoder.start()
+
+        payload = np.arange(16000 * 3, dtype=np.int16).tobytes()
+        for offset in range(0, len(payload), 4001):
+            decoder.feed(payload[offset:offset + 4001])
+        decoder.close()
+        spool.finalize()
+
+        assert decoder.chunks_fed == -(-len(payload) // 4001)
+        assert decoder.pcm_bytes == len(payload)
+        assert (tmp_path / "audio.wav").read_bytes()[44:] == payload
+
+    @pytest.mark.unit
+    @requires_ffmpeg
+    def test_webm_opus_decoded_while_streaming(self, tmp_path):
+        """A real WebM/Opus stream fed in small chunks decodes to 16 kHz mono PCM"""
+        source = tmp_path / "tone.webm"
+        subprocess.run([
+            'ffmpeg', '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=frequency=440:duration=3',
+            '-ac', '2', '-ar', '48000', '-c:a', 'libopus', str(source)
+        ], check=True)
+
+        spool = AudioSpool(tmp_path / "decoded.wav")
+        decoder = FFmpegStreamDecoder(on_pcm=spool.append, input_format='webm')
+        decoder.start()
+        data = source.read_bytes()
+        for offset in range(0, len(data), 2000):
+            decoder.feed(data[offset:offset + 2000])
+        decoder.close()
+        spool.finalize()
+
+        assert spool.duration_seconds == pytest.approx(3.0, abs=0.1)
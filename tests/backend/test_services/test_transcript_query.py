@@ -0,0 +1,118 @@
+"""
+Tests for transcript queries - keyset pagination, speaker/time filters and the utterance bulk rows
+"""
+import uuid
+import pytest
+import sys
+from pathlib import Path
+
+from sqlalchemy.dialects import postgresql
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.database_service import _utterance_record, utterance_page_query
+from services.transcript_query import (
+    decode_cursor, format_clock, page_sessions, page_utterances, transcript_entry, utterance_rows
+)
+
+
+def _utterances(count: int):
+    """Alternating speakers, one second each with a half-second gap"""
+    return [
+        {
+            'id': str(uuid.uuid4()),
+            'speaker_id': f"SPEAKER_0{index % 2}",
+            'speaker_name': 'Interviewer' if index % 2 == 0 else 'Subject',
+            'text': f"utterance {index}",
+            'start_sample': int(index * 1.5 * 16000),
+            'end_sample': int((index * 1.5 + 1) * 16000),
+            'byte_start': 44,
+            'byte_end': 88
+        }
+        for index in range(count)
+    ]
+
+
+class TestTranscriptQuery:
+    """Test suite for transcript pagination and filters"""
+
+    @pytest.mark.unit
+    def test_pages_cover_transcript_once_in_order(self):
+        rows = utterance_rows(_utterances(7))
+        texts, cursor = [], None
+        while True:
+            page, cursor = page_utterances(rows, limit=3, cursor=cursor)
+            texts.extend(row['text'] for row in page)
+            if cursor is None:
+                break
+
+        assert texts == [f"utterance {index}" for index in range(7)]
+
+    @pytest.mark.unit
+    def test_speaker_and_time_filters(self):
+        rows = utterance_rows(_utterances(6))
+
+        page, cursor = page_utterances(rows, speaker_id='SPEAKER_01')
+        assert [row['text'] for row in page] == ["utterance 1", "utterance 3", "utterance 5"]
+        assert cursor is None
+
+        # Utterance 1 spans 1500-2500 ms and 2 spans 3000-4000 ms; both overlap the window
+        page, _ = page_utterances(rows, from_ms=2000, to_ms=3500)
+        assert [(row['start_ms'], row['end_ms']) for row in page] == [(1500, 2500), (3000, 4000)]
+
+        page, cursor = page_utterances(rows, limit=1, speaker_id='SPEAKER_00', from_ms=1000)
+        assert [row['text'] for row in page] == ["utterance 2"]
+        page, _ = page_utterances(rows, limit=1, cursor=cursor, speaker_id='SPEAKER_00', from_ms=1000)
+        assert [row['text'] for row in page] == ["utterance 4"]
+
+    @pytest.mark.unit
+    def test_clock_times_used_without_sample_offsets(self):
+        rows = utterance_rows([{'start_time': "01:05", 'duration': 2500, 'text': "hi"}])
+
+        assert (rows[0]['start_ms'], rows[0]['end_ms']) == (65000, 67500)
+        assert transcript_entry(rows[0])['timestamp'] == "00:01:05"
+        assert format_clock(3 * 3600 * 1000 + 61000) == "03:01:01"
+
+    @pytest.mark.unit
+    def test_malformed_cursor_rejected(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor", 1)
+        with pytest.raises(ValueError):
+            page_utterances(utterance_rows(_utterances(2)), cursor=page_sessions(
+                [{'id': 'a', 'started_at': '2024-01-01T10:00:00'}, {'id': 'b', 'started_at': '2024-01-02T10:00:00'}],
+                limit=1
+            )[1])
+
+    @pytest.mark.unit
+    def test_sessions_paged_newest_first(self):
+        sessions = [{'id': f"s{day}", 'started_at': f"2024-01-0{day}T10:00:00"} for day in range(1, 6)]
+
+        first, cursor = page_sessions(sessions, limit=2)
+        second, cursor = page_sessions(sessions, limit=2, cursor=cursor)
+        third, cursor = page_sessions(sessions, limit=2, cursor=cursor)
+
+        assert [s['id'] for s in first + second + third] == ["s5", "s4", "s3", "s2", "s1"]
+        assert cursor is None
+
+    @pytest.mark.unit
+    def test_bulk_rows_split_columns_from_metadata(self):
+        session_uuid = uuid.uuid4()
+        row = utterance_rows(_utterances(2))[1]
+
+        record = _utterance_record(session_uuid, row)
+
+        assert record['session_id'] == session_uuid
+        assert (record['sequence'], record['start_ms'], record['end_ms']) == (1, 1500, 2500)
+        assert record['metadata'] == {'start_sample': 24000, 'end_sample': 40000, 'byte_start': 44, 'byte_end': 88}
+
+    @pytest.mark.unit
+    def test_page_query_is_keyset_on_sequence(self):
+        query = utterance_page_query(uuid.uuid4(), 51, after_sequence=100, speaker_id='SPEAKER_00', from_ms=0, to_ms=60000)
+
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        assert "conversation_utterances.sequence > " in sql
+        assert "ORDER BY conversation_utterances.sequence" in sql
+        assert "OFFSET" not in sql
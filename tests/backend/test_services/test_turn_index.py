@@ -0,0 +1,84 @@
+"""
+Tests for the turn index - millisecond timeline lookups by time, range and speaker
+"""
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.turn_index import TurnIndex, format_offset, utterance_times
+
+
+def _utterance(start_ms: int, end_ms: int, speaker: str):
+    return {'start_ms': start_ms, 'end_ms': end_ms, 'speaker_id': speaker}
+
+
+class TestTurnIndex:
+    """Test suite for the bisect-based turn index"""
+
+    @pytest.mark.unit
+    def test_utterance_times_keep_milliseconds(self):
+        times = utterance_times(75.0004, 80.2376)
+
+        assert (times['start_ms'], times['end_ms'], times['duration']) == (75000, 80238, 5238)
+        assert (times['start_time'], times['end_time']) == ("01:15", "01:20")
+        assert format_offset(3 * 3600 * 1000) == "180:00"
+
+    @pytest.mark.unit
+    def test_speaker_at_time(self):
+        index = TurnIndex([
+            _utterance(5000, 9000, 'SPEAKER_01'),
+            _utterance(0, 4000, 'SPEAKER_00'),
+            _utterance(8000, 12000, 'SPEAKER_00'),
+        ])
+
+        assert index.speaker_at(0) == 'SPEAKER_00'
+        assert index.speaker_at(4000) is None  # Ends are exclusive
+        assert index.speaker_at(4500) is None
+        assert index.speaker_at(6000) == 'SPEAKER_01'
+        # Overlapping speech: the turn that started last
+        assert index.speaker_at(8500) == 'SPEAKER_00'
+        assert index.speaker_at(12000) is None
+
+    @pytest.mark.unit
+    def test_range_includes_long_turns_started_earlier(self):
+        index = TurnIndex([
+            _utterance(0, 60000, 'SPEAKER_00'),
+            _utterance(1000, 2000, 'SPEAKER_01'),
+            _utterance(30000, 31000, 'SPEAKER_01'),
+            _utterance(70000, 71000, 'SPEAKER_01'),
+        ])
+
+        assert [u['start_ms'] for u in index.between(10000, 40000)] == [0, 30000]
+        assert [u['start_ms'] for u in index.between(60000, 70000)] == []
+        assert [u['start_ms'] for u in index.for_speaker('SPEAKER_01').between(0, 100000)] == [1000, 30000, 70000]
+        assert index.speakers == ['SPEAKER_00', 'SPEAKER_01']
+        assert len(index.for_speaker('SPEAKER_02')) == 0
+
+    @pytest.mark.unit
+    def test_from_turns_in_seconds(self):
+        index = TurnIndex.from_turns([(0.0, 1.25, 'A'), (1.5, 2.0, 'B')])
+
+        assert index.speaker_at(1249) == 'A'
+        assert index.speaker_at(1250) is None
+        assert index.speaker_at(1500) == 'B'
+
+    @pytest.mark.performance
+    def test_matches_linear_scan(self):
+        rng = np.random.default_rng(0)
+        starts = np.sort(rng.integers(0, 3 * 3600 * 1000, 5000))
+        utterances = [
+            _utterance(int(start), int(start + length), f"SPEAKER_0{speaker}")
+            for start, length, speaker in zip(starts, rng.integers(200, 20000, 5000), rng.integers(0, 3, 5000))
+        ]
+        index = TurnIndex(utterances)
+
+        for from_ms in rng.integers(0, 3 * 3600 * 1000, 200):
+            to_ms = int(from_ms) + 60000
+            expected = [u for u in index.utterances if u['end_ms'] > from_ms and u['start_ms'] < to_ms]
+            assert index.between(int(from_ms), to_ms) == expected
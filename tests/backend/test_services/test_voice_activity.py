@@ -0,0 +1,96 @@
+"""
+Tests for voice activity detection - speech regions and the compact timeline map
+"""
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.voice_activity import (
+    SpeechTimeline,
+    detect_speech_in_file,
+    detect_speech_regions,
+    write_speech_audio
+)
+
+SAMPLE_RATE = 16000
+
+
+def _speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    """Amplitude-modulated harmonic signal at conversational level"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voiced = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+    return (0.1 * voiced * envelope + 0.002 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def _room_noise(seconds: float, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (0.002 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def _interview(layout):
+    """Concatenate ('speech'|'silence', seconds) parts"""
+    parts = [_speech_like(s, i) if kind == 'speech' else _room_noise(s, i) for i, (kind, s) in enumerate(layout)]
+    return np.concatenate(parts)
+
+
+class TestVoiceActivity:
+    """Test suite for VAD"""
+
+    @pytest.mark.unit
+    def test_regions_follow_speech(self):
+        """Long silences are cut; regions cover the speech with a little padding"""
+        signal = _interview([('silence', 3), ('speech', 2), ('silence', 5), ('speech', 3), ('silence', 2)])
+
+        regions = detect_speech_regions(signal, SAMPLE_RATE)
+
+        assert len(regions) == 2
+        (s1, e1), (s2, e2) = regions
+        assert 2.6 <= s1 <= 3.0 and 5.0 <= e1 <= 5.4
+        assert 9.6 <= s2 <= 10.0 and 13.0 <= e2 <= 13.4
+
+    @pytest.mark.unit
+    def test_short_pauses_do_not_split_regions(self):
+        """Pauses shorter than the minimum silence stay inside one region"""
+        signal = _interview([('silence', 2), ('speech', 2), ('silence', 0.3), ('speech', 2), ('silence', 2)])
+        assert len(detect_speech_regions(signal, SAMPLE_RATE)) == 1
+
+    @pytest.mark.unit
+    def test_digital_silence_has_no_speech(self):
+        assert detect_speech_regions(np.zeros(SAMPLE_RATE * 5, dtype=np.int16), SAMPLE_RATE) == []
+
+    @pytest.mark.unit
+    def test_timeline_maps_compact_times_back(self):
+        """Compact times land in the right region; boundaries depend on start vs end"""
+        timeline = SpeechTimeline([(3.0, 5.0), (10.0, 13.0)])
+
+        assert timeline.speech_seconds == 5.0
+        np.testing.assert_allclose(timeline.to_original([0.0, 1.5, 2.5, 5.0]), [3.0, 4.5, 10.5, 13.0])
+        assert float(timeline.to_original(2.0)) == 10.0
+        assert float(timeline.to_original(2.0, is_end=True)) == 5.0
+        assert timeline.to_original_span(1.0, 3.0) == (4.0, 11.0)
+
+    @pytest.mark.unit
+    def test_file_scan_and_speech_only_copy(self, tmp_path, monkeypatch):
+        """Block-wise file scan matches the in-memory result; the copy holds only speech"""
+        import services.voice_activity as vad_module
+        monkeypatch.setattr(vad_module, 'VAD_BLOCK_FRAMES', 50)
+        signal = _interview([('silence', 3), ('speech', 2), ('silence', 5), ('speech', 3), ('silence', 2)])
+        audio_path = tmp_path / "interview.wav"
+        sf.write(audio_path, signal, SAMPLE_RATE, subtype='PCM_16')
+
+        regions, duration = detect_speech_in_file(audio_path)
+        assert duration == pytest.approx(15.0)
+        assert regions == pytest.approx(detect_speech_regions(sf.read(audio_path, dtype='int16')[0], SAMPLE_RATE))
+
+        speech_path = write_speech_audio(audio_path, regions, tmp_path / "speech_only.wav")
+        info = sf.info(speech_path)
+        assert info.duration == pytest.approx(SpeechTimeline(regions).speech_seconds, abs=0.01)
@@ -0,0 +1,96 @@
+"""
+Tests for the word index - compact word timelines and phrase search across a project's sessions
+"""
+import pytest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.word_index import (
+    MATCH_NEAR, MATCH_PHRASE, WordIndex, WordTimeline, read_project_id, split_words, transcript_words
+)
+
+
+def _words(text: str, start: float = 0.0, step: float = 0.5):
+    """One word every `step` seconds from `start`"""
+    return [(word, start + i * step, start + i * step + step * 0.8) for i, word in enumerate(text.split())]
+
+
+def _timeline(*utterances: str, project_id: str = "project-1") -> WordTimeline:
+    """Utterances one after the other, ten seconds apart"""
+    return WordTimeline.from_utterances(
+        ((f"u{i}", _words(text, start=i * 10.0)) for i, text in enumerate(utterances)),
+        project_id
+    )
+
+
+class TestWordIndex:
+    """Test suite for word timelines and the inverted index"""
+
+    @pytest.mark.unit
+    def test_timeline_shares_tokens_and_round_trips(self, tmp_path):
+        timeline = _timeline("we went to the farm", "the farm was far")
+
+        assert len(timeline) == 9
+        assert timeline.tokens == ["we", "went", "to", "the", "farm", "was", "far"]
+        assert timeline.token_ids.dtype == np.uint32
+        assert timeline.utterance_of(4) == "u0" and timeline.utterance_of(5) == "u1"
+        assert timeline.words("u1")[0] == ("the", 10000, 10400)
+
+        path = timeline.save(tmp_path / "words.npz")
+        loaded = WordTimeline.load(path)
+
+        assert read_project_id(path) == "project-1"
+        assert loaded.tokens == timeline.tokens
+        assert loaded.utterance_ids == ["u0", "u1"]
+        assert np.array_equal(loaded.starts, timeline.starts)
+        assert loaded.text(2, 5) == "to the farm the"
+
+    @pytest.mark.unit
+    def test_whisper_words_split_by_segment(self):
+        transcript = SimpleNamespace(words=[
+            SimpleNamespace(word=" Where", start=0.0, end=0.3),
+            SimpleNamespace(word=" born?", start=0.3, end=0.8),
+            SimpleNamespace(word=" Jalisco.", start=1.1, end=1.9),
+        ])
+
+        words = transcript_words(transcript, offset=600.0)
+
+        assert words[0] == ("Where", 600.0, 600.3)
+        assert split_words(words, [(600.0, 601.0), (601.0, 602.0)]) == [words[:2], words[2:]]
+
+    @pytest.mark.unit
+    def test_phrase_hits_carry_millisecond_offsets(self):
+        index = WordIndex({
+            "s1": _timeline("it was the day we arrived in California."),
+            "s2": _timeline("My father said", "the day we arrived in California, it rained."),
+        })
+
+        hits = index.search("The day we arrived in California")
+
+        assert [(h['session_id'], h['utterance_id'], h['match']) for h in hits] == [
+            ("s1", "u0", MATCH_PHRASE), ("s2", "u1", MATCH_PHRASE)
+        ]
+        assert (hits[0]['start_ms'], hits[0]['end_ms']) == (1000, 3900)
+        assert (hits[1]['start_ms'], hits[1]['end_ms']) == (10000, 12900)
+        assert hits[1]['text'].startswith("My father said the day")
+
+    @pytest.mark.unit
+    def test_nearby_words_found_after_exact_phrases(self):
+        index = WordIndex({
+            "s1": _timeline("when we finally arrived there in sunny California"),
+            "s2": _timeline("we arrived in California"),
+        })
+
+        hits = index.search("arrived in California")
+
+        assert [(h['session_id'], h['match']) for h in hits] == [("s2", MATCH_PHRASE), ("s1", MATCH_NEAR)]
+        assert hits[1]['start_ms'] == 1500
+        assert index.search("arrived in Texas") == []
+        assert index.search("?!") == []
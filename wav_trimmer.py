@@ -11,6 +11,12 @@ from pathlib import Path
 import wave
 import struct
 
+# Add the backend directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from services.audio_metadata import read_audio_metadata
+from services.audio_cuts import clip_paths, normalize_cuts, read_cut_list, validate_cuts, write_wav_clips
+
 
 class WAVTrimmer:
     """Simple WAV file trimmer using built-in wave module."""
@@ -26,21 +32,16 @@ class WAVTrimmer:
             raise ValueError("Input file must be a WAV file")
     
     def get_audio_info(self):
-        """Get basic information about the WAV file."""
-        with wave.open(str(self.input_file), 'rb') as wav_file:
-            frames = wav_file.getnframes()
-            sample_rate = wav_file.getframerate()
-            duration = frames / sample_rate
-            channels = wav_file.getnchannels()
-            sample_width = wav_file.getsampwidth()
-            
-            return {
-                'frames': frames,
-                'sample_rate': sample_rate,
-                'duration': duration,
-                'channels': channels,
-                'sample_width': sample_width
-            }
+        """Get basic information about the WAV file (header only)."""
+        metadata = read_audio_metadata(self.input_file)
+        
+        return {
+            'frames': metadata['frames'],
+            'sample_rate': metadata['sample_rate'],
+            'duration': metadata['duration'],
+            'channels': metadata['channels'],
+            'sample_width': metadata['sample_width']
+        }
     
     def trim(self, start_time, end_time):
         """
@@ -97,6 +98,18 @@ class WAVTrimmer:
         
         return str(self.output_file)
     
+    def trim_many(self, cuts, output_dir=None):
+        """
+        Cut several clips reading the WAV file once, front to back.
+        
+        Args:
+            cuts: (start, end) or (start, end, label) items in seconds
+            output_dir: Directory for the clips (default: <input>_clips)
+        """
+        cuts = normalize_cuts(cuts)
+        validate_cuts(cuts, self.get_audio_info()['duration'])
+        return write_wav_clips(self.input_file, cuts, clip_paths(self.input_file, cuts, output_dir))
+    
     def print_info(self):
         """Print information about the WAV file."""
         info = self.get_audio_info()
@@ -118,6 +131,8 @@ Examples:
   python wav_trimmer.py input.wav --start 10 --end 30
   python wav_trimmer.py input.wav --start 0 --end 60 --output trimmed.wav
   python wav_trimmer.py input.wav --info
+  python wav_trimmer.py input.wav --ranges 10-30,45-60 --output-dir clips
+  python wav_trimmer.py recording.wav --cuts diarization.rttm
         """
     )
     
@@ -126,6 +141,9 @@ Examples:
     parser.add_argument('--end', type=float, help='End time in seconds')
     parser.add_argument('--output', '-o', help='Output file path (optional)')
     parser.add_argument('--info', action='store_true', help='Show file information only')
+    parser.add_argument('--ranges', help='Cut several clips in one pass, e.g. "10-30,45-60"')
+    parser.add_argument('--cuts', help='Cut one clip per turn of an RTTM file or utterance of a transcription.json')
+    parser.add_argument('--output-dir', help='Directory for the clips of --ranges/--cuts (default: <input>_clips)')
     
     args = parser.parse_args()
     
@@ -136,6 +154,14 @@ Examples:
             trimmer.print_info()
             return
         
+        if args.ranges or args.cuts:
+            cuts = read_cut_list(args.ranges, args.cuts)
+            print(f"Cutting {len(cuts)} clips from {args.input_file}...")
+            output_files = trimmer.trim_many(cuts, args.output_dir)
+            if output_files:
+                print(f"{len(output_files)} clips saved to: {Path(output_files[0]).parent}")
+            return
+        
         if args.start is None or args.end is None:
             print("Error: Both --start and --end times are required for trimming")
             print("Use --info to see file information")
@@ -18,6 +18,14 @@ except ImportError:
     print("You may also need ffmpeg: brew install ffmpeg (on macOS)")
     sys.exit(1)
 
+# Add the backend directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from services.audio_metadata import read_audio_metadata
+from services.audio_cuts import (
+    clip_paths, normalize_cuts, read_cut_list, validate_cuts, write_ffmpeg_clips, write_wav_clips
+)
+
 
 class EnhancedAudioTrimmer:
     """Enhanced audio trimmer using pydub for better format support."""
@@ -30,17 +38,17 @@ class EnhancedAudioTrimmer:
             raise FileNotFoundError(f"Input file not found: {self.input_file}")
     
     def get_audio_info(self):
-        """Get basic information about the audio file."""
+        """Get basic information about the audio file (read from its header, not decoded)."""
         try:
-            audio = AudioSegment.from_file(str(self.input_file))
-            duration = len(audio) / 1000.0  # Convert from milliseconds to seconds
+            metadata = read_audio_metadata(self.input_file)
             
             return {
-                'duration': duration,
-                'sample_rate': audio.frame_rate,
-                'channels': audio.channels,
-                'sample_width': audio.sample_width,
-                'format': self.input_file.suffix.lower()
+                'duration': metadata['duration'],
+                'sample_rate': metadata['sample_rate'],
+                'channels': metadata['channels'],
+                'sample_width': metadata['sample_width'],
+                'format': self.input_file.suffix.lower(),
+                'codec': metadata.get('codec')
             }
         except Exception as e:
             raise ValueError(f"Could not read audio file: {e}")
@@ -64,15 +72,12 @@ class EnhancedAudioTrimmer:
         if start_time >= end_time:
             raise ValueError("Start time must be less than end time")
         
-        # Load the audio file
-        audio = AudioSegment.from_file(str(self.input_file))
-        
-        # Convert times to milliseconds
-        start_ms = int(start_time * 1000)
-        end_ms = int(end_time * 1000)
-        
-        # Trim the audio
-        trimmed_audio = audio[start_ms:end_ms]
+        # Decode only the requested range (ffmpeg seeks to it), not the whole file
+        trimmed_audio = AudioSegment.from_file(
+            str(self.input_file),
+            start_second=start_time,
+            duration=end_time - start_time
+        )
         
         # Generate output filename if not provided
         if self.output_file is None:
@@ -85,6 +90,28 @@ class EnhancedAudioTrimmer:
         
         return str(self.output_file)
     
+    def trim_many(self, cuts, output_dir=None):
+        """
+        Cut several clips to WAV in a single pass, without holding the audio in memory:
+        PCM WAV is streamed once in Python, anything else is decoded by one ffmpeg run
+        with an output per clip.
+        
+        Args:
+            cuts: (start, end) or (start, end, label) items in seconds
+            output_dir: Directory for the clips (default: <input>_clips)
+        """
+        cuts = normalize_cuts(cuts)
+        info = self.get_audio_info()
+        validate_cuts(cuts, info['duration'])
+        outputs = clip_paths(self.input_file, cuts, output_dir, suffix='.wav')
+        if not cuts:
+            return []
+        
+        if info['format'] == '.wav' and info['codec'] == 'pcm':
+            return write_wav_clips(self.input_file, cuts, outputs)
+        # Re-encoded rather than stream-copied, since the clips are WAV whatever the input
+        return write_ffmpeg_clips(self.input_file, cuts, outputs, copy=False)
+    
     def print_info(self):
         """Print information about the audio file."""
         info = self.get_audio_info()
@@ -106,6 +133,8 @@ Examples:
   python wav_trimmer_enhanced.py input.wav --start 10 --end 30
   python wav_trimmer_enhanced.py input.mp3 --start 0 --end 60 --output trimmed.wav
   python wav_trimmer_enhanced.py input.wav --info
+  python wav_trimmer_enhanced.py input.wav --ranges 10-30,45-60 --output-dir clips
+  python wav_trimmer_enhanced.py recording.flac --cuts transcription.json
         """
     )
     
@@ -114,6 +143,9 @@ Examples:
     parser.add_argument('--end', type=float, help='End time in seconds')
     parser.add_argument('--output', '-o', help='Output file path (optional)')
     parser.add_argument('--info', action='store_true', help='Show file information only')
+    parser.add_argument('--ranges', help='Cut several clips in one pass, e.g. "10-30,45-60"')
+    parser.add_argument('--cuts', help='Cut one clip per turn of an RTTM file or utterance of a transcription.json')
+    parser.add_argument('--output-dir', help='Directory for the clips of --ranges/--cuts (default: <input>_clips)')
     
     args = parser.parse_args()
     
@@ -124,6 +156,14 @@ Examples:
             trimmer.print_info()
             return
         
+        if args.ranges or args.cuts:
+            cuts = read_cut_list(args.ranges, args.cuts)
+            print(f"Cutting {len(cuts)} clips from {args.input_file}...")
+            output_files = trimmer.trim_many(cuts, args.output_dir)
+            if output_files:
+                print(f"{len(output_files)} clips saved to: {Path(output_files[0]).parent}")
+            return
+        
         if args.start is None or args.end is None:
             print("Error: Both --start and --end times are required for trimming")
             print("Use --info to see file information")